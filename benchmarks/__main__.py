@@ -0,0 +1,5 @@
+from benchmarks.suite import main
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,73 @@
+from typing import (
+    List,
+    Dict,
+)
+from random import Random
+
+
+Operators: List[str] = ['+', '-', '*']
+Functions: List[str] = ['sin', 'cos', 'abs', 'fract', 'sqrt']
+
+
+def generate(lines: int, seed: int = 0) -> str:
+    """
+        Returns a valid synthetic fragment shader of roughly `lines` lines,
+        with uniforms, comments and helper functions like a demoscene
+        shader in progress. The same arguments give the same shader.
+    """
+    random: Random = Random(seed)
+    output: List[str] = [
+        '#version 450',
+        '',
+        'out vec4 out_color;',
+        'uniform float iTime;',
+        'uniform vec2 iResolution;',
+        '',
+    ]
+
+    def expression(variables: List[str], depth: int = 0) -> str:
+        if depth > 2 or random.random() < .3:
+            return random.choice(variables + ['{:.2f}'.format(random.uniform(-2., 2.))])
+        if random.random() < .3:
+            return '{}({})'.format(random.choice(Functions), expression(variables, depth + 1))
+        return '({} {} {})'.format(
+            expression(variables, depth + 1),
+            random.choice(Operators),
+            expression(variables, depth + 1),
+        )
+
+    functions: List[str] = []
+    while len(output) < lines - 8:
+        name: str = 'f{}'.format(len(functions))
+        output.append('// Helper {}: {}'.format(len(functions), 'x' * random.randint(10, 40)))
+        output.append('float {}(float x) {{'.format(name))
+        variables: List[str] = ['x', 'iTime']
+        for statement in range(random.randint(3, 12)):
+            variable: str = 'v{}'.format(statement)
+            output.append('    float {} = {};'.format(variable, expression(variables)))
+            variables.append(variable)
+        output.append('    return {};'.format(' + '.join(variables[2:])))
+        output.append('}')
+        output.append('')
+        functions.append(name)
+
+    output.append('void main() {')
+    output.append('    vec2 uv = gl_FragCoord.xy / iResolution;')
+    output.append('    float d = uv.x;')
+    for name in functions[-16:]:
+        output.append('    d += {}(d);'.format(name))
+    output.append('    out_color = vec4(fract(d), uv, 1.);')
+    output.append('}')
+    return '\n'.join(output) + '\n'
+
+
+def corpus(sizes: List[int], count: int = 1, seed: int = 0) -> Dict[str, str]:
+    """
+        Returns `count` shaders per size in lines, keyed by a name that
+        contains the size.
+    """
+    return {
+        'shader_{}_{}.frag'.format(size, index): generate(size, seed + index)
+        for size in sizes
+        for index in range(count)
+    }
@@ -0,0 +1,32 @@
+from unittest import TestCase
+from typing import (
+    Self,
+    Dict,
+)
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from shader_minifier.minifier import (
+    MinifierVersion,
+    shader_minifier,
+)
+from benchmarks.standin import install
+
+
+class StandinTestCase(TestCase):
+    """
+        Test case with a temporary directory per test, holding the stand-in
+        executables in bin/, and a `minifier` that runs them.
+    """
+
+    def setUp(self: Self) -> None:
+        self._tempDir: TemporaryDirectory = TemporaryDirectory()
+        self.tempDir: Path = Path(self._tempDir.name)
+        self.standins: Dict[str, Path] = install(self.tempDir / 'bin')
+        self.minifier: shader_minifier = shader_minifier(
+            MinifierVersion.v1_4_0,
+            path=self.standins['minifier'],
+            validator=self.standins['validator'],
+        )
+
+    def tearDown(self: Self) -> None:
+        self._tempDir.cleanup()
@@ -0,0 +1,220 @@
+from typing import (
+    Self,
+    List,
+    Any,
+)
+from os import environ
+from datetime import (
+    datetime,
+    timedelta,
+)
+from hashlib import sha256
+from random import Random
+from argparse import (
+    ArgumentParser,
+    Namespace,
+)
+from benchmarks.suite import Benchmark
+from benchmarks.corpus import generate
+
+
+class ModelBenchmark(Benchmark):
+    """
+        Feeds synthetic session histories through VersionModel and long
+        shader diffs through DiffModel on Qt's offscreen platform, and
+        measures model updates, `data()` and painting of a table view.
+    """
+    # Rows sampled for `data()`, spread over the whole model.
+    Samples: int = 100
+    ViewSize: List[int] = [1200, 800]
+
+    def __init__(
+        self: Self,
+        saves: List[int],
+        lines: List[int],
+        repeat: int,
+    ) -> None:
+        super().__init__(repeat)
+        self._saves: List[int] = saves
+        self._lines: List[int] = lines
+
+        # Without a display, e.g. on CI machines.
+        environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt6.QtWidgets import QApplication
+        self._application: QApplication = QApplication.instance() or QApplication([])
+
+    @staticmethod
+    def hash(source: str) -> str:
+        return sha256(source.encode('utf-8')).digest().hex()
+
+    def _components(self: Self) -> Any:
+        from shader_minifier.watcher import Watcher
+        from shader_minifier.scheduler import Scheduler
+        from shader_minifier.entropy import Entropy
+
+        return Watcher(), Scheduler(), Entropy()
+
+    def _history(self: Self, saves: int) -> Any:
+        """
+            Returns watcher, scheduler and entropy with a session of `saves`
+            saves: mostly minified, some errored, some with entropy.
+        """
+        from shader_minifier.minifier import ShaderMinifierError
+
+        watcher, scheduler, entropy = self._components()
+        random: Random = Random(saves)
+        start: datetime = datetime(2024, 1, 1)
+        base: str = generate(100)
+        for save in range(saves):
+            source: str = '{}// Save {}\n'.format(base, save)
+            hash: str = ModelBenchmark.hash(source)
+            watcher._versions[hash] = source
+            watcher._history[start + timedelta(seconds=save)] = hash
+
+            if random.random() < .05:
+                scheduler._versions[hash] = ShaderMinifierError('Error in save {}.'.format(save))
+                continue
+            minified: str = source[:random.randint(len(source) // 3, len(source) // 2)]
+            scheduler._versions[hash] = minified
+            if random.random() < .5:
+                entropy._outputs[hash] = ModelBenchmark.hash(minified)
+                entropy._versions[entropy._outputs[hash]] = random.uniform(1000., 2000.)
+
+        watcher._latestHash = hash
+        return watcher, scheduler, entropy
+
+    def _data(
+        self: Self,
+        model: Any,
+        roles: List[Any],
+    ) -> int:
+        """
+            Queries `roles` of sampled cells and headers; returns the number
+            of queries.
+        """
+        from PyQt6.QtCore import Qt
+
+        rows: int = model.rowCount()
+        queries: int = 0
+        for sample in range(ModelBenchmark.Samples):
+            row: int = sample * rows // ModelBenchmark.Samples
+            for column in range(model.columnCount()):
+                for role in roles:
+                    model.data(model.index(row, column), role)
+                    queries += 1
+            model.headerData(row, Qt.Orientation.Vertical, Qt.ItemDataRole.DisplayRole)
+            queries += 1
+        return queries
+
+    def _view(self: Self, model: Any) -> Any:
+        """
+            Returns a shown table view of `model`, scrolled to its last page.
+        """
+        from PyQt6.QtWidgets import QTableView
+
+        view: QTableView = QTableView()
+        view.resize(*ModelBenchmark.ViewSize)
+        view.setModel(model)
+        view.show()
+        view.scrollToBottom()
+        self._application.processEvents()
+
+        return view
+
+    def versions(self: Self) -> None:
+        from PyQt6.QtCore import Qt
+        from shader_minifier.versionmodel import VersionModel
+
+        display: List[Any] = [Qt.ItemDataRole.DisplayRole]
+        styles: List[Any] = [Qt.ItemDataRole.FontRole, Qt.ItemDataRole.ForegroundRole, Qt.ItemDataRole.BackgroundRole]
+        for saves in self._saves:
+            watcher, scheduler, entropy = self._history(saves)
+            model: VersionModel = VersionModel()
+            model.updateScheduler(scheduler)
+            model.updateEntropy(entropy)
+            model.updateWatcher(watcher)
+            view: Any = self._view(model)
+
+            def update() -> None:
+                model.updateWatcher(watcher)
+                self._application.processEvents()
+            self.measure('versions.update.{}'.format(saves), update, memory=True)
+
+            # The main window looks up the diff reference after every update.
+            reference: str = model.hash(saves // 100)
+            self.measure(
+                'versions.match.{}'.format(saves),
+                lambda: model.match(model.index(0, 0), Qt.ItemDataRole.DisplayRole, reference),
+                repeat=max(1, self._repeat // 4),
+            )
+
+            queries: int = self._data(model, display)
+            self.measure('versions.data.{}'.format(saves), lambda: self._data(model, display), count=queries)
+            queries = self._data(model, styles)
+            self.measure('versions.style.{}'.format(saves), lambda: self._data(model, styles), count=queries)
+
+            self.measure('versions.paint.{}'.format(saves), view.viewport().grab, memory=True)
+
+            self.measure('versions.sort.{}'.format(saves), lambda: model.sort(1, Qt.SortOrder.DescendingOrder))
+            self.measure('versions.best.{}'.format(saves), lambda: model.showBest(20))
+            model.showBest(0)
+            model.sort(-1)
+            self.measure('versions.summary.{}'.format(saves), model.summary)
+            view.close()
+
+    def diff(self: Self) -> None:
+        from PyQt6.QtCore import Qt
+        from shader_minifier.diffmodel import DiffModel
+
+        roles: List[Any] = [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.FontRole, Qt.ItemDataRole.BackgroundRole]
+        for lines in self._lines:
+            watcher, scheduler, _ = self._components()
+            reference: str = generate(lines, 0)
+            # Every 20th line changed, like a long edit session.
+            latest: str = '\n'.join(map(
+                lambda line: line[1] + ' // edited' if line[0] % 20 == 0 else line[1],
+                enumerate(reference.splitlines()),
+            )) + '\n'
+            for source in [reference, latest]:
+                watcher._versions[ModelBenchmark.hash(source)] = source
+                scheduler._versions[ModelBenchmark.hash(source)] = source
+            watcher._latestHash = ModelBenchmark.hash(latest)
+
+            model: DiffModel = DiffModel()
+            model.updateWatcher(watcher)
+            model.updateScheduler(scheduler)
+            model.updateMinified(False)
+
+            self.measure(
+                'diff.update.{}'.format(lines),
+                lambda: model.updateReferenceSHA(ModelBenchmark.hash(reference)),
+                repeat=max(1, self._repeat // 4),
+                memory=True,
+            )
+            queries: int = self._data(model, roles)
+            self.measure('diff.data.{}'.format(lines), lambda: self._data(model, roles), count=queries)
+
+            view: Any = self._view(model)
+            self.measure('diff.paint.{}'.format(lines), view.viewport().grab, memory=True)
+            view.close()
+
+    def runAll(self: Self) -> None:
+        self.versions()
+        self.diff()
+
+
+def main() -> int:
+    parser: ArgumentParser = ArgumentParser(description="Benchmark VersionModel and DiffModel with synthetic histories and diffs, without a display.")
+    parser.add_argument('--saves', type=int, nargs='+', default=[10000, 50000, 100000], help="Session history lengths for VersionModel.")
+    parser.add_argument('--lines', type=int, nargs='+', default=[1000, 2000, 5000], help="Shader sizes in lines for DiffModel.")
+    Benchmark.addArguments(parser)
+    arguments: Namespace = parser.parse_args()
+
+    benchmark: ModelBenchmark = ModelBenchmark(arguments.saves, arguments.lines, arguments.repeat)
+    benchmark.runAll()
+
+    return benchmark.finish(arguments, '.models')
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,190 @@
+from typing import (
+    List,
+    Dict,
+    Optional,
+)
+from pathlib import Path
+from platform import system
+from stat import S_IEXEC
+from time import sleep
+from os import environ
+from re import (
+    compile,
+    Pattern,
+    DOTALL,
+)
+from sys import (
+    argv,
+    executable,
+)
+
+# Seconds every stand-in invocation sleeps before doing its work, to emulate
+# the startup time of the real executables (e.g. the .NET runtime).
+DelayVariable: str = 'STANDIN_DELAY'
+# Version the minifier stand-in reports on --help.
+VersionVariable: str = 'STANDIN_VERSION'
+
+VersionLine: str = 'Shader Minifier {} - https://github.com/laurentlb/Shader_Minifier'
+CommentPattern: Pattern = compile(r'//[^\n]*|/\*.*?\*/', DOTALL)
+WhitespacePattern: Pattern = compile(r'\s+')
+OperatorPattern: Pattern = compile(r' ?([-+*/=<>!&|^%,;:?(){}\[\]]) ?')
+# A statement that is not terminated before the end of its block.
+UnterminatedPattern: Pattern = compile(r'[^;{}\s]\s*\}')
+OptionsWithValue: List[str] = ['-o', '--format', '--field-names', '--no-renaming-list']
+UniformPattern: Pattern = compile(r'\buniform\s+\w+\s+(\w+)')
+
+
+def minify(source: str) -> str:
+    """
+        Cheap stand-in for shader_minifier: drops comments and redundant
+        whitespace, keeping preprocessor directives on their own lines.
+    """
+    lines: List[str] = []
+    for line in CommentPattern.sub(' ', source).splitlines():
+        line = line.strip()
+        if line == '':
+            continue
+        if line.startswith('#'):
+            lines.append(line)
+            continue
+        line = OperatorPattern.sub(r'\1', WhitespacePattern.sub(' ', line))
+        if len(lines) != 0 and not lines[-1].startswith('#'):
+            lines[-1] += line
+        else:
+            lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+def cVariables(minified: Dict[str, str]) -> str:
+    """
+        Lays out minified shaders like the c-variables format of
+        shader_minifier. The stand-in does not rename uniforms.
+    """
+    lines: List[str] = [
+        '/* File generated with Shader Minifier {}'.format(environ.get(VersionVariable, '1.4.0')),
+        ' * http://www.ctrl-alt-test.fr',
+        ' */',
+        '#ifndef SHADER_MINIFIER_IMPL',
+        '#ifndef SHADER_MINIFIER_HEADER',
+        '# define SHADER_MINIFIER_HEADER',
+    ]
+    for name in sorted(set(UniformPattern.findall(''.join(minified.values())))):
+        lines.append('# define VAR_{} "{}"'.format(name.upper(), name))
+    lines += ['#endif', '', '#else // if SHADER_MINIFIER_IMPL', '']
+    for name, code in minified.items():
+        lines += ['// {}'.format(name), 'const char *{} ='.format(name.replace('.', '_'))]
+        for line in code.splitlines():
+            literal: str = line.replace('\\', '\\\\').replace('"', '\\"')
+            lines.append(' "{}\\n"'.format(literal) if line.startswith('#') else ' "{}"'.format(literal))
+        lines[-1] += ';'
+        lines.append('')
+    lines.append('#endif // SHADER_MINIFIER_IMPL')
+    return '\n'.join(lines) + '\n'
+
+
+def minifier(arguments: List[str]) -> int:
+    if '--help' in arguments:
+        print(VersionLine.format(environ.get(VersionVariable, '1.4.0')))
+        return 0
+
+    output: Optional[Path] = None
+    format: str = 'text'
+    inputs: List[Path] = []
+    index: int = 0
+    while index < len(arguments):
+        argument: str = arguments[index]
+        if argument in OptionsWithValue:
+            if argument == '-o':
+                output = Path(arguments[index + 1])
+            elif argument == '--format':
+                format = arguments[index + 1]
+            index += 2
+            continue
+        if not argument.startswith('-'):
+            inputs.append(Path(argument))
+        index += 1
+
+    if output is None or len(inputs) == 0:
+        print('Error: No input or output.')
+        return 1
+
+    minified: Dict[str, str] = {input.name: minify(input.read_text()) for input in inputs}
+    if format == 'c-variables':
+        output.write_text(cVariables(minified))
+    elif format == 'indented' and len(inputs) > 1:
+        output.write_text(''.join(map(lambda name: '// {}\n{}\n'.format(name, minified[name]), minified)))
+    else:
+        output.write_text(''.join(minified.values()))
+    return 0
+
+
+def check(path: Path) -> Optional[str]:
+    """
+        Returns the error of the shader at `path`, or None if it is valid.
+    """
+    source: str = CommentPattern.sub('', path.read_text())
+
+    depth: Dict[str, int] = {'(': 0, '[': 0, '{': 0}
+    closing: Dict[str, str] = {')': '(', ']': '[', '}': '{'}
+    for character in source:
+        if character in depth:
+            depth[character] += 1
+        elif character in closing:
+            depth[closing[character]] -= 1
+            if depth[closing[character]] < 0:
+                return 'ERROR: {}: Unbalanced \'{}\'.'.format(path, character)
+
+    if any(map(lambda value: value != 0, depth.values())):
+        return 'ERROR: {}: Unbalanced brackets.'.format(path)
+    if UnterminatedPattern.search(source) is not None:
+        return 'ERROR: {}: Syntax error, missing \';\'.'.format(path)
+    if 'main' not in source:
+        return 'ERROR: {}: Missing entry point.'.format(path)
+    return None
+
+
+def validator(arguments: List[str]) -> int:
+    """
+        Cheap stand-in for glslangValidator: checks that brackets balance,
+        that statements are terminated and that there is an entry point.
+        Like glslangValidator, it validates all files it is given and
+        precedes the output of each file with its path.
+    """
+    status: int = 0
+    for path in map(Path, filter(lambda argument: not argument.startswith('-'), arguments)):
+        print(path)
+        error: Optional[str] = check(path)
+        if error is not None:
+            print(error)
+            status = 2
+    return status
+
+
+def install(directory: Path) -> Dict[str, Path]:
+    """
+        Writes `shader_minifier` and `glslangValidator` stand-in executables
+        into `directory` and returns their paths.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    paths: Dict[str, Path] = {}
+    for name, role in [('shader_minifier', 'minifier'), ('glslangValidator', 'validator')]:
+        if system() == 'Windows':
+            path: Path = directory / '{}.bat'.format(name)
+            path.write_text('@"{}" "{}" {} %*\n'.format(executable, __file__, role))
+        else:
+            path: Path = directory / name
+            path.write_text('#!/bin/sh\nexec "{}" "{}" {} "$@"\n'.format(executable, __file__, role))
+            path.chmod(path.stat().st_mode | S_IEXEC)
+        paths[role] = path
+    return paths
+
+
+def main() -> int:
+    sleep(float(environ.get(DelayVariable, '0')))
+    if argv[1] == 'minifier':
+        return minifier(argv[2:])
+    return validator(argv[2:])
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,311 @@
+from typing import (
+    Self,
+    Optional,
+    List,
+    Dict,
+    Callable,
+    Any,
+)
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from subprocess import run
+from concurrent.futures import ThreadPoolExecutor
+from statistics import (
+    median,
+    mean,
+)
+from time import perf_counter
+from datetime import datetime
+from json import (
+    dumps,
+    loads,
+)
+from os import environ
+from tracemalloc import (
+    start as startTracing,
+    stop as stopTracing,
+    get_traced_memory,
+)
+from argparse import (
+    ArgumentParser,
+    Namespace,
+)
+from shader_minifier.minifier import (
+    MinifierVersion,
+    shader_minifier,
+)
+from shader_minifier.include import IncludeResolver
+from shader_minifier.project import Project
+from shader_minifier.version import Version
+from shader_minifier.metrics import metrics
+from shader_minifier.accounting import (
+    resources,
+    report,
+)
+from benchmarks.standin import (
+    install,
+    DelayVariable,
+)
+from benchmarks.corpus import (
+    generate,
+    corpus,
+)
+
+
+class Benchmark:
+    """
+        Collects the wall time statistics of named measurements in seconds,
+        stores them and compares them to a previous run.
+    """
+    ResultsDirectory: Path = Path(__file__).parent / 'results'
+
+    def __init__(self: Self, repeat: int) -> None:
+        self._repeat: int = repeat
+        self.results: Dict[str, Dict[str, float]] = {}
+
+    def measure(
+        self: Self,
+        name: str,
+        function: Callable[[], Any],
+        repeat: Optional[int] = None,
+        count: int = 1,
+        memory: bool = False,
+    ) -> None:
+        """
+            Runs `function` `repeat` times. `count` is the number of items a
+            call processes, for throughput. With `memory`, one more call is
+            traced to record the peak and retained Python heap in bytes.
+        """
+        times: List[float] = []
+        for _ in range(repeat if repeat is not None else self._repeat):
+            start: float = perf_counter()
+            function()
+            times.append(perf_counter() - start)
+
+        self.results[name] = {
+            'min': min(times),
+            'median': median(times),
+            'mean': mean(times),
+            'max': max(times),
+            'throughput': count / median(times),
+        }
+
+        if memory:
+            startTracing()
+            function()
+            retained, peak = get_traced_memory()
+            stopTracing()
+            self.results[name]['peak'] = peak
+            self.results[name]['retained'] = retained
+
+        print('{:<40} {:>10.3f} ms{}'.format(
+            name,
+            1e3 * median(times),
+            '  {:>8.1f} MiB peak'.format(self.results[name]['peak'] / 2 ** 20) if memory else '',
+        ))
+
+    def save(self: Self, path: Path, **info: Any) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(dumps(
+            {
+                'version': Version().describe(),
+                'datetime': datetime.now().isoformat(),
+                **info,
+                'results': self.results,
+            },
+            indent=4,
+        ))
+        print('\nSaved results to {}.'.format(path))
+
+    def compare(
+        self: Self,
+        baseline: Dict[str, Any],
+        threshold: float,
+    ) -> List[str]:
+        """
+            Prints the change of the median of each measurement relative to
+            `baseline` and returns the measurements that got slower by more
+            than `threshold`.
+        """
+        print('\nCompared to {}:'.format(baseline['version']))
+        regressions: List[str] = []
+        for name, result in self.results.items():
+            if name not in baseline['results']:
+                continue
+            ratio: float = result['median'] / baseline['results'][name]['median']
+            regressed: bool = ratio > 1. + threshold
+            print('{:<40} {:>+9.1f} %{}'.format(name, 100. * (ratio - 1.), ' REGRESSION' if regressed else ''))
+            if regressed:
+                regressions.append(name)
+        return regressions
+
+    @staticmethod
+    def addArguments(parser: ArgumentParser) -> None:
+        parser.add_argument('-r', '--repeat', type=int, default=20, help="Repetitions per measurement.")
+        parser.add_argument('-o', '--output', type=Path, default=None, help="Result file; defaults to benchmarks/results/<version>.json.")
+        parser.add_argument('-c', '--compare', type=Path, default=None, help="Result file of a previous run to compare against.")
+        parser.add_argument('--threshold', type=float, default=.1, help="Relative slowdown of a median that counts as a regression.")
+
+    def finish(
+        self: Self,
+        arguments: Namespace,
+        suffix: str = '',
+        **info: Any,
+    ) -> int:
+        """
+            Saves the results as given on the command line and returns the
+            exit code: 1 if a measurement regressed.
+        """
+        self.save(
+            arguments.output if arguments.output is not None else Benchmark.ResultsDirectory / '{}{}.json'.format(Version().describe(), suffix),
+            **info,
+        )
+
+        if arguments.compare is not None:
+            if len(self.compare(loads(arguments.compare.read_text()), arguments.threshold)) != 0:
+                return 1
+
+        return 0
+
+
+class Suite(Benchmark):
+    """
+        Measures the latency and throughput of the minify pipeline against
+        local executables, so that it runs without network access.
+    """
+
+    def __init__(
+        self: Self,
+        minifier: shader_minifier,
+        sizes: List[int],
+        repeat: int,
+        workers: List[int],
+    ) -> None:
+        super().__init__(repeat)
+        self._minifier: shader_minifier = minifier
+        self._sizes: List[int] = sizes
+        self._workers: List[int] = workers
+
+    def spawn(self: Self) -> None:
+        # Minify runs through the shell, validation does not.
+        self.measure('spawn.direct', lambda: run([self._minifier.path, '--help'], capture_output=True))
+        self.measure('spawn.shell', lambda: run('"{}" --help'.format(self._minifier.path), capture_output=True, shell=True))
+
+    def phases(self: Self) -> None:
+        for size in self._sizes:
+            source: str = generate(size)
+            minified: str = self._minifier.minify(source)
+
+            with TemporaryDirectory() as tempDir:
+                input: Path = Path(tempDir) / 'unminified.frag'
+                input.write_text(source)
+                command: str = self._minifier._command(Path(tempDir) / 'minified.frag', [input])
+
+                self.measure('phase.validate.{}'.format(size), lambda: self._minifier.validate(source))
+                self.measure('phase.minify.{}'.format(size), lambda: run(command, capture_output=True, shell=True))
+                self.measure('phase.validateMinified.{}'.format(size), lambda: self._minifier.validate(minified))
+                self.measure('phase.total.{}'.format(size), lambda: self._minifier.minify(source))
+                self.measure('phase.pipelined.{}'.format(size), lambda: self._minifier.minify(source, pipelined=True))
+
+    def cache(self: Self) -> None:
+        with TemporaryDirectory() as tempDir:
+            root: Path = Path(tempDir)
+            (root / 'common.glsl').write_text('#pragma once\n' + generate(max(self._sizes)).split('void main()')[0])
+            shader: Path = root / 'shader.frag'
+            shader.write_text('#include "common.glsl"\nvoid main() {}\n')
+
+            self.measure('cache.include.miss', lambda: IncludeResolver().expand(shader))
+            resolver: IncludeResolver = IncludeResolver()
+            resolver.expand(shader)
+            self.measure('cache.include.hit', lambda: resolver.expand(shader))
+
+            # Project states that were seen before are not minified again.
+            first: Path = root / 'first.frag'
+            second: Path = root / 'second.frag'
+            first.write_text(generate(min(self._sizes), 0))
+            second.write_text(generate(min(self._sizes), 1))
+            project: Project = Project([first, second])
+            project._minifier = self._minifier
+            project._minify(set())
+            self.measure('cache.project.unchanged', lambda: project._minify(set()))
+
+            states: List[str] = [generate(min(self._sizes), 2), generate(min(self._sizes), 3)]
+            def revisit() -> None:
+                states.reverse()
+                first.write_text(states[0])
+                project._minify({first})
+            revisit()
+            revisit()
+            self.measure('cache.project.revisit', revisit)
+
+    def pool(self: Self) -> None:
+        sources: List[str] = list(corpus([min(self._sizes)], 16).values())
+        for workers in self._workers:
+            with ThreadPoolExecutor(workers) as executor:
+                self.measure(
+                    'pool.{}'.format(workers),
+                    lambda: list(executor.map(self._minifier.minify, sources)),
+                    repeat=max(1, self._repeat // 4),
+                    count=len(sources),
+                )
+
+    def validation(self: Self) -> None:
+        # Corpus-wide validation: one validator run per shader against one run in total.
+        sources: Dict[str, str] = corpus([min(self._sizes)], 16)
+        self.measure(
+            'corpus.validate',
+            lambda: list(map(self._minifier.validateMany, map(lambda name: {name: sources[name]}, sources))),
+            repeat=max(1, self._repeat // 4),
+            count=len(sources),
+        )
+        self.measure(
+            'corpus.validateMany',
+            lambda: self._minifier.validateMany(sources),
+            repeat=max(1, self._repeat // 4),
+            count=len(sources),
+        )
+
+    def runAll(self: Self) -> None:
+        self.spawn()
+        self.phases()
+        self.cache()
+        self.pool()
+        self.validation()
+
+
+def main() -> int:
+    parser: ArgumentParser = ArgumentParser(description="Benchmark the minify pipeline offline against stand-in or local executables.")
+    parser.add_argument('--minifier', type=Path, default=None, help="shader_minifier executable to benchmark instead of the stand-in.")
+    parser.add_argument('--validator', type=Path, default=None, help="glslangValidator executable to benchmark instead of the stand-in.")
+    parser.add_argument('--delay', type=float, default=0., help="Startup delay in seconds of the stand-in executables.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help="Corpus shader sizes in lines.")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help="Worker counts for the pool scaling benchmark.")
+    Benchmark.addArguments(parser)
+    arguments: Namespace = parser.parse_args()
+
+    with TemporaryDirectory() as tempDir:
+        environ[DelayVariable] = str(arguments.delay)
+        standins: Dict[str, Path] = install(Path(tempDir))
+
+        suite: Suite = Suite(
+            shader_minifier(
+                MinifierVersion.v1_4_0,
+                path=arguments.minifier if arguments.minifier is not None else standins['minifier'],
+                validator=arguments.validator if arguments.validator is not None else standins['validator'],
+            ),
+            arguments.sizes,
+            arguments.repeat,
+            arguments.workers,
+        )
+        suite.runAll()
+
+    # CPU time and peak RSS of all minifier and validator processes of the run.
+    print('\n{}'.format(report(resources(metrics.snapshot()))))
+
+    return suite.finish(
+        arguments,
+        resources=resources(metrics.snapshot()),
+        minifier=str(suite._minifier.path),
+        validator=str(suite._minifier._validator),
+        delay=arguments.delay,
+    )
@@ -4,6 +4,12 @@ from zipfile import ZipFile
 from shader_minifier.version import Version
 from platform import system
 from pathlib import Path
+from argparse import ArgumentParser
+from shader_minifier.minifier import (
+    MinifierVersion,
+    shader_minifier,
+)
+from shader_minifier.mirror import Mirror
 
 
 moduleName = 'shader_minifier'
@@ -15,6 +21,23 @@ sourcePath = rootPath / moduleName
 version = Version()
 version.generateVersionModule(buildPath)
 
+# Options after `--`, e.g. `pyinstaller pyinstaller.spec -- --bundle v1_4_0`.
+parser = ArgumentParser()
+parser.add_argument('--bundle', nargs='*', default=None, choices=[minifierVersion.name for minifierVersion in MinifierVersion if minifierVersion != MinifierVersion.unavailable], help="Bundle glslangValidator and these shader_minifier versions (all without versions), so the executable never waits for a download.")
+options = parser.parse_args()
+
+# Executables of the bundled mirror; the minifier marks them executable when it uses them.
+bundled = []
+if options.bundle is not None:
+    # Fetched through the mirror in $SHADER_MINIFIER_MIRROR if set.
+    artifacts = shader_minifier.artifacts(
+        [MinifierVersion[name] for name in options.bundle] or [minifierVersion for minifierVersion in MinifierVersion if minifierVersion != MinifierVersion.unavailable],
+    )
+    paths = Mirror(buildPath / 'binaries').prefetch(artifacts)
+    if len(paths) != len(artifacts):
+        raise SystemExit("Could not fetch all bundled executables.")
+    bundled = [(path, Mirror.BundleDirectory) for path in paths.values()]
+
 block_cipher = None
 
 a = Analysis(
@@ -27,7 +50,7 @@ a = Analysis(
         (buildPath / '{}.py'.format(Version.VersionModuleName), moduleName),
         (sourcePath / 'team210.ico', moduleName),
         (sourcePath / 'mainwindow.ui', moduleName),
-    ],
+    ] + bundled,
     hiddenimports=[
         '_cffi_backend',
     ],
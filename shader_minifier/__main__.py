@@ -4,27 +4,28 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import (
     QCommandLineParser,
     QCommandLineOption,
+    QTimer,
 )
 from sys import argv
-from shader_minifier.mainwindow import MainWindow
-from shader_minifier.watcher import Watcher
-from shader_minifier.version import Version
-from shader_minifier.scheduler import Scheduler
-from shader_minifier.entropy import Entropy
-from shader_minifier.vcs import VCS
 from typing import (
-    List,
     Optional,
+    List,
 )
 from pathlib import Path
 from platform import system
+from os import environ
 
 
 if __name__ == '__main__':
     application: QApplication = QApplication(argv)
 
     application.setApplicationName('pyshader_minifier')
-    application.setApplicationVersion(Version().describe())
+
+    # Describing the version runs git describe. Only do it before showing the
+    # window if the version was requested on the command line.
+    if '-v' in argv or '--version' in argv:
+        from shader_minifier.version import Version
+        application.setApplicationVersion(Version().describe())
 
     if system() == 'Windows':
         application.setStyle('Fusion')
@@ -35,94 +36,127 @@ if __name__ == '__main__':
     parser.addVersionOption()
     parser.addOption(QCommandLineOption(["b", "build"], "Command line that builds your intro and has linker output with entropy in stdout.", "command"))
     parser.addOption(QCommandLineOption(["w", "working-directory"], "Working directory to run the build command in.", "command"))
+    parser.addOption(QCommandLineOption(["t", "target"], "Path relative to the working directory that the minified shader is written to before building.", "path"))
+    parser.addOption(QCommandLineOption(["s", "auto-snapshot"], "Snapshot every minified version onto a dedicated git ref without touching the index."))
+    parser.addOption(QCommandLineOption(["I", "include-directory"], "Directory to search for #include files; may be given multiple times.", "directory"))
+    parser.addOption(QCommandLineOption(["mirror"], "Directory or file:// URL to look up shader_minifier and glslangValidator executables in before downloading them.", "location"))
+    parser.addOption(QCommandLineOption(["j", "max-processes"], "Maximum number of minifier, validator and build processes to run at once; by default, this adapts to CPU count, load and available memory.", "count"))
+    parser.addOption(QCommandLineOption(["validation"], "Validate the input, the output, both (default) or none of them with glslangValidator.", "none|input|output|both"))
+    parser.addOption(QCommandLineOption(["metrics-port"], "Serve pipeline metrics for Prometheus on http://localhost:<port>/metrics.", "port"))
+    parser.addOption(QCommandLineOption(["profile"], "Profile the GUI and all worker threads and write one snakeviz-compatible .prof file per thread to this directory on exit.", "directory"))
+    parser.addOption(QCommandLineOption(["profile-memory"], "With --profile, also take tracemalloc snapshots every this many seconds.", "seconds"))
+    parser.addOption(QCommandLineOption(["p", "process"], "Run the minify engine in a separate process to keep the user interface responsive."))
     parser.addPositionalArgument("file", "Shader source to watch.", "[file]")
     parser.process(application)
 
-    repository: Optional[VCS] = None
-    repository = VCS()
+    if parser.isSet("mirror"):
+        # In the environment, so that it also applies to the engine process.
+        from shader_minifier.mirror import Mirror
+        environ[Mirror.Variable] = parser.value("mirror")
+
+    if parser.isSet("max-processes"):
+        # In the environment, so that it also applies to the engine process.
+        from shader_minifier.governor import Governor
+        environ[Governor.Variable] = parser.value("max-processes")
+
+    if parser.isSet("profile"):
+        # Before any worker thread starts, so that all of them are profiled.
+        from shader_minifier.profiling import profiler
+        profiler.start(
+            Path(parser.value("profile")),
+            float(parser.value("profile-memory")) if parser.isSet("profile-memory") else None,
+            'gui-' if parser.isSet("process") else '',
+        )
+
+    # Show the window first; the pipeline modules (and pygit2) are loaded afterwards.
+    from shader_minifier.mainwindow import MainWindow
+    mainWindow: MainWindow = MainWindow()
+    mainWindow.show()
+    application.processEvents()
 
-    entropy: Entropy = Entropy(
+    from shader_minifier.version import Version
+    from shader_minifier.engine import Engine
+    from shader_minifier.remote import RemoteEngine
+    from shader_minifier.qtadapter import QtAdapter
+    from shader_minifier.vcs import CommitRecord
+    from shader_minifier.tracing import tracer
+
+    QTimer.singleShot(0, lambda: application.setApplicationVersion(Version().describe()))
+
+    engine: Engine = (RemoteEngine if parser.isSet("process") else Engine)(
         parser.value('build').split(' ') if parser.isSet('build') else None,
         Path(parser.value("working-directory")) if parser.isSet("working-directory") else None,
+        Path(parser.value("target")) if parser.isSet("target") else None,
+        parser.isSet("auto-snapshot"),
+        list(map(Path, parser.values("include-directory"))),
     )
-    watcher: Watcher = Watcher()
-    mainWindow: MainWindow = MainWindow()
-    scheduler: Scheduler = Scheduler()
+    # Relays engine callbacks from the worker threads into the GUI thread.
+    qt: QtAdapter = QtAdapter()
+
+    if parser.isSet("profile") and parser.isSet("process"):
+        engine.profile(
+            Path(parser.value("profile")),
+            float(parser.value("profile-memory")) if parser.isSet("profile-memory") else None,
+        )
+
+    if parser.isSet("validation"):
+        engine.changeValidation(parser.value("validation"))
 
     # Start the threads.
-    repository.start()
-    watcher.start()
-    entropy.start()
-    scheduler.start()
+    engine.start()
 
     # Connect repository.
-    repository.hasRepoChanged.connect(mainWindow.actionCommit.setEnabled)
+    qt(engine.repository.hasRepoChanged).connect(mainWindow.actionCommit.setEnabled)
+    qt(engine.repository.historyLoaded).connect(mainWindow.updateCommits)
 
     # Connect entropy.
-    entropy.built.connect(mainWindow.updateModelsFromEntropy)
+    qt(engine.entropy.built).connect(mainWindow.updateModelsFromEntropy)
 
     # Connect watcher.
-    watcher.fileLoaded.connect(mainWindow.fileChanged)
-    watcher.historyExported.connect(mainWindow.historyExported)
-    watcher.fileChanged.connect(mainWindow.updateModelsFromWatcher)
-    watcher.fileChanged.connect(lambda _watcher: scheduler.minifyShader(_watcher.latestHash, _watcher._versions[_watcher.latestHash]))
-    watcher.fileChanged.connect(lambda _watcher: entropy.determineEntropy(_watcher.latestHash))
+    qt(engine.watcher.fileLoaded).connect(mainWindow.fileChanged)
+    qt(engine.watcher.historyExported).connect(mainWindow.historyExported)
+    qt(engine.watcher.fileChanged).connect(mainWindow.updateModelsFromWatcher)
 
     # Connect scheduler.
-    scheduler.minifiersObtained.connect(watcher.updateFile)
-    scheduler.versionsUpdated.connect(mainWindow.updateModelsFromScheduler)
+    qt(engine.scheduler.versionsUpdated).connect(mainWindow.updateModelsFromScheduler)
 
     # Connect main window.
     def cleanup() -> None:
-        scheduler.stop()
-        entropy.stop()
-        watcher.stop()
-        repository.stop()
+        engine.stop()
 
-        scheduler._thread.join()
-        entropy._thread.join()
-        watcher._thread.join()
-        repository._thread.join()
+        if parser.isSet("profile"):
+            # With --process, the GUI process is profiled on its own.
+            for path in profiler.stop():
+                print("Wrote {}.".format(path))
 
         QApplication.exit(0)
 
-    def open(path: str) -> None:
-        if watcher.receivers(watcher.resetted) != 0:
-            watcher.resetted.disconnect()
-
-        if repository.receivers(repository.resetted) != 0:
-            repository.resetted.disconnect()
-
-        scheduler.resetted.connect(watcher.updateFile)
-
-        repository.resetted.connect(lambda path=path: repository.changeShader(Path(path)))
-
-        watcher.resetted.connect(lambda path=path: watcher.watchFile(path))
-        watcher.resetted.connect(lambda scheduler=scheduler: scheduler.reset())
-        watcher.resetted.connect(lambda repository=repository: repository.reset())
-        watcher.resetted.connect(lambda entropy=entropy: entropy.reset())
-
-        watcher.reset()
-
-    def changeMinifier(version: str) -> None:
-        scheduler.selectMinifier(version)
-        if watcher._path is not None:
-            open(str(watcher._path))
+    def loadCommit(commit: CommitRecord) -> None:
+        hash: Optional[str] = engine.loadCommit(commit)
+        if hash is None:
+            print("Error: Could not load commit {}.".format(commit.commit))
+            return
+        mainWindow.commitLoaded(commit.commit, hash)
 
     mainWindow.quitRequested.connect(cleanup)
-    mainWindow.exportRequested.connect(watcher.saveHistory)
-    mainWindow.commitRequested.connect(repository.createCommit)
-    mainWindow.minifierVersionRequested.connect(changeMinifier)
-    mainWindow.fileChangeRequested.connect(open)
+    mainWindow.exportRequested.connect(engine.saveHistory)
+    mainWindow.commitRequested.connect(engine.createCommit)
+    mainWindow.minifierVersionRequested.connect(engine.changeMinifier)
+    mainWindow.fileChangeRequested.connect(engine.open)
+    mainWindow.commitLoadRequested.connect(loadCommit)
+    mainWindow.metricsRequested.connect(lambda: mainWindow.updateMetrics(engine.metrics()))
+    mainWindow.traceExportRequested.connect(lambda filename: tracer.save(filename, engine.trace()))
+
+    if parser.isSet("metrics-port"):
+        from shader_minifier.metrics import serve
+        serve(int(parser.value("metrics-port")), engine.metrics)
 
     # Set up state from command line args.
     arguments: List[str] = parser.positionalArguments()
     if len(arguments) > 0:
-        open(arguments[0])
+        engine.open(arguments[0])
 
     if len(arguments) > 1:
         print("Warning: Ignoring additional positional CLI arguments: `{}`.".format(','.join(arguments[1:])))
 
-    mainWindow.show()
-
     QApplication.exit(application.exec())
@@ -0,0 +1,197 @@
+from typing import (
+    Self,
+    Optional,
+    List,
+    Dict,
+    Tuple,
+    Any,
+)
+from subprocess import (
+    Popen,
+    CompletedProcess,
+    PIPE,
+)
+from threading import Thread
+from platform import system
+from time import perf_counter
+from shader_minifier.metrics import metrics
+from shader_minifier.governor import governor
+
+if system() != 'Windows':
+    from os import (
+        wait4,
+        waitstatus_to_exitcode,
+    )
+
+
+def _communicate(
+    process: Popen,
+    input: Optional[bytes] = None,
+) -> Tuple[Optional[bytes], Optional[bytes]]:
+    """
+        Popen.communicate without waiting for the process: writes `input`
+        and reads the output pipes to their end, each in a thread, and
+        leaves the process to be reaped by the caller.
+    """
+    outputs: Dict[str, bytes] = {}
+
+    def write() -> None:
+        try:
+            if input is not None:
+                process.stdin.write(input)
+            process.stdin.close()
+        except BrokenPipeError:
+            # The process exited without reading all of its input.
+            pass
+
+    def read(name: str) -> None:
+        outputs[name] = getattr(process, name).read()
+        getattr(process, name).close()
+
+    threads: List[Thread] = []
+    if process.stdin is not None:
+        threads.append(Thread(target=write, name='Write stdin'))
+    for name in ['stdout', 'stderr']:
+        if getattr(process, name) is not None:
+            threads.append(Thread(target=read, args=[name], name='Read {}'.format(name)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return outputs.get('stdout'), outputs.get('stderr')
+
+
+def _reap(process: Popen) -> Optional[Any]:
+    """
+        Waits for `process` with wait4, which returns the resource usage of
+        the process and its reaped children, and sets its return code.
+        Returns the resource usage, or None on Windows.
+    """
+    if system() == 'Windows':
+        process.wait()
+        return None
+
+    try:
+        _, status, rusage = wait4(process.pid, 0)
+    except ChildProcessError:
+        # Reaped elsewhere, e.g. with SIGCHLD ignored; like Popen.
+        process.returncode = 0
+        return None
+    process.returncode = waitstatus_to_exitcode(status)
+    return rusage
+
+
+# ru_maxrss is in kilobytes, except on macOS.
+MaxRSSUnit: int = 1 if system() == 'Darwin' else 1024
+
+
+def account(
+    job: str,
+    version: Optional[str],
+    wall: float,
+    rusage: Optional[Any],
+) -> None:
+    labels: Dict[str, str] = {'job': job}
+    if version is not None:
+        labels['version'] = version
+
+    metrics.observe('subprocess_seconds', wall, clock='wall', **labels)
+    if rusage is not None:
+        metrics.observe('subprocess_seconds', rusage.ru_utime, clock='user', **labels)
+        metrics.observe('subprocess_seconds', rusage.ru_stime, clock='system', **labels)
+        metrics.maximum('subprocess_peak_rss_bytes', rusage.ru_maxrss * MaxRSSUnit, **labels)
+        governor.record(job, rusage.ru_maxrss * MaxRSSUnit)
+
+
+def run(
+    args: Any,
+    job: str,
+    version: Optional[str] = None,
+    input: Optional[bytes] = None,
+    capture_output: bool = False,
+    **kwargs: Any,
+) -> CompletedProcess:
+    """
+        subprocess.run that records wall time, user and system CPU time and
+        peak RSS of the process as metrics, labelled with `job` and
+        `version`. The process only starts once the governor admits it.
+    """
+    if capture_output:
+        kwargs['stdout'] = PIPE
+        kwargs['stderr'] = PIPE
+    if input is not None:
+        kwargs['stdin'] = PIPE
+
+    with governor.slot(job, version):
+        start: float = perf_counter()
+        with Popen(args, **kwargs) as process:
+            try:
+                stdout, stderr = _communicate(process, input)
+                rusage: Optional[Any] = _reap(process)
+            except:
+                process.kill()
+                raise
+    account(job, version, perf_counter() - start, rusage)
+
+    return CompletedProcess(process.args, process.returncode, stdout, stderr)
+
+
+def resources(snapshot: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+        Aggregates the subprocess metrics of `snapshot` per job and version:
+        number of processes, total wall, user and system time, peak RSS and
+        total time spent waiting for the governor.
+    """
+    rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def row(labels: Dict[str, str]) -> Dict[str, Any]:
+        key: Tuple[str, str] = (labels['job'], labels.get('version', ''))
+        if key not in rows:
+            rows[key] = {
+                'job': key[0],
+                'version': key[1],
+                'count': 0,
+                'wall': 0.,
+                'user': 0.,
+                'system': 0.,
+                'wait': 0.,
+                'peak_rss': None,
+            }
+        return rows[key]
+
+    for timing in snapshot['timings']:
+        if timing['name'] == 'subprocess_seconds':
+            clock: str = timing['labels']['clock']
+            row(timing['labels'])[clock] = timing['sum']
+            if clock == 'wall':
+                row(timing['labels'])['count'] = timing['count']
+        elif timing['name'] == 'governor_wait_seconds':
+            row(timing['labels'])['wait'] = timing['sum']
+    for gauge in snapshot['gauges']:
+        if gauge['name'] == 'subprocess_peak_rss_bytes':
+            row(gauge['labels'])['peak_rss'] = int(gauge['value'])
+
+    return [rows[key] for key in sorted(rows)]
+
+
+def report(rows: List[Dict[str, Any]]) -> str:
+    """
+        Formats the rows of `resources` as a table.
+    """
+    lines: List[str] = ['{:<10} {:<8} {:>6} {:>10} {:>10} {:>10} {:>10} {:>10} {:>14}'.format(
+        'job', 'version', 'count', 'wall [s]', 'user [s]', 'system [s]', 'cpu/wall', 'wait [s]', 'peak RSS [MB]',
+    )]
+    for row in rows:
+        lines.append('{:<10} {:<8} {:>6} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.2f} {:>14}'.format(
+            row['job'],
+            row['version'],
+            row['count'],
+            row['wall'],
+            row['user'],
+            row['system'],
+            (row['user'] + row['system']) / row['wall'] if row['wall'] > 0 else 0.,
+            row['wait'],
+            '{:.1f}'.format(row['peak_rss'] / 2 ** 20) if row['peak_rss'] is not None else 'Unavailable',
+        ))
+    return '\n'.join(lines)
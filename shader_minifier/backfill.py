@@ -0,0 +1,326 @@
+from typing import (
+    Self,
+    Optional,
+    List,
+    Dict,
+    Set,
+    Any,
+)
+from pygit2 import (
+    Repository,
+    Commit,
+    Oid,
+    Walker,
+    GIT_SORT_TIME,
+    GIT_SORT_REVERSE,
+)
+from pathlib import Path
+from json import (
+    loads,
+    dumps,
+)
+from datetime import datetime
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    Future,
+    as_completed,
+)
+from argparse import (
+    ArgumentParser,
+    Namespace,
+)
+from os import cpu_count
+from time import monotonic
+from traceback import print_exc
+from shader_minifier.minifier import (
+    MinifierVersion,
+    shader_minifier,
+    ObtainmentStrategy,
+    ShaderMinifierError,
+    ValidationError,
+    ValidationPolicy,
+)
+from shader_minifier.entropy import Entropy
+
+
+class Backfill:
+    """
+        Size and entropy timeline of a shader over every commit that touched
+        it. Identical blobs are minified once, and the report is written
+        incrementally so an interrupted or outdated backfill can be resumed.
+    """
+    GitRepositorySuffix: str = '.git'
+    RefPrefixes: List[str] = ['refs/heads/', 'refs/pyshader/']
+    # Seconds between intermediate report writes.
+    SaveInterval: float = 2.
+
+    def __init__(
+        self: Self,
+        shader: Path,
+        report: Path,
+        version: MinifierVersion = MinifierVersion.v1_4_0,
+        entropy: Optional[Entropy] = None,
+        jobs: Optional[int] = None,
+        minifier: Optional[shader_minifier] = None,
+    ) -> None:
+        """
+            `minifier` must have `version`; by default, it is downloaded
+            once there is something to minify.
+        """
+        self._shader: Path = Path(shader).absolute()
+        self._reportPath: Path = Path(report)
+        self._version: MinifierVersion = version
+        self._entropy: Optional[Entropy] = entropy
+        self._jobs: int = jobs if jobs is not None else cpu_count()
+        self._minifier: Optional[shader_minifier] = minifier
+
+        self._path: Optional[Path] = None
+        path: Path = self._shader
+        while path.parent != path:
+            if (path / Backfill.GitRepositorySuffix).exists():
+                self._path = path
+                break
+            path = path.parent
+
+        if self._path is None:
+            raise FileNotFoundError('No git repository found above {}.'.format(self._shader))
+
+        self._repository: Repository = Repository(str(self._path))
+        self._relativePath: str = self._shader.relative_to(self._path).as_posix()
+
+        self._report: Dict[str, Any] = self._loadReport()
+        self._lastSave: float = monotonic()
+
+    def _loadReport(self: Self) -> Dict[str, Any]:
+        if self._reportPath.exists():
+            report: Dict[str, Any] = loads(self._reportPath.read_text())
+            if report['shader'] == self._relativePath:
+                return report
+
+            print("Warning: Report {} belongs to shader {}. Starting over.".format(self._reportPath, report['shader']))
+
+        return {
+            'shader': self._relativePath,
+            'tips': [],
+            'commits': [],
+            'blobs': {},
+            'versions': {},
+        }
+
+    def save(self: Self) -> None:
+        temporary: Path = self._reportPath.with_name(self._reportPath.name + '.tmp')
+        temporary.write_text(dumps(self._report, indent=4))
+        temporary.replace(self._reportPath)
+        self._lastSave = monotonic()
+
+    def _saveIfDue(self: Self) -> None:
+        if monotonic() - self._lastSave >= Backfill.SaveInterval:
+            self.save()
+
+    def _tips(self: Self) -> List[Oid]:
+        tips: Set[Oid] = set()
+        if not self._repository.head_is_unborn:
+            tips.add(self._repository.head.target)
+
+        for name in self._repository.references:
+            if any(map(lambda prefix: name.startswith(prefix), Backfill.RefPrefixes)):
+                target: Any = self._repository.references[name].resolve().target
+                if isinstance(self._repository[target], Commit):
+                    tips.add(target)
+
+        return list(tips)
+
+    def _blob(self: Self, commit: Commit) -> Optional[str]:
+        if self._relativePath not in commit.tree:
+            return None
+        return str(commit.tree[self._relativePath].id)
+
+    def enumerate(self: Self) -> int:
+        """
+            Add commits that changed the shader since the last run to the
+            report. Returns the number of new commits.
+        """
+        tips: List[Oid] = self._tips()
+        if len(tips) == 0:
+            return 0
+
+        walker: Walker = self._repository.walk(tips[0], GIT_SORT_TIME | GIT_SORT_REVERSE)
+        for tip in tips[1:]:
+            walker.push(tip)
+
+        # Everything reachable from previously processed tips is in the report already.
+        for tip in self._report['tips']:
+            if Oid(hex=tip) in self._repository:
+                walker.hide(Oid(hex=tip))
+
+        known: Set[str] = set(map(lambda commit: commit['commit'], self._report['commits']))
+        count: int = 0
+        for commit in walker:
+            if str(commit.id) in known:
+                continue
+
+            blob: Optional[str] = self._blob(commit)
+            if blob is None:
+                continue
+
+            # Only commits that changed the shader are relevant.
+            if len(commit.parents) != 0 and all(map(lambda parent: self._blob(parent) == blob, commit.parents)):
+                continue
+
+            self._report['commits'].append({
+                'commit': str(commit.id),
+                'time': datetime.fromtimestamp(commit.commit_time).isoformat(),
+                'blob': blob,
+            })
+            if blob not in self._report['blobs']:
+                self._report['blobs'][blob] = {
+                    'size': self._repository[blob].size,
+                }
+            count += 1
+
+        self._report['commits'].sort(key=lambda commit: commit['time'])
+        self._report['tips'] = list(map(str, tips))
+        return count
+
+    def _obtainMinifier(self: Self) -> shader_minifier:
+        if self._minifier is None:
+            self._minifier = shader_minifier(self._version, ObtainmentStrategy.Download)
+        return self._minifier
+
+    def _minify(
+        self: Self,
+        minifier: shader_minifier,
+        source: str,
+    ) -> Dict[str, Any]:
+        try:
+            # Inputs are validated in bulk before; see `run`.
+            minified: str = minifier.minify(source, validation=ValidationPolicy.Output)
+            return {
+                'minified': len(minified),
+                'output': minified,
+            }
+        except (ShaderMinifierError, ValidationError) as error:
+            return {
+                'error': str(error),
+            }
+
+    def run(self: Self) -> Dict[str, Any]:
+        """
+            Enumerate new commits, minify every blob that has no result for
+            the selected version yet and optionally build them for entropy.
+        """
+        self.enumerate()
+        self.save()
+
+        versionName: str = self._version.name
+        results: Dict[str, Dict[str, Any]] = self._report['versions'].setdefault(versionName, {})
+        pending: List[str] = list(filter(
+            lambda blob: blob not in results,
+            self._report['blobs'],
+        ))
+
+        outputs: Dict[str, str] = {}
+        if len(pending) != 0:
+            minifier: shader_minifier = self._obtainMinifier()
+
+            # Read on this thread; the repository is not shared with the workers.
+            sources: Dict[str, str] = {
+                blob: self._repository[blob].data.decode('utf-8')
+                for blob in pending
+            }
+
+            # One glslangValidator run validates many blobs instead of one run each.
+            errors: Dict[str, Optional[ValidationError]] = minifier.validateMany(sources)
+            for blob, error in errors.items():
+                if error is not None:
+                    results[blob] = {
+                        'error': str(error),
+                    }
+            pending = list(filter(lambda blob: errors[blob] is None, pending))
+
+            with ThreadPoolExecutor(max_workers=self._jobs) as executor:
+                futures: Dict[Future, str] = {
+                    executor.submit(self._minify, minifier, sources[blob]): blob
+                    for blob in pending
+                }
+                for future in as_completed(futures):
+                    blob: str = futures[future]
+                    result: Dict[str, Any] = future.result()
+                    if 'output' in result:
+                        outputs[blob] = result.pop('output')
+                    results[blob] = result
+                    self._saveIfDue()
+
+        if self._entropy is not None:
+            # Builds share one build tree, so they run one after another.
+            for blob, result in results.items():
+                if 'error' in result or 'entropy' in result:
+                    continue
+
+                if blob not in outputs:
+                    outputs[blob] = self._minify(
+                        self._obtainMinifier(),
+                        self._repository[blob].data.decode('utf-8'),
+                    ).get('output')
+                if outputs[blob] is None:
+                    continue
+
+                try:
+                    entropy: Optional[float] = self._entropy.build(outputs[blob])
+                    # Failed builds are not stored, so that the next run retries them.
+                    if entropy is not None:
+                        result['entropy'] = entropy
+                except:
+                    print_exc()
+                    result['entropy'] = 'Errored'
+                self._saveIfDue()
+
+        self.save()
+        return self._report
+
+    def timeline(self: Self) -> List[Dict[str, Any]]:
+        """
+            Returns time, commit, raw size, minified size and entropy of every
+            commit that touched the shader, in chronological order.
+        """
+        results: Dict[str, Dict[str, Any]] = self._report['versions'].get(self._version.name, {})
+        return list(map(
+            lambda commit: {
+                'time': commit['time'],
+                'commit': commit['commit'],
+                'size': self._report['blobs'][commit['blob']]['size'],
+                'minified': results.get(commit['blob'], {}).get('minified'),
+                'entropy': results.get(commit['blob'], {}).get('entropy'),
+            },
+            self._report['commits'],
+        ))
+
+
+def main() -> int:
+    parser: ArgumentParser = ArgumentParser(description="Backfill the minified size and entropy timeline of a shader from its git history.")
+    parser.add_argument('shader', type=Path, help="Shader source inside a git repository.")
+    parser.add_argument('report', type=Path, help="JSON report to create or extend.")
+    parser.add_argument('-m', '--minifier', default=MinifierVersion.v1_4_0.name, choices=[version.name for version in MinifierVersion if version != MinifierVersion.unavailable], help="shader_minifier version to use.")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="Number of parallel minifications.")
+    parser.add_argument('-b', '--build', default=None, help="Command line that builds your intro and has linker output with entropy in stdout.")
+    parser.add_argument('-w', '--working-directory', type=Path, default=None, help="Working directory to run the build command in.")
+    parser.add_argument('-t', '--target', type=Path, default=None, help="Path relative to the working directory that the minified shader is written to before building.")
+    arguments: Namespace = parser.parse_args()
+
+    backfill: Backfill = Backfill(
+        arguments.shader,
+        arguments.report,
+        MinifierVersion[arguments.minifier],
+        Entropy(arguments.build.split(' '), arguments.working_directory, arguments.target) if arguments.build is not None else None,
+        arguments.jobs,
+    )
+    backfill.run()
+
+    for entry in backfill.timeline():
+        print("{time} {commit:.8} {size:>8} {minified!s:>8} {entropy!s:>10}".format(**entry))
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
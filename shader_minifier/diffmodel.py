@@ -17,6 +17,7 @@ from typing import (
     Any,
     Self,
     List,
+    Tuple,
     Optional,
 )
 from shader_minifier.watcher import Watcher
@@ -47,6 +48,8 @@ class DiffModel(QAbstractTableModel):
         self._font: QFont = QFont("Monospace")
         self._font.setStyleHint(QFont.StyleHint.TypeWriter)
         self._minified: bool = True
+        # What the current diff was determined from.
+        self._diffKey: Optional[Tuple[Any, ...]] = None
 
     def updateWatcher(self: Self, watcher: Watcher) -> None:
         self.beginResetModel()
@@ -74,6 +77,7 @@ class DiffModel(QAbstractTableModel):
 
     def _updateColors(self: Self) -> None:
         self.beginResetModel()
+        self._diffKey = None
         self._determineDiff()
         self.endResetModel()
 
@@ -87,6 +91,21 @@ class DiffModel(QAbstractTableModel):
             self._watcher.latestHash in self._scheduler._versions,
         ]:
             return
+
+        # Outputs are content-addressed; only diff if an input of the diff changed.
+        key: Tuple[Any, ...] = (self._minified, self._key(self._referenceSHA), self._key(self._watcher.latestHash))
+        if key == self._diffKey:
+            return
+        self._diffKey = key
+
+        if self._minified and self._scheduler.sameOutput(self._referenceSHA, self._watcher.latestHash):
+            self._original = self._scheduler._versions[self._referenceSHA].splitlines()
+            self._new = self._original
+            self._diff = []
+            self._filteredDiff = []
+            self._rowHeaders = []
+            self._colors = []
+            return
         
         # TODO: Can we make this code block more maintainable?
         if self._minified:
@@ -153,6 +172,14 @@ class DiffModel(QAbstractTableModel):
         ))
             
 
+    def _key(self: Self, hash: str) -> Any:
+        result: Any = self._scheduler._versions[hash]
+        if type(result) != str:
+            return result
+        if self._minified:
+            return self._scheduler.outputHash(hash) or hash
+        return hash
+
     def rowCount(
         self: Self,
         parent: QModelIndex = QModelIndex(),
@@ -0,0 +1,297 @@
+from typing import (
+    Self,
+    Optional,
+    List,
+    Dict,
+    Tuple,
+    Callable,
+    Any,
+)
+from pathlib import Path
+from argparse import (
+    ArgumentParser,
+    Namespace,
+)
+from time import sleep
+from os import environ
+from shader_minifier.signals import BoundSignal
+from shader_minifier.metrics import (
+    metrics,
+    serve,
+)
+from shader_minifier.tracing import tracer
+from shader_minifier.accounting import (
+    resources,
+    report,
+)
+from shader_minifier.profiling import profiler
+from shader_minifier.mirror import Mirror
+from shader_minifier.governor import Governor
+from shader_minifier.minifier import (
+    MinifierVersion,
+    ValidationPolicy,
+    shader_minifier,
+)
+from shader_minifier.watcher import Watcher
+from shader_minifier.scheduler import Scheduler
+from shader_minifier.entropy import Entropy
+from shader_minifier.vcs import (
+    VCS,
+    CommitRecord,
+)
+
+
+class Engine:
+    """
+        The Qt-free minify pipeline: Watcher -> Scheduler -> Entropy and VCS.
+        Components communicate through plain callbacks that run in their
+        worker threads; GUIs relay them to their own thread.
+    """
+
+    def __init__(
+        self: Self,
+        buildCommand: Optional[List[str]] = None,
+        home: Optional[Path] = None,
+        target: Optional[Path] = None,
+        autoSnapshot: bool = False,
+        includeDirectories: Optional[List[Path]] = None,
+        minifiers: Optional[Dict[MinifierVersion, shader_minifier]] = None,
+    ) -> None:
+        self._repository: VCS = VCS(autoSnapshot=autoSnapshot)
+        self._entropy: Entropy = Entropy(buildCommand, home, target)
+        self._watcher: Watcher = Watcher(includeDirectories)
+        self._scheduler: Scheduler = Scheduler(minifiers)
+        self._openSlots: List[Tuple[BoundSignal, Callable[..., Any]]] = []
+
+        self._watcher.fileChanged.connect(lambda watcher: self._scheduler.minifyShader(
+            watcher.latestHash,
+            watcher._versions[watcher.latestHash],
+            watcher.normalizedHash(watcher.latestHash),
+        ))
+        self._scheduler.minifiersObtained.connect(self._watcher.updateFile)
+        self._scheduler.minified.connect(self._entropy.determineEntropy)
+        self._scheduler.minified.connect(lambda hash, minified: self._repository.snapshot(hash, self._watcher._versions[hash], len(minified)))
+        self._scheduler.switched.connect(self._minifierSwitched)
+
+    @property
+    def repository(self: Self) -> VCS:
+        return self._repository
+
+    @property
+    def entropy(self: Self) -> Entropy:
+        return self._entropy
+
+    @property
+    def watcher(self: Self) -> Watcher:
+        return self._watcher
+
+    @property
+    def scheduler(self: Self) -> Scheduler:
+        return self._scheduler
+
+    def start(self: Self) -> None:
+        self._repository.start()
+        self._watcher.start()
+        self._entropy.start()
+        self._scheduler.start()
+
+    def stop(self: Self) -> None:
+        self._scheduler.stop()
+        self._entropy.stop()
+        self._watcher.stop()
+        self._repository.stop()
+
+        self._scheduler._thread.join()
+        self._entropy._thread.join()
+        self._watcher._thread.join()
+        self._repository._thread.join()
+
+        for path in profiler.stop():
+            print("Wrote {}.".format(path))
+
+    def open(self: Self, path: Any) -> None:
+        """
+            Reset the pipeline and watch the shader at `path`.
+        """
+        # Only replace the slots of the previous `open`; others stay connected.
+        for signal, slot in self._openSlots:
+            signal.disconnect(slot)
+
+        self._openSlots = [
+            (self._scheduler.resetted, self._minifyLatest),
+            (self._repository.resetted, lambda path=path: self._repository.changeShader(Path(path))),
+            (self._watcher.resetted, lambda path=path: self._watcher.watchFile(path)),
+            (self._watcher.resetted, self._scheduler.reset),
+            (self._watcher.resetted, self._repository.reset),
+            (self._watcher.resetted, self._entropy.reset),
+        ]
+        for signal, slot in self._openSlots:
+            signal.connect(slot)
+
+        self._watcher.reset()
+
+    def _minifyLatest(self: Self) -> None:
+        # The scheduler drops queued saves on reset, possibly the first save of the new shader.
+        latestHash: Optional[str] = self._watcher.latestHash
+        if latestHash is not None and latestHash not in self._scheduler._versions:
+            self._scheduler.minifyShader(latestHash, self._watcher._versions[latestHash], self._watcher.normalizedHash(latestHash))
+        self._watcher.updateFile()
+
+    def changeMinifier(self: Self, version: str) -> None:
+        """
+            Switch the minifier version and keep the history. Cached results
+            of the version show up immediately; the latest save is minified
+            first and the rest of the history in the background.
+        """
+        self._scheduler.selectMinifier(version)
+
+    def _minifierSwitched(self: Self, version: MinifierVersion) -> None:
+        # Runs in the scheduler thread, which does not change the results meanwhile.
+        self._entropy.remap(dict(self._scheduler._outputHashes))
+
+        latestHash: Optional[str] = self._watcher.latestHash
+        if latestHash is None:
+            return
+
+        if latestHash not in self._scheduler._versions:
+            self._scheduler.minifyShader(latestHash, self._watcher._versions[latestHash], self._watcher.normalizedHash(latestHash))
+        elif type(self._scheduler._versions[latestHash]) == str:
+            # Built before if the output is unchanged; then the entropy is known immediately.
+            self._entropy.determineEntropy(latestHash, self._scheduler._versions[latestHash])
+
+        # Newest saves first.
+        hashes: List[str] = list(dict.fromkeys(reversed(list(self._watcher._history.values()))))
+        self._scheduler.backfill(version, list(map(
+            lambda hash: (hash, self._watcher._versions[hash], self._watcher.normalizedHash(hash)),
+            filter(lambda hash: hash not in self._scheduler._versions and hash != latestHash, hashes),
+        )))
+
+    def changeValidation(self: Self, policy: str) -> None:
+        self._scheduler.selectValidation(policy)
+
+    def createCommit(
+        self: Self,
+        hash: str,
+        size: int,
+        entropy: Optional[Any] = None,
+    ) -> None:
+        self._repository.createCommit(hash, size, entropy)
+
+    def saveHistory(self: Self, filename: Any) -> None:
+        self._watcher.saveHistory(filename)
+
+    def metrics(self: Self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+            Returns a snapshot of the timings, queue depths and counters of
+            the pipeline.
+        """
+        return metrics.snapshot()
+
+    def resources(self: Self) -> List[Dict[str, Any]]:
+        """
+            Returns wall time, CPU time and peak RSS of the minifier,
+            validator and build processes per job and minifier version.
+        """
+        return resources(self.metrics())
+
+    def profile(
+        self: Self,
+        directory: Path,
+        interval: Optional[float] = None,
+        prefix: str = '',
+    ) -> None:
+        """
+            Profiles the calling thread and all threads started afterwards,
+            so call it before `start`. With `interval`, also takes memory
+            snapshots every `interval` seconds. `stop` writes the profiles,
+            which snakeviz opens, to `directory`.
+        """
+        profiler.start(directory, interval, prefix)
+
+    def trace(self: Self) -> List[Dict[str, Any]]:
+        """
+            Returns the traced stages of the saves as Chrome trace events.
+        """
+        return tracer.events()
+
+    def loadCommit(self: Self, commit: CommitRecord) -> str:
+        """
+            Load the source of a crunch commit, minify it if needed and
+            return its hash.
+        """
+        hash: str = self._watcher.addVersion(self._repository.loadCommit(commit))
+        if hash not in self._scheduler._versions:
+            self._scheduler.minifyShader(hash, self._watcher._versions[hash])
+        return hash
+
+
+def main() -> int:
+    parser: ArgumentParser = ArgumentParser(description="Watch a shader and print minified sizes and entropy without a GUI.")
+    parser.add_argument('shader', type=Path, help="Shader source to watch.")
+    parser.add_argument('-m', '--minifier', default=None, help="shader_minifier version to use, e.g. v1_4_0.")
+    parser.add_argument('--mirror', default=None, help="Directory or file:// URL to look up shader_minifier and glslangValidator executables in before downloading them; see `python -m shader_minifier.prefetch`.")
+    parser.add_argument('-j', '--max-processes', type=int, default=None, help="Maximum number of minifier, validator and build processes to run at once; by default, this adapts to CPU count, load and available memory.")
+    parser.add_argument('--validation', choices=list(map(str, ValidationPolicy)), default=None, help="Validate the input, the output, both (default) or none of them with glslangValidator.")
+    parser.add_argument('-b', '--build', default=None, help="Command line that builds your intro and has linker output with entropy in stdout.")
+    parser.add_argument('-w', '--working-directory', type=Path, default=None, help="Working directory to run the build command in.")
+    parser.add_argument('-t', '--target', type=Path, default=None, help="Path relative to the working directory that the minified shader is written to before building.")
+    parser.add_argument('-s', '--auto-snapshot', action='store_true', help="Snapshot every minified version onto a dedicated git ref without touching the index.")
+    parser.add_argument('-I', '--include-directory', type=Path, action='append', default=[], help="Directory to search for #include files; may be given multiple times.")
+    parser.add_argument('--metrics-port', type=int, default=None, help="Serve pipeline metrics for Prometheus on http://localhost:<port>/metrics.")
+    parser.add_argument('--trace', type=Path, default=None, help="Write a Chrome trace of all saves to this file on exit; open it in chrome://tracing or ui.perfetto.dev.")
+    parser.add_argument('--profile', type=Path, default=None, help="Profile all threads and write one snakeviz-compatible .prof file per thread to this directory on exit.")
+    parser.add_argument('--profile-memory', type=float, default=None, help="With --profile, also take tracemalloc snapshots every this many seconds.")
+    arguments: Namespace = parser.parse_args()
+
+    if arguments.mirror is not None:
+        # In the environment, so that it also applies to spawned engine processes.
+        environ[Mirror.Variable] = arguments.mirror
+    if arguments.max_processes is not None:
+        environ[Governor.Variable] = str(arguments.max_processes)
+
+    engine: Engine = Engine(
+        arguments.build.split(' ') if arguments.build is not None else None,
+        arguments.working_directory,
+        arguments.target,
+        arguments.auto_snapshot,
+        arguments.include_directory,
+    )
+    if arguments.minifier is not None:
+        engine.scheduler.selectMinifier(arguments.minifier)
+    if arguments.validation is not None:
+        engine.changeValidation(arguments.validation)
+
+    engine.scheduler.minified.connect(lambda hash, minified: print("{} minified to {} bytes.".format(hash, len(minified))))
+    engine.scheduler.errored.connect(lambda hash, error: print("{} errored:\n{}".format(hash, error)))
+    engine.entropy.built.connect(lambda entropy: print("Entropy: {}".format(
+        entropy.entropy(engine.watcher.latestHash) if entropy.hasEntropy(engine.watcher.latestHash) else 'Unavailable',
+    )))
+
+    if arguments.metrics_port is not None:
+        serve(arguments.metrics_port, engine.metrics)
+
+    if arguments.profile is not None:
+        engine.profile(arguments.profile, arguments.profile_memory)
+
+    engine.start()
+    engine.open(arguments.shader)
+
+    try:
+        while True:
+            sleep(1)
+    except KeyboardInterrupt:
+        pass
+
+    engine.stop()
+
+    if len(engine.resources()) != 0:
+        print(report(engine.resources()))
+
+    if arguments.trace is not None:
+        tracer.save(arguments.trace, engine.trace())
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -2,27 +2,27 @@ from typing import (
     Self,
     Optional,
     List,
-    Tuple,
     Dict,
+    Any,
 )
 from enum import (
     IntEnum,
     auto,
 )
-from subprocess import (
-    run,
-    CompletedProcess,
-)
+from subprocess import CompletedProcess
 from pathlib import Path
 from parse import parse
 from threading import Thread
 from queue import Queue
-from PyQt6.QtCore import (
-    QObject,
-    pyqtSignal,
-    QVariant,
+from shader_minifier.signals import Signal
+from shader_minifier.metrics import metrics
+from shader_minifier.tracing import tracer
+from shader_minifier.scheduler import Scheduler
+from shader_minifier import accounting
+from time import (
+    sleep,
+    perf_counter,
 )
-from time import sleep
 from traceback import print_exc
 
 
@@ -32,24 +32,27 @@ class LinkerType(IntEnum):
     Cold = auto()
 
 
-class Entropy(QObject):
+class Entropy:
     FPS = 10
-    built: pyqtSignal = pyqtSignal(QVariant)
-    stopped: pyqtSignal = pyqtSignal()
+    built: Signal = Signal(object)
+    stopped: Signal = Signal()
 
     def __init__(
         self: Self,
         buildCommand: Optional[List[str]] = None,
         home: Optional[Path] = None,
+        target: Optional[Path] = None,
     ) -> None:
-        super().__init__()
-
         self._buildCommand: Optional[List[str]] = buildCommand
         self._home: Path = home if home is not None else Path('.')
-        
+        self._target: Optional[Path] = target
+
+        # Source hash -> minified output hash.
+        self._outputs: Dict[str, str] = {}
+        # Minified output hash -> entropy.
         self._versions: Dict[str, float] = {}
 
-        self._thread: Thread = Thread(target=self._run)
+        self._thread: Thread = Thread(target=self._run, name='Entropy')
         self._queue: Queue = Queue()
         self._running: bool = True
         self._reset: bool = False
@@ -66,59 +69,52 @@ class Entropy(QObject):
             if self._reset:
                 while self._queue.qsize() != 0:
                     self._queue.get()
+                self._outputs = {}
                 self._versions = {}
                 self._reset = False
 
             while self._queue.qsize() != 0:
-                hash = self._queue.get()
-
-                if self._buildCommand is not None:
-                    try:
-                        result: Optional[CompletedProcess] = run(
-                            self._buildCommand,
-                            cwd=self._home,
-                            capture_output=True,
-                        )
-
-                        if result.returncode == 0:
-                            data_size: Optional[float] = None
-                            parsed: bool = False
-
-                            # Attempt to parse Cold output format.
-                            try:
-                                lines: List[str] = list(filter(
-                                    lambda line: "Entropy" in line.lstrip(),
-                                    result.stderr.decode('utf-8').strip().splitlines(),
-                                ))
-                                [data_size, _, _] = parse(
-                                    "\x1b[1m\x1b[32m==>\x1b[0m\x1b[1m Entropy: {} + {} = {}\x1b[0m",
-                                    lines[0],
-                                )
-                                parsed = True
-                            except:
-                                pass
-
-                            # Attempt to parse Crinkler output format.
-                            lines: List[str] = list(filter(
-                                lambda line: line.lstrip().startswith("Ideal compressed size of data:"),
-                                result.stdout.decode('utf-8').strip().splitlines(),
-                            ))
-                            if len(lines) != 0:
-                                [data_size] = parse(
-                                    "Ideal compressed size of data: {}",
-                                    lines[0].lstrip().rstrip(),
-                                )
-                                parsed = True
-
-                            if not parsed:
-                                print("Could not parse build output:")
-                                print(result.stdout.decode('utf-8').strip())
-                                print(result.stderr.decode('utf-8').strip())
-
-                            self._versions[hash] = data_size
-                    except:
-                        print_exc()
-                        self._versions[hash] = 'Errored'
+                hash, minified, queued = self._queue.get()
+                if hash is None:
+                    # A remap; builds are shared by output hash, so built outputs keep their entropy.
+                    self._outputs = {
+                        hash: outputHash
+                        for hash, outputHash in minified.items()
+                        if outputHash in self._versions
+                    }
+                    self.built.emit(self)
+                    continue
+
+                started: float = perf_counter()
+                metrics.set('entropy_queue_depth', self._queue.qsize())
+                metrics.observe('entropy_queue_wait_seconds', started - queued)
+                tracer.record('entropy.wait', queued, started, hash)
+
+                if self._buildCommand is None:
+                    continue
+
+                with tracer.span('entropy.build', hash):
+                    # Same key as the outputs of the scheduler.
+                    outputHash: str = Scheduler.hashOutput(minified)
+                    self._outputs[hash] = outputHash
+
+                    # Identical minified outputs share one build.
+                    if outputHash not in self._versions:
+                        metrics.increment('entropy_cache_total', result='miss')
+                        try:
+                            with metrics.time('entropy_build_seconds'):
+                                entropy: Optional[float] = self.build(minified)
+                            # Failed builds are not cached, so that a later save retries them.
+                            if entropy is not None:
+                                self._versions[outputHash] = entropy
+                            else:
+                                metrics.increment('entropy_build_errors_total')
+                        except:
+                            print_exc()
+                            metrics.increment('entropy_build_errors_total')
+                            self._versions[outputHash] = 'Errored'
+                    else:
+                        metrics.increment('entropy_cache_total', result='hit')
                     self.built.emit(self)
 
             sleep(1./Entropy.FPS)
@@ -127,8 +123,81 @@ class Entropy(QObject):
 
         return 0
 
-    def determineEntropy(self: Self, sha256: str) -> Optional[Tuple[int, int, int]]:
-        self._queue.put(sha256)
+    def build(self: Self, minified: Optional[str] = None) -> Optional[float]:
+        """
+            Inject the minified source into the build tree, run the build
+            command and return the parsed entropy, or None if it could not
+            be determined.
+        """
+        if minified is not None and self._target is not None:
+            (self._home / self._target).write_text(minified)
+
+        result: Optional[CompletedProcess] = accounting.run(
+            self._buildCommand,
+            'build',
+            cwd=self._home,
+            capture_output=True,
+        )
+
+        if result.returncode != 0:
+            return None
+
+        data_size: Optional[float] = None
+        parsed: bool = False
+
+        # Attempt to parse Cold output format.
+        try:
+            lines: List[str] = list(filter(
+                lambda line: "Entropy" in line.lstrip(),
+                result.stderr.decode('utf-8').strip().splitlines(),
+            ))
+            [data_size, _, _] = parse(
+                "\x1b[1m\x1b[32m==>\x1b[0m\x1b[1m Entropy: {} + {} = {}\x1b[0m",
+                lines[0],
+            )
+            parsed = True
+        except:
+            pass
+
+        # Attempt to parse Crinkler output format.
+        lines: List[str] = list(filter(
+            lambda line: line.lstrip().startswith("Ideal compressed size of data:"),
+            result.stdout.decode('utf-8').strip().splitlines(),
+        ))
+        if len(lines) != 0:
+            [data_size] = parse(
+                "Ideal compressed size of data: {}",
+                lines[0].lstrip().rstrip(),
+            )
+            parsed = True
+
+        if not parsed:
+            print("Could not parse build output:")
+            print(result.stdout.decode('utf-8').strip())
+            print(result.stderr.decode('utf-8').strip())
+
+        return data_size
+
+    def determineEntropy(self: Self, hash: str, minified: str) -> None:
+        self._queue.put((hash, minified, perf_counter()))
+        metrics.set('entropy_queue_depth', self._queue.qsize())
+
+    def remap(self: Self, outputHashes: Dict[str, str]) -> None:
+        """
+            Map source hashes to other minified outputs, e.g. those of
+            another minifier version. Applied in order with queued builds.
+        """
+        self._queue.put((None, outputHashes, perf_counter()))
+
+    def hasEntropy(self: Self, hash: str) -> bool:
+        return hash in self._outputs and self._outputs[hash] in self._versions
+
+    def entropy(self: Self, hash: str) -> Any:
+        """
+            Returns the entropy of the build containing the minified output
+            of the source with the given hash.
+        """
+        return self._versions[self._outputs[hash]]
 
     def reset(self: Self) -> None:
         self._reset = True
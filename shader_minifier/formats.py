@@ -0,0 +1,55 @@
+from typing import (
+    Dict,
+    List,
+    NamedTuple,
+)
+from re import (
+    compile,
+    Pattern,
+)
+
+# `# define VAR_TIME "f"`: the new name of an exported uniform.
+DefinePattern: Pattern = compile(r'^\s*#\s*define\s+(\w+)\s+"([^"]*)"\s*$')
+# `const char *shader_frag =` or `const char shader_frag[] =`.
+DeclarationPattern: Pattern = compile(r'^\s*const\s+char\s*\*?\s*(\w+)(?:\[\])?\s*=')
+StringPattern: Pattern = compile(r'"((?:[^"\\]|\\.)*)"')
+EscapePattern: Pattern = compile(r'\\(.)')
+Escapes: Dict[str, str] = {'n': '\n', 't': '\t', 'r': '\r', '0': '\0'}
+
+
+class CVariables(NamedTuple):
+    """
+        Contents of shader_minifier's C variables output: the renamed
+        uniforms by macro name and the minified code by variable name.
+    """
+    names: Dict[str, str]
+    shaders: Dict[str, str]
+
+
+def parseCVariables(header: str) -> CVariables:
+    """
+        Parses the C variables output of shader_minifier. The code of each
+        shader is the concatenation of its string literals.
+    """
+    names: Dict[str, str] = {}
+    shaders: Dict[str, List[str]] = {}
+    current: List[str] = []
+    for line in header.splitlines():
+        stripped: str = line.strip()
+        define = DefinePattern.match(stripped)
+        if define is not None:
+            names[define.group(1)] = define.group(2)
+            continue
+        if stripped.startswith('#') or stripped.startswith('//') or stripped.startswith('/*') or stripped.startswith('*'):
+            continue
+
+        declaration = DeclarationPattern.match(stripped)
+        if declaration is not None:
+            current = shaders.setdefault(declaration.group(1), [])
+            stripped = stripped[declaration.end():]
+        current += map(
+            lambda literal: EscapePattern.sub(lambda match: Escapes.get(match.group(1), match.group(1)), literal),
+            StringPattern.findall(stripped),
+        )
+
+    return CVariables(names, {name: ''.join(literals) for name, literals in shaders.items()})
@@ -0,0 +1,187 @@
+from typing import (
+    Self,
+    Optional,
+    Dict,
+    Tuple,
+    Callable,
+    Iterator,
+    NamedTuple,
+)
+from threading import Condition
+from contextlib import contextmanager
+from math import ceil
+from time import perf_counter
+from os import (
+    cpu_count,
+    environ,
+)
+from pathlib import Path
+from shader_minifier.metrics import metrics
+
+
+class Decision(NamedTuple):
+    """
+        Inputs and outcome of one recomputation of the limits. `load` and
+        `memory` (available bytes) are None where they cannot be measured.
+    """
+    cpus: int
+    load: Optional[float]
+    memory: Optional[int]
+    total: int
+    limits: Dict[str, int]
+
+
+def probe() -> Tuple[int, Optional[float], Optional[int]]:
+    """
+        Returns the CPU count, the 1 minute load average and the available
+        memory in bytes of this machine.
+    """
+    try:
+        from os import getloadavg
+        load: Optional[float] = getloadavg()[0]
+    except (ImportError, OSError):
+        # Not on Windows.
+        load = None
+
+    memory: Optional[int] = None
+    try:
+        for line in Path('/proc/meminfo').read_text().splitlines():
+            if line.startswith('MemAvailable:'):
+                memory = int(line.split()[1]) * 1024
+                break
+    except OSError:
+        # Only on Linux.
+        pass
+
+    return cpu_count() or 1, load, memory
+
+
+class Governor:
+    """
+        Limits how many subprocesses run at once, in total and per job. The
+        total follows the CPUs left over by other processes; each job gets
+        a share of it, further limited by how many of its processes fit
+        into available memory. Jobs can always run one process, even beyond
+        the total, so that e.g. a long build does not block validation.
+        Limits are recomputed at most every `Interval`
+        seconds and published as metrics.
+    """
+    # Maximum number of concurrent subprocesses, also for spawned engine processes.
+    Variable: str = 'SHADER_MINIFIER_MAX_PROCESSES'
+    Interval: float = .5
+    # Fractions of the total per job; jobs not listed get all of it.
+    Shares: Dict[str, float] = {
+        'minify': 1.,
+        'validate': 1.,
+        'build': .5,
+    }
+    # Peak RSS per process before any was measured. The .NET runtime of
+    # shader_minifier and linkers like Crinkler need much more than glslangValidator.
+    Footprints: Dict[str, int] = {
+        'minify': 200 * 2 ** 20,
+        'validate': 50 * 2 ** 20,
+        'build': 500 * 2 ** 20,
+    }
+    DefaultFootprint: int = 100 * 2 ** 20
+    # Memory that is left to everything else.
+    Reserve: int = 512 * 2 ** 20
+
+    def __init__(
+        self: Self,
+        probe: Callable[[], Tuple[int, Optional[float], Optional[int]]] = probe,
+    ) -> None:
+        self._probe: Callable[[], Tuple[int, Optional[float], Optional[int]]] = probe
+        self._condition: Condition = Condition()
+        self._running: Dict[str, int] = {}
+        self._footprints: Dict[str, int] = {}
+        self._decision: Optional[Decision] = None
+        self._decided: float = 0.
+
+    def footprint(self: Self, job: str) -> int:
+        return self._footprints.get(job, Governor.Footprints.get(job, Governor.DefaultFootprint))
+
+    def record(self: Self, job: str, peak: int) -> None:
+        """
+            Records the peak RSS in bytes of a finished process of `job`;
+            the largest one is its footprint from then on.
+        """
+        with self._condition:
+            self._footprints[job] = max(self._footprints.get(job, 0), peak)
+
+    def _decide(self: Self) -> Decision:
+        cpus, load, memory = self._probe()
+        running: int = sum(self._running.values())
+
+        total: int = cpus
+        if load is not None:
+            # The load includes our own processes; only leave the rest to others.
+            total = max(1, round(cpus - max(0., load - running)))
+        if environ.get(Governor.Variable, '') != '':
+            total = max(1, min(total, int(environ[Governor.Variable])))
+
+        limits: Dict[str, int] = {}
+        for job in set(Governor.Shares) | set(self._running):
+            limit: int = ceil(total * Governor.Shares.get(job, 1.))
+            if memory is not None:
+                # Available memory excludes the processes that already run.
+                limit = min(limit, self._running.get(job, 0) + max(0, memory - Governor.Reserve) // self.footprint(job))
+            limits[job] = max(1, limit)
+
+        for job, limit in limits.items():
+            metrics.set('governor_limit', limit, job=job)
+        metrics.set('governor_limit', total, job='total')
+        return Decision(cpus, load, memory, total, limits)
+
+    def decision(self: Self) -> Decision:
+        """
+            Returns the current limits and what they were derived from.
+        """
+        with self._condition:
+            if self._decision is None or perf_counter() - self._decided >= Governor.Interval:
+                self._decision = self._decide()
+                self._decided = perf_counter()
+            return self._decision
+
+    def _admits(self: Self, job: str) -> bool:
+        decision: Decision = self.decision()
+        if self._running.get(job, 0) == 0:
+            return True
+        if sum(self._running.values()) >= decision.total:
+            return False
+        return self._running.get(job, 0) < decision.limits.get(job, max(1, decision.total))
+
+    @contextmanager
+    def slot(
+        self: Self,
+        job: str,
+        version: Optional[str] = None,
+    ) -> Iterator[None]:
+        """
+            Waits until a process of `job` may run, and holds its place for
+            the `with` block. The wait is observed with `job` and `version`
+            labels, like the subprocess metrics of accounting.
+        """
+        labels: Dict[str, str] = {'job': job}
+        if version is not None:
+            labels['version'] = version
+
+        start: float = perf_counter()
+        with self._condition:
+            while not self._admits(job):
+                # Also wakes up to follow changes of load and memory.
+                self._condition.wait(Governor.Interval)
+            self._running[job] = self._running.get(job, 0) + 1
+            metrics.set('governor_running', self._running[job], job=job)
+        metrics.observe('governor_wait_seconds', perf_counter() - start, **labels)
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._running[job] -= 1
+                metrics.set('governor_running', self._running[job], job=job)
+                self._condition.notify_all()
+
+
+# Process-wide governor of all subprocesses started by accounting.run.
+governor: Governor = Governor()
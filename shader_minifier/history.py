@@ -0,0 +1,293 @@
+from typing import (
+    Self,
+    Optional,
+    List,
+    Dict,
+    Tuple,
+    Any,
+)
+from enum import IntEnum
+from itertools import islice
+from datetime import datetime
+from numpy import (
+    ndarray,
+    full,
+    zeros,
+    arange,
+    argsort,
+    argpartition,
+    flatnonzero,
+    isnan,
+    nan,
+    nanmin,
+    nanmedian,
+    nanmean,
+    count_nonzero,
+    float64,
+    int64,
+    int8,
+)
+from shader_minifier.watcher import Watcher
+from shader_minifier.scheduler import Scheduler
+from shader_minifier.entropy import Entropy
+
+
+class Status(IntEnum):
+    Pending = 0
+    Minified = 1
+    Errored = 2
+
+
+class HistoryStore:
+    """
+        Per-hash metrics of a session in NumPy columns: raw size, minified
+        size, ratio, entropy and minify time, plus the status of each hash.
+        History rows index into them. `update` only reads what the
+        components added since the last update; their dicts only grow
+        until they are replaced on reset. Missing values are NaN.
+    """
+    Columns: List[str] = ['size', 'minified', 'ratio', 'entropy', 'seconds']
+    InitialCapacity: int = 1024
+
+    def __init__(self: Self) -> None:
+        self._watcher: Optional[Watcher] = None
+        self._scheduler: Optional[Scheduler] = None
+        self._entropy: Optional[Entropy] = None
+        self.clear()
+
+    def clear(self: Self) -> None:
+        self._hashes: List[str] = []
+        self._indices: Dict[str, int] = {}
+        self._columns: Dict[str, ndarray] = {
+            column: full(HistoryStore.InitialCapacity, nan, dtype=float64)
+            for column in HistoryStore.Columns
+        }
+        self._status: ndarray = zeros(HistoryStore.InitialCapacity, dtype=int8)
+        # Index of the distinct minified output of each hash, or -1.
+        self._outputs: Dict[str, int] = {}
+        self._output: ndarray = full(HistoryStore.InitialCapacity, -1, dtype=int64)
+
+        # History row -> hash index.
+        self._times: List[datetime] = []
+        self._rows: ndarray = zeros(HistoryStore.InitialCapacity, dtype=int64)
+
+        # Dicts of the components read so far and how many of their items.
+        self._read: Dict[str, Any] = {}
+        # Entropy output hash -> indices of hashes whose build is pending.
+        self._builds: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def _grow(array: ndarray, size: int, fill: Any) -> ndarray:
+        if size <= len(array):
+            return array
+        grown: ndarray = full(max(size, 2 * len(array)), fill, dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def _new(self: Self, name: str, dictionary: Dict[Any, Any]) -> Tuple[bool, List[Any]]:
+        """
+            Returns whether `dictionary` was replaced since it was last read,
+            and the items to read: all if it was replaced, else the new ones.
+        """
+        previous, read = self._read.get(name, (None, 0))
+        replaced: bool = previous is not dictionary or len(dictionary) < read
+        if replaced:
+            read = 0
+        while True:
+            try:
+                # Walks back from the newest item, so only the new items are
+                # touched. Copied at once; the worker threads keep adding
+                # items, which fails the copy if they do so in between.
+                items: List[Any] = list(islice(reversed(dictionary.items()), len(dictionary) - read))
+                break
+            except RuntimeError:
+                continue
+        items.reverse()
+        self._read[name] = (dictionary, read + len(items))
+        return replaced, items
+
+    def update(
+        self: Self,
+        watcher: Optional[Watcher],
+        scheduler: Optional[Scheduler],
+        entropy: Optional[Entropy],
+    ) -> None:
+        self._watcher = watcher
+        self._scheduler = scheduler
+        self._entropy = entropy
+
+        if watcher is not None:
+            replaced, history = self._new('history', watcher._history)
+            if replaced:
+                read: Any = self._read['history']
+                self.clear()
+                self._read['history'] = read
+            for time, hash in history:
+                self._append(time, hash)
+
+        if scheduler is not None:
+            replaced, results = self._new('results', scheduler._versions)
+            if replaced:
+                self._status[:len(self._hashes)] = Status.Pending
+                self._output[:len(self._hashes)] = -1
+                self._outputs = {}
+                for column in ['minified', 'ratio', 'seconds']:
+                    self._columns[column][:len(self._hashes)] = nan
+            for hash, _ in results:
+                if hash in self._indices:
+                    self._result(self._indices[hash])
+
+        if entropy is not None:
+            replacedOutputs, outputs = self._new('outputs', entropy._outputs)
+            replacedBuilds, builds = self._new('builds', entropy._versions)
+            if replacedOutputs or replacedBuilds:
+                # Read all outputs again; their finished builds are looked up directly.
+                self._columns['entropy'][:len(self._hashes)] = nan
+                self._builds = {}
+                del self._read['outputs']
+                _, outputs = self._new('outputs', entropy._outputs)
+                builds = []
+            for hash, _ in outputs:
+                if hash in self._indices:
+                    self._build(self._indices[hash])
+            for output, value in builds:
+                for index in self._builds.pop(output, []):
+                    self._columns['entropy'][index] = HistoryStore._number(value)
+
+    def _append(self: Self, time: datetime, hash: str) -> None:
+        if hash not in self._indices:
+            index: int = len(self._hashes)
+            self._indices[hash] = index
+            self._hashes.append(hash)
+            for column in HistoryStore.Columns:
+                self._columns[column] = HistoryStore._grow(self._columns[column], index + 1, nan)
+            self._status = HistoryStore._grow(self._status, index + 1, Status.Pending)
+            self._output = HistoryStore._grow(self._output, index + 1, -1)
+
+            self._columns['size'][index] = len(self._watcher._versions[hash])
+            self._result(index)
+            self._build(index)
+
+        self._rows = HistoryStore._grow(self._rows, len(self._times) + 1, 0)
+        self._rows[len(self._times)] = self._indices[hash]
+        self._times.append(time)
+
+    def _result(self: Self, index: int) -> None:
+        hash: str = self._hashes[index]
+        if self._scheduler is None or hash not in self._scheduler._versions:
+            return
+
+        minified: Any = self._scheduler._versions[hash]
+        if type(minified) == str:
+            self._status[index] = Status.Minified
+            self._columns['minified'][index] = len(minified)
+            self._columns['ratio'][index] = len(minified) / self._columns['size'][index]
+            self._output[index] = self._outputs.setdefault(self._scheduler.outputHash(hash), len(self._outputs))
+        else:
+            self._status[index] = Status.Errored
+        self._columns['seconds'][index] = self._scheduler._durations.get(hash, nan)
+
+    def _build(self: Self, index: int) -> None:
+        hash: str = self._hashes[index]
+        if self._entropy is None or hash not in self._entropy._outputs:
+            return
+
+        output: str = self._entropy._outputs[hash]
+        if output in self._entropy._versions:
+            self._columns['entropy'][index] = HistoryStore._number(self._entropy._versions[output])
+        else:
+            self._builds.setdefault(output, []).append(index)
+
+    @staticmethod
+    def _number(value: Any) -> float:
+        # Failed builds have 'Errored' or None as entropy.
+        return float(value) if isinstance(value, (int, float)) else nan
+
+    def rowCount(self: Self) -> int:
+        return len(self._times)
+
+    def hash(self: Self, row: int) -> str:
+        return self._hashes[self._rows[row]]
+
+    def time(self: Self, row: int) -> datetime:
+        return self._times[row]
+
+    def status(self: Self, row: int) -> Status:
+        return Status(self._status[self._rows[row]])
+
+    def unchanged(self: Self, row: int) -> bool:
+        """
+            Returns whether the save of `row` minified to the same output as
+            the save before it.
+        """
+        if row == 0:
+            return False
+        output: int = self._output[self._rows[row]]
+        return bool(output != -1 and output == self._output[self._rows[row - 1]])
+
+    def value(self: Self, column: str, row: int) -> float:
+        return float(self._columns[column][self._rows[row]])
+
+    def values(self: Self, column: str) -> ndarray:
+        """
+            Returns the values of `column` of all history rows.
+        """
+        return self._columns[column][self._rows[:len(self._times)]]
+
+    def order(
+        self: Self,
+        column: Optional[str] = None,
+        descending: bool = False,
+    ) -> ndarray:
+        """
+            Returns the history rows sorted by `column`, or in history order
+            without a column. Missing values come last; equal values keep
+            their history order.
+        """
+        if column is None:
+            rows: ndarray = arange(len(self._times))
+            return rows[::-1] if descending else rows
+
+        values: ndarray = self.values(column)
+        return argsort(-values if descending else values, kind='stable')
+
+    def best(
+        self: Self,
+        count: int,
+        column: str = 'minified',
+    ) -> ndarray:
+        """
+            Returns the history rows with the `count` smallest values of
+            `column`, smallest first, in O(n + count log count).
+        """
+        values: ndarray = self.values(column)
+        rows: ndarray = flatnonzero(~isnan(values))
+        if count < len(rows):
+            rows = rows[argpartition(values[rows], count)[:count]]
+        return rows[argsort(values[rows], kind='stable')]
+
+    def summary(self: Self) -> Dict[str, Any]:
+        """
+            Returns statistics over the distinct hashes of the session.
+        """
+        count: int = len(self._hashes)
+        status: ndarray = self._status[:count]
+        summary: Dict[str, Any] = {
+            'saves': len(self._times),
+            'hashes': count,
+            'outputs': len(self._outputs),
+            'minified': int(count_nonzero(status == Status.Minified)),
+            'errored': int(count_nonzero(status == Status.Errored)),
+            'pending': int(count_nonzero(status == Status.Pending)),
+        }
+        for column, statistics in [
+            ('minified', [('min', nanmin), ('median', nanmedian)]),
+            ('ratio', [('min', nanmin), ('mean', nanmean)]),
+            ('entropy', [('min', nanmin)]),
+            ('seconds', [('mean', nanmean)]),
+        ]:
+            values: ndarray = self._columns[column][:count]
+            valid: bool = count_nonzero(~isnan(values)) != 0
+            for name, statistic in statistics:
+                summary['{}_{}'.format(column, name)] = float(statistic(values)) if valid else None
+        return summary
@@ -0,0 +1,232 @@
+from typing import (
+    Self,
+    Optional,
+    List,
+    Dict,
+    Set,
+    Tuple,
+    Union,
+    NamedTuple,
+)
+from pathlib import Path
+from os.path import normpath
+from hashlib import sha256
+from re import (
+    compile,
+    Pattern,
+    Match,
+)
+from threading import RLock
+from shader_minifier.monitor import (
+    FileSignature,
+    signature,
+)
+from shader_minifier.metrics import metrics
+
+
+class IncludeError(Exception):
+    pass
+
+
+class Include(NamedTuple):
+    name: str
+    # Whether the include uses <angle brackets>, which skips the including file's directory.
+    system: bool
+
+
+class Expansion(NamedTuple):
+    # Source with all includes expanded.
+    source: str
+    # sha256 of the expanded source.
+    hash: str
+    # Every file the expansion was assembled from, including the root, with its content hash.
+    files: Dict[Path, str]
+
+
+class IncludeResolver:
+    """
+        Expands `#include` directives and records which file includes which.
+        Files are only re-read when their (size, mtime, inode) signature
+        changed, parsed once per content hash, and expansions are reused as
+        long as none of the files they were assembled from changed.
+    """
+    IncludePattern: Pattern = compile(r'^[ \t]*#[ \t]*include[ \t]*(?:"([^"]+)"|<([^>]+)>)[ \t]*(?://.*)?$')
+    PragmaOncePattern: Pattern = compile(r'^[ \t]*#[ \t]*pragma[ \t]+once[ \t]*$')
+
+    def __init__(
+        self: Self,
+        includeDirectories: Optional[List[Path]] = None,
+    ) -> None:
+        self._includeDirectories: List[Path] = list(map(
+            lambda directory: Path(directory).absolute(),
+            includeDirectories if includeDirectories is not None else [],
+        ))
+        self._lock: RLock = RLock()
+
+        # File -> signature and content hash when it was last read.
+        self._files: Dict[Path, Tuple[FileSignature, str]] = {}
+        # Content hash -> text chunks and includes.
+        self._parsed: Dict[str, List[Union[str, Include]]] = {}
+        # Content hash -> whether the file contains `#pragma once`.
+        self._once: Dict[str, bool] = {}
+        # Root file -> its latest expansion.
+        self._expansions: Dict[Path, Expansion] = {}
+        # Root file that failed to expand -> files read so far and candidate paths of missing includes.
+        self._unresolved: Dict[Path, List[Path]] = {}
+
+        # Dependency graph: file -> files it includes directly, and the reverse.
+        self._dependencies: Dict[Path, Set[Path]] = {}
+        self._dependents: Dict[Path, Set[Path]] = {}
+
+    def _read(self: Self, path: Path) -> str:
+        """
+            Returns the content hash of a file, parsing it if it is new.
+        """
+        fileSignature: Optional[FileSignature] = signature(path)
+        if fileSignature is None:
+            raise IncludeError('Could not read {}.'.format(path))
+
+        if path in self._files and self._files[path][0] == fileSignature:
+            return self._files[path][1]
+
+        data: bytes = path.read_bytes()
+        hash: str = sha256(data).digest().hex()
+        self._files[path] = (fileSignature, hash)
+
+        if hash not in self._parsed:
+            chunks: List[Union[str, Include]] = []
+            text: List[str] = []
+            once: bool = False
+            for line in data.decode('utf-8').splitlines(keepends=True):
+                match: Optional[Match] = IncludeResolver.IncludePattern.match(line.rstrip('\r\n'))
+                if match is not None:
+                    chunks.append(''.join(text))
+                    text = []
+                    chunks.append(Include(match[1] or match[2], match[2] is not None))
+                elif IncludeResolver.PragmaOncePattern.match(line.rstrip('\r\n')) is not None:
+                    once = True
+                else:
+                    text.append(line)
+            chunks.append(''.join(text))
+            self._parsed[hash] = chunks
+            self._once[hash] = once
+
+        return hash
+
+    def _locate(
+        self: Self,
+        include: Include,
+        includer: Path,
+        missing: Set[Path],
+    ) -> Path:
+        directories: List[Path] = ([] if include.system else [includer.parent]) + self._includeDirectories
+        # Normalized, so that a file is known by one path however it is included.
+        candidates: List[Path] = list(map(lambda directory: Path(normpath(directory / include.name)), directories))
+        for candidate in candidates:
+            if candidate.is_file():
+                return candidate
+
+        # The include is found once one of them is created.
+        missing.update(candidates)
+        raise IncludeError('{}: Could not find include "{}".'.format(includer, include.name))
+
+    def _expand(
+        self: Self,
+        path: Path,
+        files: Dict[Path, str],
+        missing: Set[Path],
+        stack: List[Path],
+        output: List[str],
+    ) -> None:
+        if path in stack:
+            raise IncludeError('Include cycle: {}.'.format(' -> '.join(map(str, stack + [path]))))
+
+        hash: str = self._read(path)
+        if path in files and self._once[hash]:
+            return
+        files[path] = hash
+
+        dependencies: Set[Path] = set()
+        for chunk in self._parsed[hash]:
+            if isinstance(chunk, Include):
+                dependency: Path = self._locate(chunk, path, missing)
+                dependencies.add(dependency)
+                self._expand(dependency, files, missing, stack + [path], output)
+            else:
+                output.append(chunk)
+                # Keep the includer's next line from joining the last line of an include.
+                if len(stack) != 0 and len(chunk) != 0 and not chunk.endswith('\n'):
+                    output.append('\n')
+
+        for dependency in self._dependencies.get(path, set()) - dependencies:
+            self._dependents[dependency].discard(path)
+        for dependency in dependencies:
+            self._dependents.setdefault(dependency, set()).add(path)
+        self._dependencies[path] = dependencies
+
+    def _current(self: Self, expansion: Expansion) -> bool:
+        for path, hash in expansion.files.items():
+            try:
+                if self._read(path) != hash:
+                    return False
+            except IncludeError:
+                return False
+        return True
+
+    def expand(self: Self, path: Path) -> Expansion:
+        """
+            Returns the translation unit of `path` with all includes expanded.
+        """
+        path = Path(path).absolute()
+        with self._lock:
+            if path in self._expansions and self._current(self._expansions[path]):
+                metrics.increment('include_cache_total', result='hit')
+                return self._expansions[path]
+            metrics.increment('include_cache_total', result='miss')
+
+            files: Dict[Path, str] = {}
+            missing: Set[Path] = set()
+            output: List[str] = []
+            try:
+                self._expand(path, files, missing, [], output)
+            except IncludeError:
+                self._expansions.pop(path, None)
+                self._unresolved[path] = list(dict.fromkeys([path] + list(files) + sorted(missing)))
+                raise
+            self._unresolved.pop(path, None)
+            source: str = ''.join(output)
+
+            self._expansions[path] = Expansion(
+                source,
+                sha256(source.encode('utf-8')).digest().hex(),
+                files,
+            )
+            return self._expansions[path]
+
+    def dependencies(self: Self, path: Path) -> List[Path]:
+        """
+            Returns all files the latest expansion of `path` was assembled
+            from. If it failed, these are the files read until then and the
+            paths where a missing include would be found.
+        """
+        path = Path(path).absolute()
+        with self._lock:
+            if path in self._expansions:
+                return list(self._expansions[path].files)
+            return self._unresolved.get(path, [path])
+
+    def affected(self: Self, path: Path) -> Set[Path]:
+        """
+            Returns `path` and every file that includes it, directly or not.
+        """
+        path = Path(path).absolute()
+        with self._lock:
+            affected: Set[Path] = set()
+            pending: List[Path] = [path]
+            while len(pending) != 0:
+                current: Path = pending.pop()
+                if current in affected:
+                    continue
+                affected.add(current)
+                pending.extend(self._dependents.get(current, set()))
+            return affected
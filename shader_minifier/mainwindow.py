@@ -8,6 +8,7 @@ from PyQt6.QtCore import (
     QItemSelectionModel,
     QModelIndex,
     QVariant,
+    QTimer,
 )
 from PyQt6.QtWidgets import (
     QMainWindow,
@@ -18,6 +19,10 @@ from PyQt6.QtWidgets import (
     QHeaderView,
     QComboBox,
     QToolBar,
+    QDockWidget,
+    QMenu,
+    QSpinBox,
+    QLabel,
 )
 from PyQt6.QtGui import (
     QAction,
@@ -29,6 +34,9 @@ from typing import (
     Self,
     Optional,
     List,
+    Dict,
+    Any,
+    TYPE_CHECKING,
 )
 from importlib.resources import files
 from importlib.abc import Traversable
@@ -38,8 +46,11 @@ from shader_minifier.watcher import Watcher
 from shader_minifier.versionmodel import VersionModel
 from shader_minifier.scheduler import Scheduler
 from shader_minifier.diffmodel import DiffModel
+from shader_minifier.metricsmodel import MetricsModel
 from shader_minifier.entropy import Entropy
 from shader_minifier.minifier import MinifierVersion
+if TYPE_CHECKING:
+    from shader_minifier.vcs import CommitRecord
 
 
 class MainWindow(QMainWindow):
@@ -47,14 +58,23 @@ class MainWindow(QMainWindow):
     IconFile: Traversable = files(shader_minifier) / 'team210.ico'
 
     SupportedExportFileTypes: str = "All Supported Files (*.json);;JSON files (*.json)"
+    SupportedTraceFileTypes: str = "Chrome trace files (*.json)"
     SupportedFileTypes: str = "All Supported Files (*.glsl *.frag *.vert *.geom *.tess *.hlsl);;Shader files (*.glsl *.frag *.vert *.geom *.tess *.hlsl)"
 
     quitRequested: pyqtSignal = pyqtSignal()
     fileChangeRequested: pyqtSignal = pyqtSignal(str)
     exportRequested: pyqtSignal = pyqtSignal(str)
+    traceExportRequested: pyqtSignal = pyqtSignal(str)
     # hash, size, entropy
     commitRequested: pyqtSignal = pyqtSignal(str, int, QVariant)
     minifierVersionRequested: pyqtSignal = pyqtSignal(str)
+    # Crunch commit whose source should be loaded.
+    commitLoadRequested: pyqtSignal = pyqtSignal(QVariant)
+    # Emitted periodically while the statistics are shown.
+    metricsRequested: pyqtSignal = pyqtSignal()
+
+    # Milliseconds between statistics updates.
+    MetricsInterval: int = 1000
 
     def __init__(
         self: Self,
@@ -72,6 +92,9 @@ class MainWindow(QMainWindow):
         self.actionExport_History: QAction
         self.actionExport_History.triggered.connect(self.exportHistory)
 
+        self.actionExport_Trace: QAction
+        self.actionExport_Trace.triggered.connect(self.exportTrace)
+
         self.actionOpen: QAction
         self.actionOpen.triggered.connect(self.open)
 
@@ -95,6 +118,9 @@ class MainWindow(QMainWindow):
         self.versionView: QTableView
         self.versionView.setModel(self._versionModel)
         self.versionView.selectionModel().selectionChanged.connect(self.versionSelectionChanged)
+        # Start in history order; clicking the SHA256 header restores it.
+        self.versionView.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.versionView.setSortingEnabled(True)
 
         self._diffModel: DiffModel = DiffModel(self)
 
@@ -119,6 +145,46 @@ class MainWindow(QMainWindow):
         self.toolBar: QToolBar
         self.toolBar.addWidget(self.minifierComboBox)
 
+        self.bestSpinBox: QSpinBox = QSpinBox(self)
+        self.bestSpinBox.setRange(0, 10000)
+        self.bestSpinBox.setPrefix("Best ")
+        self.bestSpinBox.setSpecialValueText("All saves")
+        self.bestSpinBox.setToolTip("Only show the saves with the smallest minified sizes.")
+        self.bestSpinBox.valueChanged.connect(self._versionModel.showBest)
+        self.toolBar.addWidget(self.bestSpinBox)
+
+        self.summaryLabel: QLabel = QLabel(self)
+        self.statusBar().addPermanentWidget(self.summaryLabel)
+
+        self._metricsModel: MetricsModel = MetricsModel(self)
+
+        self.statisticsView: QTableView
+        self.statisticsView.setModel(self._metricsModel)
+        self.statisticsView.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+
+        # Only poll the metrics while they are visible.
+        self._metricsTimer: QTimer = QTimer(self)
+        self._metricsTimer.setInterval(MainWindow.MetricsInterval)
+        self._metricsTimer.timeout.connect(self.metricsRequested.emit)
+
+        self.statisticsDockWidget: QDockWidget
+        self.statisticsDockWidget.visibilityChanged.connect(self._statisticsVisibilityChanged)
+        self.statisticsDockWidget.hide()
+
+        self.menuView: QMenu
+        self.menuView.addAction(self.dockWidget.toggleViewAction())
+        self.menuView.addAction(self.statisticsDockWidget.toggleViewAction())
+
+    def _statisticsVisibilityChanged(self: Self, visible: bool) -> None:
+        if visible:
+            self.metricsRequested.emit()
+            self._metricsTimer.start()
+        else:
+            self._metricsTimer.stop()
+
+    def updateMetrics(self: Self, snapshot: Dict[str, List[Dict[str, Any]]]) -> None:
+        self._metricsModel.updateMetrics(snapshot)
+
     def minifierSelected(self: Self) -> None:
         self.minifierVersionRequested.emit(self.minifierComboBox.currentText())
 
@@ -167,10 +233,42 @@ class MainWindow(QMainWindow):
         self.statusBar().clearMessage()
         self.statusBar().showMessage("Finished exporting history to {}.".format(filename), 2000)
 
+    def exportTrace(self: Self) -> None:
+        settings: QSettings = QSettings()
+        filename, _ = QFileDialog.getSaveFileName(
+            self,
+            'Export trace as...',
+            settings.value("save_path", QDir.homePath()),
+            MainWindow.SupportedTraceFileTypes,
+        )
+
+        if filename == "":
+            return
+
+        file_info = QFileInfo(filename)
+        settings.setValue("save_path", file_info.absoluteDir().absolutePath())
+
+        self.traceExportRequested.emit(filename)
+        self.statusBar().showMessage("Exported trace to {}.".format(filename), 2000)
+
     def updateModelsFromWatcher(self: Self, watcher: Watcher) -> None:
         self._versionModel.updateWatcher(watcher)
         self._diffModel.updateWatcher(watcher)
         self._updateSelection()
+        self._updateSummary()
+
+    def _updateSummary(self: Self) -> None:
+        summary: Dict[str, Any] = self._versionModel.summary()
+        if summary['minified_min'] is None:
+            self.summaryLabel.setText("{} saves, {} errors".format(summary['saves'], summary['errored']))
+            return
+
+        self.summaryLabel.setText("{} saves, {} errors, best {:.0f} bytes, median {:.0f} bytes".format(
+            summary['saves'],
+            summary['errored'],
+            summary['minified_min'],
+            summary['minified_median'],
+        ))
     
     def _updateSelection(self: Self) -> None:
         if self._diffModel._referenceSHA is None:
@@ -184,6 +282,7 @@ class MainWindow(QMainWindow):
         self._versionModel.updateScheduler(scheduler)
         self._diffModel.updateScheduler(scheduler)
         self._updateSelection()
+        self._updateSummary()
 
     def updateModelsFromEntropy(self: Self, entropy: Entropy) -> None:
         self._versionModel.updateEntropy(entropy)
@@ -197,9 +296,23 @@ class MainWindow(QMainWindow):
         if len(selected.indexes()) < 1:
             return
         
-        selectedSHA: str = self._versionModel.data(self._versionModel.index(selected.indexes()[0].row(), 0))
+        row: int = selected.indexes()[0].row()
+        selectedSHA: Optional[str] = self._versionModel.hash(row)
+        if selectedSHA is None:
+            # Crunch commits are only loaded once they are needed for a diff.
+            self.commitLoadRequested.emit(QVariant(self._versionModel.commit(row)))
+            return
+
         self._diffModel.updateReferenceSHA(selectedSHA)
 
+    def updateCommits(self: Self, commits: List['CommitRecord']) -> None:
+        self._versionModel.updateCommits(commits)
+        self._updateSelection()
+
+    def commitLoaded(self: Self, commit: str, hash: str) -> None:
+        self._versionModel.updateCommitHash(commit, hash)
+        self._diffModel.updateReferenceSHA(hash)
+
     def closeEvent(
         self: Self,
         _: Optional[QCloseEvent],
@@ -216,7 +329,7 @@ class MainWindow(QMainWindow):
         self.commitRequested.emit(
             self._versionModel._watcher.latestHash,
             len(self._versionModel._watcher._versions[self._versionModel._watcher.latestHash]),
-            QVariant(self._versionModel._entropy._versions[self._versionModel._watcher.latestHash] if self._versionModel._watcher.latestHash in self._versionModel._entropy._versions else QVariant('Errored'))
+            QVariant(self._versionModel._entropy.entropy(self._versionModel._watcher.latestHash) if self._versionModel._entropy.hasEntropy(self._versionModel._watcher.latestHash) else QVariant('Errored'))
         )
 
     def minified(self: Self) -> None:
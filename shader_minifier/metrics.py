@@ -0,0 +1,225 @@
+from typing import (
+    Self,
+    Optional,
+    List,
+    Dict,
+    Set,
+    Tuple,
+    Callable,
+    Iterator,
+    Any,
+)
+from threading import Lock
+from contextlib import contextmanager
+from time import perf_counter
+from bisect import bisect_left
+
+# Metric name and sorted label items.
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Metrics:
+    """
+        Thread-safe registry of counters, gauges and timings of the minify
+        pipeline. `snapshot` returns plain data that can be sent between
+        processes; `prometheus` renders a snapshot in the Prometheus text
+        exposition format.
+    """
+    Prefix: str = 'pyshader_'
+    # Upper bounds of the timing histogram buckets in seconds.
+    Buckets: List[float] = [.001, .005, .01, .025, .05, .1, .25, .5, 1., 2.5, 5., 10.]
+
+    def __init__(self: Self) -> None:
+        self._lock: Lock = Lock()
+        self._counters: Dict[Key, float] = {}
+        self._gauges: Dict[Key, float] = {}
+        # Key -> count, sum, min, max, bucket counts.
+        self._timings: Dict[Key, List[Any]] = {}
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, Any]) -> Key:
+        return (name, tuple(sorted(map(lambda item: (item[0], str(item[1])), labels.items()))))
+
+    def increment(
+        self: Self,
+        name: str,
+        value: float = 1.,
+        **labels: Any,
+    ) -> None:
+        key: Key = Metrics._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.) + value
+
+    def set(
+        self: Self,
+        name: str,
+        value: float,
+        **labels: Any,
+    ) -> None:
+        key: Key = Metrics._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def maximum(
+        self: Self,
+        name: str,
+        value: float,
+        **labels: Any,
+    ) -> None:
+        """
+            Sets the gauge to `value` if that exceeds it, e.g. for peaks.
+        """
+        key: Key = Metrics._key(name, labels)
+        with self._lock:
+            self._gauges[key] = max(self._gauges.get(key, value), value)
+
+    def observe(
+        self: Self,
+        name: str,
+        seconds: float,
+        **labels: Any,
+    ) -> None:
+        key: Key = Metrics._key(name, labels)
+        with self._lock:
+            if key not in self._timings:
+                self._timings[key] = [0, 0., seconds, seconds, [0] * len(Metrics.Buckets)]
+            timing: List[Any] = self._timings[key]
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = min(timing[2], seconds)
+            timing[3] = max(timing[3], seconds)
+            bucket: int = bisect_left(Metrics.Buckets, seconds)
+            if bucket < len(Metrics.Buckets):
+                timing[4][bucket] += 1
+
+    @contextmanager
+    def time(
+        self: Self,
+        name: str,
+        **labels: Any,
+    ) -> Iterator[None]:
+        """
+            Observes the wall time of the `with` block, also if it raises.
+        """
+        start: float = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, perf_counter() - start, **labels)
+
+    def reset(self: Self) -> None:
+        with self._lock:
+            self._counters = {}
+            self._gauges = {}
+            self._timings = {}
+
+    def snapshot(self: Self) -> Dict[str, List[Dict[str, Any]]]:
+        with self._lock:
+            return {
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in self._counters.items()
+                ],
+                'gauges': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in self._gauges.items()
+                ],
+                'timings': [
+                    {
+                        'name': name,
+                        'labels': dict(labels),
+                        'count': count,
+                        'sum': total,
+                        'min': minimum,
+                        'max': maximum,
+                        'buckets': list(buckets),
+                    }
+                    for (name, labels), (count, total, minimum, maximum, buckets) in self._timings.items()
+                ],
+            }
+
+    @staticmethod
+    def _labels(labels: Dict[str, str], **extra: str) -> str:
+        labels = {**labels, **extra}
+        if len(labels) == 0:
+            return ''
+        return '{{{}}}'.format(','.join(map(
+            lambda item: '{}="{}"'.format(item[0], item[1].replace('\\', '\\\\').replace('"', '\\"')),
+            sorted(labels.items()),
+        )))
+
+    @staticmethod
+    def prometheus(snapshot: Dict[str, List[Dict[str, Any]]]) -> str:
+        lines: List[str] = []
+        typed: Set[str] = set()
+
+        def declare(name: str, type: str) -> None:
+            if name not in typed:
+                typed.add(name)
+                lines.append('# TYPE {} {}'.format(name, type))
+
+        for counter in sorted(snapshot['counters'], key=lambda metric: metric['name']):
+            name: str = Metrics.Prefix + counter['name']
+            declare(name, 'counter')
+            lines.append('{}{} {}'.format(name, Metrics._labels(counter['labels']), counter['value']))
+
+        for gauge in sorted(snapshot['gauges'], key=lambda metric: metric['name']):
+            name: str = Metrics.Prefix + gauge['name']
+            declare(name, 'gauge')
+            lines.append('{}{} {}'.format(name, Metrics._labels(gauge['labels']), gauge['value']))
+
+        for timing in sorted(snapshot['timings'], key=lambda metric: metric['name']):
+            name: str = Metrics.Prefix + timing['name']
+            declare(name, 'histogram')
+            cumulative: int = 0
+            for bound, count in zip(Metrics.Buckets, timing['buckets']):
+                cumulative += count
+                lines.append('{}_bucket{} {}'.format(name, Metrics._labels(timing['labels'], le=str(bound)), cumulative))
+            lines.append('{}_bucket{} {}'.format(name, Metrics._labels(timing['labels'], le='+Inf'), timing['count']))
+            lines.append('{}_sum{} {}'.format(name, Metrics._labels(timing['labels']), timing['sum']))
+            lines.append('{}_count{} {}'.format(name, Metrics._labels(timing['labels']), timing['count']))
+
+        return '\n'.join(lines) + '\n'
+
+
+# Registry shared by all components of this process.
+metrics: Metrics = Metrics()
+
+
+def serve(
+    port: int,
+    source: Optional[Callable[[], Dict[str, List[Dict[str, Any]]]]] = None,
+    host: str = '',
+) -> Any:
+    """
+        Serves the Prometheus export of `source`, by default the metrics of
+        this process, on http://host:port/metrics from a daemon thread.
+        Returns the server; call `shutdown` on it to stop serving.
+    """
+    from http.server import (
+        ThreadingHTTPServer,
+        BaseHTTPRequestHandler,
+    )
+    from threading import Thread
+
+    snapshot: Callable[[], Dict[str, List[Dict[str, Any]]]] = source if source is not None else metrics.snapshot
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self: Self) -> None:
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+
+            body: bytes = Metrics.prometheus(snapshot()).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self: Self, format: str, *args: Any) -> None:
+            pass
+
+    server: ThreadingHTTPServer = ThreadingHTTPServer((host, port), Handler)
+    Thread(target=server.serve_forever, name='Metrics', daemon=True).start()
+    return server
@@ -0,0 +1,95 @@
+from PyQt6.QtCore import (
+    QAbstractTableModel,
+    QModelIndex,
+    QObject,
+    Qt,
+)
+from typing import (
+    Any,
+    Self,
+    Optional,
+    List,
+    Dict,
+)
+
+
+class MetricsModel(QAbstractTableModel):
+    HorizontalHeaders = ['metric', 'labels', 'value', 'count', 'mean [ms]', 'max [ms]']
+
+    def __init__(
+        self: Self,
+        parent: Optional[QObject] = None,
+     ) -> None:
+        super().__init__(parent)
+
+        # One row per metric: name, labels, value, count, mean, max.
+        self._rows: List[List[Any]] = []
+
+    def updateMetrics(self: Self, snapshot: Dict[str, List[Dict[str, Any]]]) -> None:
+        rows: List[List[Any]] = []
+        for metric in snapshot['counters'] + snapshot['gauges']:
+            rows.append([metric['name'], metric['labels'], metric['value'], '', '', ''])
+        for timing in snapshot['timings']:
+            rows.append([
+                timing['name'],
+                timing['labels'],
+                '',
+                timing['count'],
+                '{:.1f}'.format(1e3 * timing['sum'] / timing['count']),
+                '{:.1f}'.format(1e3 * timing['max']),
+            ])
+        rows.sort(key=lambda row: (row[0], sorted(row[1].items())))
+
+        if len(rows) == len(self._rows) and all(map(lambda pair: pair[0][:2] == pair[1][:2], zip(rows, self._rows))):
+            # Same metrics as before; only update the values to keep the selection and scroll position.
+            self._rows = rows
+            self.dataChanged.emit(
+                self.index(0, 2),
+                self.index(self.rowCount() - 1, self.columnCount() - 1),
+            )
+            return
+
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def rowCount(
+        self: Self,
+        parent: QModelIndex = QModelIndex(),
+    ) -> int:
+        return len(self._rows)
+
+    def columnCount(
+        self: Self,
+        parent: QModelIndex = QModelIndex(),
+    ) -> int:
+        return len(MetricsModel.HorizontalHeaders)
+
+    def data(
+        self: Self,
+        index: QModelIndex,
+        role: Qt.ItemDataRole = Qt.ItemDataRole.DisplayRole,
+    ) -> Any:
+        if not index.isValid():
+            return
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            value: Any = self._rows[index.row()][index.column()]
+            if index.column() == 1:
+                return ', '.join(map(lambda item: '{}={}'.format(*item), sorted(value.items())))
+            if isinstance(value, float) and value.is_integer():
+                return int(value)
+            return value
+
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            if index.column() >= 2:
+                return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+
+    def headerData(
+        self: Self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: Qt.ItemDataRole = Qt.ItemDataRole.DisplayRole,
+    ) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return MetricsModel.HorizontalHeaders[section]
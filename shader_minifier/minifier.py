@@ -3,6 +3,7 @@ from typing import (
     Dict,
     List,
     Optional,
+    Any,
 )
 from enum import (
     IntEnum,
@@ -14,12 +15,18 @@ from subprocess import (
     CompletedProcess,
 )
 from pathlib import Path
-from cached_path import cached_path
 from parse import parse
-from hashlib import sha256
 from tempfile import TemporaryDirectory
 from platform import system
-from stat import S_IEXEC
+from threading import Thread
+from shader_minifier.metrics import metrics
+from shader_minifier.tracing import tracer
+from shader_minifier.mirror import (
+    Artifact,
+    obtain as obtainArtifact,
+)
+from shader_minifier.formats import parseCVariables
+from shader_minifier import accounting
 
 
 class ShaderMinifierError(Exception):
@@ -58,6 +65,13 @@ class MinifierOutputFormat(StrEnum):
     Rust = 'rust'
 
 
+class ValidationPolicy(StrEnum):
+    Nothing = 'none'
+    Input = 'input'
+    Output = 'output'
+    Both = 'both'
+
+
 class MinifierSwizzleType(StrEnum):
     RGBA = 'rgba'
     XYZW = 'xyzw'
@@ -74,6 +88,9 @@ class shader_minifier:
         Locator: str = 'which'
         CRLF: str = '\n'
 
+    # Files per glslangValidator run; keeps command lines short enough for Windows.
+    ValidationBatchSize: int = 128
+
     hashes: Dict[MinifierVersion, str] = {
         MinifierVersion.v1_1_6: '6ce3e12ab598c35a8eb9edf108928c6d43d828b475124eddeed299546318c9a1',
         MinifierVersion.v1_2: 'c91a6109bce3f0bf40573893628dd29c61b4ec498a5f08a8b32d553ae7b57a5a',
@@ -100,6 +117,33 @@ class shader_minifier:
     for version in MinifierVersion:
         urls[version] = 'https://github.com/laurentlb/Shader_Minifier/releases/download/{}/shader_minifier.exe'.format(versionString(version))
 
+    @staticmethod
+    def artifact(version: MinifierVersion) -> Artifact:
+        return Artifact(
+            'shader_minifier-{}.exe'.format(shader_minifier.versionString(version)),
+            shader_minifier.urls[version],
+            shader_minifier.hashes[version],
+        )
+
+    @staticmethod
+    def validatorArtifact() -> Artifact:
+        return Artifact(
+            Path(shader_minifier.validatorUrl.split('!')[-1]).name,
+            shader_minifier.validatorUrl,
+            shader_minifier.validatorHash,
+            True,
+        )
+
+    @staticmethod
+    def artifacts(
+        versions: List[MinifierVersion],
+        validator: bool = True,
+    ) -> List[Artifact]:
+        """
+            Returns the release assets of `versions` and of glslangValidator.
+        """
+        return list(map(shader_minifier.artifact, versions)) + ([shader_minifier.validatorArtifact()] if validator else [])
+
     @staticmethod
     def determineVersion(path: Path) -> MinifierVersion:
         if path.is_dir():
@@ -127,10 +171,15 @@ class shader_minifier:
         self: Self,
         version: MinifierVersion=MinifierVersion.v1_3_6,
         obtain: ObtainmentStrategy=ObtainmentStrategy.EnvironmentVariables,
+        path: Optional[Path] = None,
+        validator: Optional[Path] = None,
     ) -> None:
+        """
+            Explicit `path` and `validator` executables are used as they are,
+            without looking them up or downloading them; e.g. for offline use.
+        """
         # Find or get shader_minifier
-        path: Optional[Path] = None
-        if obtain == ObtainmentStrategy.EnvironmentVariables:
+        if path is None and obtain == ObtainmentStrategy.EnvironmentVariables:
             result: Optional[CompletedProcess] = run(
                 [
                     shader_minifier.Locator, 'shader_minifier',
@@ -156,37 +205,34 @@ class shader_minifier:
                 # No shader_minifier executable found in PATH. Download it.
                 obtain = ObtainmentStrategy.Download
 
-        if obtain == ObtainmentStrategy.Download:
-            path = cached_path(shader_minifier.urls[version], quiet=True)
-            path.chmod(path.stat().st_mode | S_IEXEC)
-            assert sha256(path.read_bytes()).digest() == bytes.fromhex(shader_minifier.hashes[version])
+        if path is None and obtain == ObtainmentStrategy.Download:
+            # Looked up in the bundled and configured mirrors before downloading.
+            path = obtainArtifact(shader_minifier.artifact(version))
 
         # Find or get glslangValidator
-        validator: Optional[Path] = None
         downloadValidator: bool = False
-        result: Optional[CompletedProcess] = run(
-            [
-                shader_minifier.Locator, 'glslangValidator',
-            ],
-            capture_output=True,
-        )
-        if result.returncode == 0:
-            paths: List[Path] = list(map(
-                lambda pathString: Path(pathString.rstrip()),
-                result.stdout.decode('utf-8').split(shader_minifier.CRLF),
-            ))
+        if validator is None:
+            result: Optional[CompletedProcess] = run(
+                [
+                    shader_minifier.Locator, 'glslangValidator',
+                ],
+                capture_output=True,
+            )
+            if result.returncode == 0:
+                paths: List[Path] = list(map(
+                    lambda pathString: Path(pathString.rstrip()),
+                    result.stdout.decode('utf-8').split(shader_minifier.CRLF),
+                ))
 
-            if len(paths) == 0:
-                downloadValidator = True
+                if len(paths) == 0:
+                    downloadValidator = True
+                else:
+                    validator = paths[0]
             else:
-                validator = paths[0]
-        else:
-            downloadValidator = True
+                downloadValidator = True
 
         if downloadValidator:
-            validator = cached_path(shader_minifier.validatorUrl, extract_archive=True)
-            validator.chmod(validator.stat().st_mode | S_IEXEC)
-            assert sha256(validator.read_bytes()).digest() == bytes.fromhex(shader_minifier.validatorHash)
+            validator = obtainArtifact(shader_minifier.validatorArtifact())
 
         self._path: Path = path
         self._version: MinifierVersion = version
@@ -202,23 +248,27 @@ class shader_minifier:
         return self._path
     
     def validate(self: Self, source: str) -> bool:
-        with TemporaryDirectory() as tempDir:
+        with TemporaryDirectory() as tempDir, metrics.time('minify_phase_seconds', phase='validate', version=self._version.name), tracer.span('minify.validate'):
             (Path(tempDir) / 'shader.frag').write_text(source)
 
-            result: CompletedProcess = run(
+            result: CompletedProcess = accounting.run(
                 [
                     self._validator,
                     Path(tempDir) / 'shader.frag',
                 ],
+                'validate',
+                self._version.name,
                 capture_output=True,
             )
 
             if result.returncode != 0:
+                metrics.increment('minify_errors_total', phase='validate', version=self._version.name)
                 raise ValidationError(result.stdout.decode('utf-8'))
 
-    def minify(
+    def _command(
         self: Self,
-        source: str,
+        output: Path,
+        inputs: List[Path],
         verbose: bool = False,
         hlsl: bool = False,
         format: MinifierOutputFormat = MinifierOutputFormat.Indented,
@@ -234,62 +284,411 @@ class shader_minifier:
         no_remove_unused: bool = False,
         move_declarations: bool = False,
         preprocess: bool = False,
-    ) -> Optional[str]:
-        with TemporaryDirectory() as tempDir:
-            (Path(tempDir) / 'unminified.frag').write_text(source)
-
-            # Validate unminified shader
-            result: CompletedProcess = run(
+    ) -> str:
+        return ' '.join([
+            '\"{}\"'.format(self._path),
+            '-o', '\"{}\"'.format(output),
+            '-v' if verbose else '',
+            '--hlsl' if hlsl else '',
+            '--format', format.value,
+            '--field-names', field_names.value,
+            '--preserve-externals' if preserve_externals else '',
+            '--preserve-all-globals' if preserve_globals else '',
+            '--no-inlining' if no_inlining else '',
+            '--aggressive-inlining' if aggressive_inlining else '',
+            '--no-renaming' if no_renaming else '',
+            '--no-renaming-list' if no_renaming_list is not None else '', ','.join(no_renaming_list) if no_renaming_list is not None else '',
+            '--no-sequence' if no_sequence else '',
+            '--smoothstep' if smoothstep else '',
+            '--no-remove-unused' if no_remove_unused else '',
+            '--move-declarations' if move_declarations else '',
+            '--preprocess' if preprocess else '',
+        ] + list(map(
+            lambda input: '\"{}\"'.format(input),
+            inputs,
+        )))
+
+    def _validateInput(
+        self: Self,
+        path: Path,
+        hash: Optional[str] = None,
+    ) -> None:
+        with metrics.time('minify_phase_seconds', phase='validate_input', version=self._version.name), tracer.span('minify.validate_input', hash):
+            result: CompletedProcess = accounting.run(
                 [
                     self._validator,
-                    Path(tempDir) / 'unminified.frag',
+                    path,
                 ],
+                'validate',
+                self._version.name,
                 capture_output=True,
             )
 
             if result.returncode != 0:
+                metrics.increment('minify_errors_total', phase='validate_input', version=self._version.name)
                 raise ValidationError(result.stdout.decode('utf-8'))
 
-            # Minify shader
-            result: CompletedProcess = run(
-                ' '.join([
-                    '\"{}\"'.format(self._path),
-                    '-o', '\"{}\"'.format(Path(tempDir) / 'minified.frag'),
-                    '-v' if verbose else '',
-                    '--hlsl' if hlsl else '',
-                    '--format', format.value,
-                    '--field-names', field_names.value,
-                    '--preserve-externals' if preserve_externals else '',
-                    '--preserve-all-globals' if preserve_globals else '',
-                    '--no-inlining' if no_inlining else '',
-                    '--aggressive-inlining' if aggressive_inlining else '',
-                    '--no-renaming' if no_renaming else '',
-                    '--no-renaming-list' if no_renaming_list is not None else '', ','.join(no_renaming_list) if no_renaming_list is not None else ''
-                    '--no-sequence' if no_sequence else '',
-                    '--smoothstep' if smoothstep else '',
-                    '--no-remove-unused' if no_remove_unused else '',
-                    '--move-declarations' if move_declarations else '',
-                    '--preprocess' if preprocess else '',
-                    '\"{}\"'.format(Path(tempDir) / 'unminified.frag'),
-                ]),
-                capture_output=True,
-                shell=True,
-            )
-
-            if result.returncode != 0:
-                raise ShaderMinifierError(result.stdout.decode('utf-8'))
-
-            # Validate minified shader
-            result: CompletedProcess = run(
+    def _validateOutput(self: Self, path: Path) -> None:
+        with metrics.time('minify_phase_seconds', phase='validate_output', version=self._version.name), tracer.span('minify.validate_output'):
+            result: CompletedProcess = accounting.run(
                 [
                     self._validator,
-                    Path(tempDir) / 'minified.frag',
+                    path,
                 ],
+                'validate',
+                self._version.name,
                 capture_output=True,
             )
 
             if result.returncode != 0:
+                metrics.increment('minify_errors_total', phase='validate_output', version=self._version.name)
                 raise ValidationError('Invalid minified shader - \n{}\n >>> THIS IS A SHADER_MINIFIER_BUG. REPORT IT TO https://github.com/laurentlb/Shader_Minifier/issues !!\n'.format(result.stdout))
 
+    @staticmethod
+    def _diagnostics(
+        output: str,
+        paths: List[Path],
+    ) -> Dict[Path, str]:
+        """
+            Split the output of a multi-file glslangValidator run into the
+            output of each file. glslangValidator precedes the diagnostics
+            of each file with its path; diagnostics also name the path.
+        """
+        names: Dict[str, Path] = {str(path): path for path in paths}
+        lines: Dict[Path, List[str]] = {}
+        current: Optional[Path] = None
+        for line in output.splitlines():
+            if line.strip() in names:
+                current = names[line.strip()]
+            else:
+                for name, path in names.items():
+                    if '{}:'.format(name) in line:
+                        current = path
+                        break
+
+            if current is not None:
+                lines.setdefault(current, []).append(line)
+
+        return {path: '\n'.join(pathLines).strip() + '\n' for path, pathLines in lines.items()}
+
+    def _validateFiles(
+        self: Self,
+        paths: List[Path],
+    ) -> Dict[Path, Optional[str]]:
+        """
+            Validate `paths` in as few glslangValidator runs as possible.
+            Returns the diagnostics of each invalid file and None for valid
+            files. Batches whose output cannot be attributed to their files
+            are bisected, which costs O(errors * log(files)) extra runs.
+        """
+        results: Dict[Path, Optional[str]] = {}
+        batches: List[List[Path]] = [
+            paths[start:start + shader_minifier.ValidationBatchSize]
+            for start in range(0, len(paths), shader_minifier.ValidationBatchSize)
+        ]
+        while len(batches) != 0:
+            batch: List[Path] = batches.pop()
+            result: CompletedProcess = accounting.run(
+                [self._validator] + batch,
+                'validate',
+                self._version.name,
+                capture_output=True,
+            )
+            metrics.increment('validator_files_total', len(batch), version=self._version.name)
+
+            if result.returncode == 0:
+                results.update({path: None for path in batch})
+                continue
+
+            output: str = result.stdout.decode('utf-8')
+            if len(batch) == 1:
+                results[batch[0]] = output
+                continue
+
+            diagnostics: Dict[Path, str] = shader_minifier._diagnostics(output, batch)
+            failed: List[Path] = list(filter(
+                lambda path: 'ERROR' in diagnostics.get(path, ''),
+                batch,
+            ))
+            if len(failed) == 0:
+                batches += [batch[:len(batch) // 2], batch[len(batch) // 2:]]
+                continue
+
+            results.update({path: diagnostics[path] for path in failed})
+            rest: List[Path] = list(filter(lambda path: path not in failed, batch))
+            if all(map(lambda path: path in diagnostics, rest)):
+                # glslangValidator reported on every file; the rest is valid.
+                results.update({path: None for path in rest})
+            elif len(rest) != 0:
+                batches.append(rest)
+
+        return results
+
+    def validateMany(
+        self: Self,
+        sources: Dict[str, str],
+    ) -> Dict[str, Optional[ValidationError]]:
+        """
+            Validate several shaders in as few glslangValidator runs as
+            possible. Takes a dict of shader name to source and returns the
+            validation error of each shader, or None if it is valid.
+        """
+        with TemporaryDirectory() as tempDir, metrics.time('minify_phase_seconds', phase='validate', version=self._version.name), tracer.span('minify.validate'):
+            paths: Dict[str, Path] = {}
+            for index, name in enumerate(sources):
+                paths[name] = Path(tempDir) / '{}.frag'.format(index)
+                paths[name].write_text(sources[name])
+
+            results: Dict[Path, Optional[str]] = self._validateFiles(list(paths.values()))
+            errors: Dict[str, Optional[ValidationError]] = {}
+            for name, path in paths.items():
+                errors[name] = ValidationError(results[path]) if results[path] is not None else None
+                if errors[name] is not None:
+                    metrics.increment('minify_errors_total', phase='validate', version=self._version.name)
+            return errors
+
+    def minify(
+        self: Self,
+        source: str,
+        verbose: bool = False,
+        hlsl: bool = False,
+        format: MinifierOutputFormat = MinifierOutputFormat.Indented,
+        field_names: MinifierSwizzleType = MinifierSwizzleType.RGBA,
+        preserve_externals: bool = False,
+        preserve_globals: bool = False,
+        no_inlining: bool = False,
+        aggressive_inlining: bool = False,
+        no_renaming: bool = False,
+        no_renaming_list: Optional[List[str]] = None,
+        no_sequence: bool = None,
+        smoothstep: bool = False,
+        no_remove_unused: bool = False,
+        move_declarations: bool = False,
+        preprocess: bool = False,
+        validation: ValidationPolicy = ValidationPolicy.Both,
+        pipelined: bool = False,
+        name: str = 'unminified.frag',
+    ) -> Optional[str]:
+        """
+            `validation` selects which of input and output are validated.
+            With `pipelined`, the input is validated while the shader is
+            minified, and the output is validated as soon as it exists.
+            Errors are the same either way: an invalid input is reported
+            before a minifier error. `name` is the file name shader_minifier
+            sees; it names the variables of C, JS, Nasm and Rust output.
+        """
+        with TemporaryDirectory() as tempDir:
+            input: Path = Path(tempDir) / name
+            output: Path = Path(tempDir) / 'minified.{}'.format(name)
+            input.write_text(source)
+
+            # Validate unminified shader
+            inputErrors: List[ValidationError] = []
+            inputThread: Optional[Thread] = None
+            if validation in [ValidationPolicy.Input, ValidationPolicy.Both]:
+                if pipelined:
+                    def validateInput(hash: Optional[str]) -> None:
+                        try:
+                            self._validateInput(input, hash)
+                        except ValidationError as error:
+                            inputErrors.append(error)
+
+                    # The trace context is per thread; hand it over.
+                    inputThread = Thread(target=validateInput, args=[tracer.current()], name='Validate input')
+                    inputThread.start()
+                else:
+                    self._validateInput(input)
+
+            error: Optional[Exception] = None
+            try:
+                # Minify shader
+                with metrics.time('minify_phase_seconds', phase='minify', version=self._version.name), tracer.span('minify.minify'):
+                    result: CompletedProcess = accounting.run(
+                        self._command(
+                            output,
+                            [input],
+                            verbose=verbose,
+                            hlsl=hlsl,
+                            format=format,
+                            field_names=field_names,
+                            preserve_externals=preserve_externals,
+                            preserve_globals=preserve_globals,
+                            no_inlining=no_inlining,
+                            aggressive_inlining=aggressive_inlining,
+                            no_renaming=no_renaming,
+                            no_renaming_list=no_renaming_list,
+                            no_sequence=no_sequence,
+                            smoothstep=smoothstep,
+                            no_remove_unused=no_remove_unused,
+                            move_declarations=move_declarations,
+                            preprocess=preprocess,
+                        ),
+                        'minify',
+                        self._version.name,
+                        capture_output=True,
+                        shell=True,
+                    )
+
+                    if result.returncode != 0:
+                        metrics.increment('minify_errors_total', phase='minify', version=self._version.name)
+                        raise ShaderMinifierError(result.stdout.decode('utf-8'))
+
+                # Validate minified shader
+                if validation in [ValidationPolicy.Output, ValidationPolicy.Both]:
+                    self._validateOutput(output)
+            except (ShaderMinifierError, ValidationError) as caught:
+                error = caught
+
+            if inputThread is not None:
+                inputThread.join()
+                if len(inputErrors) != 0:
+                    raise inputErrors[0]
+            if error is not None:
+                raise error
+
             # Return minified result
-            return (Path(tempDir) / 'minified.frag').read_text()
+            return output.read_text()
+
+    def minifyFormats(
+        self: Self,
+        source: str,
+        formats: List[MinifierOutputFormat],
+        name: str = 'shader.frag',
+        **options: Any,
+    ) -> Dict[MinifierOutputFormat, str]:
+        """
+            Minify to each of `formats`, with input and output validated at
+            most once. shader_minifier runs once per format, since it is
+            deterministic, the code is the same in all of them; the output
+            is validated on the text, indented or C variables output. Only
+            JS, Nasm and Rust output alone need an extra text run for that.
+            Accepts the options of `minify`, except for `format`.
+        """
+        options.pop('format', None)
+        validation: ValidationPolicy = options.pop('validation', ValidationPolicy.Both)
+        options.setdefault('pipelined', True)
+
+        outputs: Dict[MinifierOutputFormat, str] = {}
+        validateInput: bool = validation in [ValidationPolicy.Input, ValidationPolicy.Both]
+        for format in formats:
+            if format in outputs:
+                continue
+            outputs[format] = self.minify(
+                source,
+                format=format,
+                validation=ValidationPolicy.Input if validateInput else ValidationPolicy.Nothing,
+                name=name,
+                **options,
+            )
+            validateInput = False
+
+        # Validate minified shader
+        if validation in [ValidationPolicy.Output, ValidationPolicy.Both]:
+            if MinifierOutputFormat.Text in outputs or MinifierOutputFormat.Indented in outputs:
+                code: str = outputs.get(MinifierOutputFormat.Text, outputs.get(MinifierOutputFormat.Indented))
+            elif MinifierOutputFormat.CVariables in outputs:
+                code = ''.join(parseCVariables(outputs[MinifierOutputFormat.CVariables]).shaders.values())
+            else:
+                code = self.minify(source, format=MinifierOutputFormat.Text, validation=ValidationPolicy.Nothing, name=name, **options)
+            with TemporaryDirectory() as tempDir:
+                (Path(tempDir) / name).write_text(code)
+                self._validateOutput(Path(tempDir) / name)
+
+        return {format: outputs[format] for format in formats}
+
+    def minifyMany(
+        self: Self,
+        sources: Dict[str, str],
+        **options: Any,
+    ) -> Dict[str, str]:
+        """
+            Minify several shaders jointly in one shader_minifier invocation,
+            so that shared uniforms and globals are renamed consistently.
+            Takes and returns a dict of shader name to source. Accepts the
+            options of `minify`, except for `format` and `pipelined`.
+        """
+        options['format'] = MinifierOutputFormat.Indented
+        options.pop('pipelined', None)
+        validation: ValidationPolicy = options.pop('validation', ValidationPolicy.Both)
+
+        with TemporaryDirectory() as tempDir:
+            # Index the file names; shaders from different directories may share a name.
+            fileNames: Dict[str, str] = {}
+            for index, name in enumerate(sources):
+                fileNames[name] = '{}_{}'.format(index, Path(name).name)
+                (Path(tempDir) / fileNames[name]).write_text(sources[name])
+
+            # Validate unminified shaders
+            if validation in [ValidationPolicy.Input, ValidationPolicy.Both]:
+                with metrics.time('minify_phase_seconds', phase='validate_input', version=self._version.name), tracer.span('minify.validate_input'):
+                    inputs: Dict[Path, Optional[str]] = self._validateFiles(list(map(lambda name: Path(tempDir) / fileNames[name], sources)))
+                    for name in sources:
+                        if inputs[Path(tempDir) / fileNames[name]] is not None:
+                            metrics.increment('minify_errors_total', phase='validate_input', version=self._version.name)
+                            raise ValidationError('{}:\n{}'.format(name, inputs[Path(tempDir) / fileNames[name]]))
+
+            # Minify shaders
+            with metrics.time('minify_phase_seconds', phase='minify', version=self._version.name), tracer.span('minify.minify'):
+                result: CompletedProcess = accounting.run(
+                    self._command(
+                        Path(tempDir) / 'minified.frag',
+                        list(map(lambda name: Path(tempDir) / fileNames[name], sources)),
+                        **options,
+                    ),
+                    'minify',
+                    self._version.name,
+                    capture_output=True,
+                    shell=True,
+                )
+
+                if result.returncode != 0:
+                    metrics.increment('minify_errors_total', phase='minify', version=self._version.name)
+                    raise ShaderMinifierError(result.stdout.decode('utf-8'))
+
+                minified: Dict[str, str] = shader_minifier.splitIndented(
+                    (Path(tempDir) / 'minified.frag').read_text(),
+                    fileNames,
+                )
+
+            # Validate minified shaders
+            if validation in [ValidationPolicy.Output, ValidationPolicy.Both]:
+                with metrics.time('minify_phase_seconds', phase='validate_output', version=self._version.name), tracer.span('minify.validate_output'):
+                    for name in sources:
+                        (Path(tempDir) / 'minified.{}'.format(fileNames[name])).write_text(minified[name])
+                    outputs: Dict[Path, Optional[str]] = self._validateFiles(list(map(lambda name: Path(tempDir) / 'minified.{}'.format(fileNames[name]), sources)))
+                    for name in sources:
+                        if outputs[Path(tempDir) / 'minified.{}'.format(fileNames[name])] is not None:
+                            metrics.increment('minify_errors_total', phase='validate_output', version=self._version.name)
+                            raise ValidationError('Invalid minified shader {} - \n{}\n >>> THIS IS A SHADER_MINIFIER_BUG. REPORT IT TO https://github.com/laurentlb/Shader_Minifier/issues !!\n'.format(name, outputs[Path(tempDir) / 'minified.{}'.format(fileNames[name])]))
+
+            return minified
+
+    @staticmethod
+    def splitIndented(
+        output: str,
+        fileNames: Dict[str, str],
+    ) -> Dict[str, str]:
+        """
+            Split the indented output of a multi-file invocation, which
+            precedes each shader with a `// <file name>` line.
+        """
+        names: Dict[str, str] = {fileName: name for name, fileName in fileNames.items()}
+        parts: Dict[str, List[str]] = {}
+        current: Optional[List[str]] = None
+        for line in output.splitlines():
+            header: str = line.strip()
+            if header.startswith('// ') and Path(header[3:].strip()).name in names:
+                current = parts.setdefault(names[Path(header[3:].strip()).name], [])
+                continue
+
+            if current is not None:
+                current.append(line)
+
+        if len(fileNames) == 1 and len(parts) == 0:
+            # Single shaders come without a header.
+            return {list(fileNames)[0]: output}
+
+        if set(parts) != set(fileNames):
+            raise ShaderMinifierError('Could not split minified output into shaders:\n{}'.format(output))
+
+        return {name: '\n'.join(lines).strip() + '\n' for name, lines in parts.items()}
@@ -0,0 +1,162 @@
+from typing import (
+    Self,
+    Optional,
+    List,
+    Dict,
+    NamedTuple,
+)
+from pathlib import Path
+from hashlib import file_digest
+from shutil import copyfile
+from stat import S_IEXEC
+from os import environ
+from urllib.parse import (
+    urlparse,
+    ParseResult,
+)
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    Future,
+    as_completed,
+)
+import sys
+from shader_minifier.metrics import metrics
+
+
+class Artifact(NamedTuple):
+    """
+        Release asset of an executable. `name` is its file name in a mirror.
+    """
+    name: str
+    url: str
+    hash: str
+    archive: bool = False
+
+
+class Mirror:
+    """
+        Directory with verified copies of release assets, so that they need
+        not be downloaded. Assets are only used if their sha256 matches.
+    """
+    # Directory or file:// URL of the mirror that is looked up before downloading.
+    Variable: str = 'SHADER_MINIFIER_MIRROR'
+    # Directory of the bundled mirror inside a pyinstaller executable.
+    BundleDirectory: str = 'shader_minifier/binaries'
+
+    def __init__(self: Self, directory: Path) -> None:
+        self._directory: Path = Path(directory)
+
+    @staticmethod
+    def fromLocation(location: str) -> 'Mirror':
+        """
+            Accepts a directory or a file:// URL.
+        """
+        url: ParseResult = urlparse(location)
+        if url.scheme == 'file':
+            # urllib.request is slow to import; it is only needed for file URLs.
+            from urllib.request import url2pathname
+            # file://host/share/... is a network share.
+            return Mirror(Path(url2pathname('//' + url.netloc + url.path if url.netloc else url.path)))
+        return Mirror(Path(location))
+
+    @staticmethod
+    def configured() -> List['Mirror']:
+        """
+            Returns the bundled mirror of a pyinstaller executable and the
+            mirror in `Mirror.Variable`, in lookup order.
+        """
+        mirrors: List[Mirror] = []
+        if hasattr(sys, '_MEIPASS'):
+            mirrors.append(Mirror(Path(sys._MEIPASS) / Mirror.BundleDirectory))
+        if environ.get(Mirror.Variable, '') != '':
+            mirrors.append(Mirror.fromLocation(environ[Mirror.Variable]))
+        return mirrors
+
+    @property
+    def directory(self: Self) -> Path:
+        return self._directory
+
+    @staticmethod
+    def verify(path: Path, hash: str) -> bool:
+        with path.open('rb') as file:
+            return file_digest(file, 'sha256').hexdigest() == hash
+
+    def find(self: Self, artifact: Artifact) -> Optional[Path]:
+        """
+            Returns the path of `artifact` in this mirror, or None if it is
+            missing or does not match its hash.
+        """
+        path: Path = self._directory / artifact.name
+        if not path.is_file():
+            return None
+        if not Mirror.verify(path, artifact.hash):
+            print("Error: {} does not match its hash; ignoring it.".format(path))
+            return None
+        _makeExecutable(path)
+        return path
+
+    def fetch(self: Self, artifact: Artifact) -> Path:
+        """
+            Stores `artifact` in this mirror unless it already is, and
+            returns its path there.
+        """
+        path: Optional[Path] = self.find(artifact)
+        if path is not None:
+            return path
+
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self._directory / artifact.name
+        # Copied next to the target first; other processes never see partial files.
+        partial: Path = self._directory / '{}.part'.format(artifact.name)
+        copyfile(obtain(artifact), partial)
+        _makeExecutable(partial)
+        partial.replace(path)
+        return path
+
+    def prefetch(
+        self: Self,
+        artifacts: List[Artifact],
+        jobs: Optional[int] = None,
+    ) -> Dict[Artifact, Path]:
+        """
+            Fetches `artifacts` in parallel. Artifacts that fail are printed
+            and left out of the result.
+        """
+        paths: Dict[Artifact, Path] = {}
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures: Dict[Future, Artifact] = {
+                executor.submit(self.fetch, artifact): artifact
+                for artifact in artifacts
+            }
+            for future in as_completed(futures):
+                artifact: Artifact = futures[future]
+                try:
+                    paths[artifact] = future.result()
+                except Exception as error:
+                    print("Error: Could not fetch {}: {}".format(artifact.url, error))
+        return paths
+
+
+def _makeExecutable(path: Path) -> None:
+    if path.stat().st_mode & S_IEXEC == 0:
+        path.chmod(path.stat().st_mode | S_IEXEC)
+
+
+def obtain(artifact: Artifact) -> Path:
+    """
+        Returns a verified local copy of `artifact`, from the configured
+        mirrors if they have it and else downloaded from its URL.
+    """
+    for mirror in Mirror.configured():
+        path: Optional[Path] = mirror.find(artifact)
+        if path is not None:
+            metrics.increment('artifacts_obtained_total', source='mirror')
+            return path
+
+    # cached_path pulls in cloud storage clients; only import it when downloading.
+    from cached_path import cached_path
+    path = cached_path(artifact.url, extract_archive=artifact.archive, quiet=True)
+    _makeExecutable(path)
+    assert Mirror.verify(path, artifact.hash)
+    metrics.increment('artifacts_obtained_total', source='download')
+    return path
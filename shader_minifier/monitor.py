@@ -0,0 +1,419 @@
+from typing import (
+    Self,
+    Optional,
+    List,
+    Dict,
+    Set,
+    Tuple,
+    NamedTuple,
+    Any,
+)
+from pathlib import Path
+from os import (
+    read,
+    close,
+    fsencode,
+    stat_result,
+)
+from ctypes import (
+    CDLL,
+    get_errno,
+)
+from ctypes.util import find_library
+from select import select
+from struct import (
+    unpack_from,
+    calcsize,
+)
+from threading import (
+    Thread,
+    Lock,
+)
+from time import (
+    monotonic,
+    sleep,
+)
+from platform import system
+from shader_minifier.signals import Signal
+
+
+class FileSignature(NamedTuple):
+    size: int
+    mtime: int
+    inode: int
+
+
+def signature(path: Path) -> Optional[FileSignature]:
+    """
+        Returns the (size, mtime, inode) signature of a file, or None if it
+        does not exist. Files with equal signatures need not be re-read.
+    """
+    try:
+        stat: stat_result = path.stat()
+        return FileSignature(stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    except OSError:
+        return None
+
+
+class PollingMonitor:
+    """
+        Watches files and directories by polling their signatures. The poll
+        interval of a path doubles while it is idle and drops back to the
+        minimum once it changes. Changes are reported once writes settled.
+    """
+    # Seconds without events and with a stable signature after which a write counts as settled.
+    SettleTime: float = 0.05
+    MinimumInterval: float = 0.05
+    MaximumInterval: float = 2.
+
+    # Path of a file whose contents changed and settled.
+    changed: Signal = Signal(str)
+    stopped: Signal = Signal()
+
+    def __init__(self: Self) -> None:
+        self._lock: Lock = Lock()
+        self._thread: Thread = Thread(target=self._run, name=type(self).__name__)
+        self._running: bool = True
+
+        # Watched path -> whether it is a directory.
+        self._paths: Dict[Path, bool] = {}
+
+        # Polled path -> next check time, interval, signatures of the path or its entries.
+        self._polled: Dict[Path, Tuple[float, float, Dict[Path, Optional[FileSignature]]]] = {}
+
+        # File -> time of the last event, signature at that time.
+        self._pending: Dict[Path, Tuple[float, Optional[FileSignature]]] = {}
+        # File -> signature when the last change was reported.
+        self._reported: Dict[Path, Optional[FileSignature]] = {}
+
+    @property
+    def paths(self: Self) -> List[Path]:
+        return list(self._paths)
+
+    def start(self: Self) -> None:
+        self._thread.start()
+
+    def stop(self: Self) -> None:
+        self._running = False
+
+    def watch(self: Self, path: Any) -> None:
+        path = Path(path).absolute()
+        with self._lock:
+            if path in self._paths:
+                return
+            self._paths[path] = path.is_dir()
+            self._watch(path)
+
+    def unwatch(self: Self, path: Any) -> None:
+        path = Path(path).absolute()
+        with self._lock:
+            if path not in self._paths:
+                return
+            isDirectory: bool = self._paths.pop(path)
+            self._unwatch(path, isDirectory)
+
+    def _watch(self: Self, path: Path) -> None:
+        self._poll(path)
+
+    def _unwatch(self: Self, path: Path, isDirectory: bool) -> None:
+        if path in self._polled:
+            del self._polled[path]
+
+    def _poll(self: Self, path: Path) -> None:
+        self._polled[path] = (monotonic(), PollingMonitor.MinimumInterval, self._scan(path))
+
+    def _scan(self: Self, path: Path) -> Dict[Path, Optional[FileSignature]]:
+        if not self._paths[path]:
+            return {path: signature(path)}
+
+        try:
+            return {entry: signature(entry) for entry in path.iterdir() if entry.is_file()}
+        except OSError:
+            return {}
+
+    def _touch(self: Self, path: Path) -> None:
+        self._pending[path] = (monotonic(), signature(path))
+
+    def _check(self: Self, now: float) -> None:
+        for path, (due, interval, signatures) in list(self._polled.items()):
+            if now < due:
+                continue
+
+            current: Dict[Path, Optional[FileSignature]] = self._scan(path)
+            changedEntries: Set[Path] = PollingMonitor._changes(signatures, current)
+            for entry in changedEntries:
+                self._touch(entry)
+
+            interval = PollingMonitor.MinimumInterval if len(changedEntries) != 0 else min(2 * interval, PollingMonitor.MaximumInterval)
+            self._polled[path] = (now + interval, interval, current)
+
+    @staticmethod
+    def _changes(
+        previous: Dict[Path, Optional[FileSignature]],
+        current: Dict[Path, Optional[FileSignature]],
+    ) -> Set[Path]:
+        return set(filter(
+            lambda entry: previous.get(entry) != current.get(entry),
+            set(previous) | set(current),
+        ))
+
+    def _settle(self: Self, now: float) -> None:
+        for path, (time, previous) in list(self._pending.items()):
+            if now - time < PollingMonitor.SettleTime:
+                continue
+
+            current: Optional[FileSignature] = signature(path)
+            if current != previous:
+                # Still being written.
+                self._pending[path] = (now, current)
+                continue
+
+            del self._pending[path]
+            if current is not None and current != self._reported.get(path):
+                self._reported[path] = current
+                self.changed.emit(str(path))
+
+    def _timeout(self: Self, now: float) -> float:
+        """
+            Returns the time until the next poll or settle check is due.
+        """
+        due: List[float] = list(map(lambda polled: polled[0], self._polled.values())) + list(map(
+            lambda pending: pending[0] + PollingMonitor.SettleTime,
+            self._pending.values(),
+        ))
+        return min(max(min(due, default=now + PollingMonitor.MaximumInterval) - now, 0.), PollingMonitor.MaximumInterval)
+
+    def _wait(self: Self, timeout: float) -> None:
+        sleep(max(timeout, PollingMonitor.MinimumInterval / 10))
+
+    def _run(self: Self) -> int:
+        while self._running:
+            with self._lock:
+                now: float = monotonic()
+                self._check(now)
+                self._settle(now)
+                timeout: float = self._timeout(monotonic())
+
+            # Wake up regularly to notice `stop`.
+            self._wait(min(timeout, PollingMonitor.MaximumInterval / 4))
+
+        self._close()
+        self.stopped.emit()
+        return 0
+
+    def _close(self: Self) -> None:
+        pass
+
+
+class InotifyMonitor(PollingMonitor):
+    """
+        Watches files and directories with inotify. Files are watched through
+        their parent directory, so editors that save via temp file and rename
+        are followed. Paths on network filesystems, where inotify does not
+        see remote writes, fall back to adaptive polling. So do paths in
+        directories that are missing or were removed, until they reappear.
+    """
+    IN_MODIFY: int = 0x00000002
+    IN_ATTRIB: int = 0x00000004
+    IN_CLOSE_WRITE: int = 0x00000008
+    IN_MOVED_FROM: int = 0x00000040
+    IN_MOVED_TO: int = 0x00000080
+    IN_CREATE: int = 0x00000100
+    IN_DELETE: int = 0x00000200
+    IN_IGNORED: int = 0x00008000
+    IN_NONBLOCK: int = 0o4000
+    IN_CLOEXEC: int = 0o2000000
+    Mask: int = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EventFormat: str = 'iIII'
+    BufferSize: int = 64 * 1024
+
+    NetworkFilesystems: Set[str] = {
+        'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', '9p', 'afs', 'ceph', 'davfs',
+        'fuse.sshfs', 'fuse.rclone', 'fuse.glusterfs', 'glusterfs',
+    }
+    MountsPath: Path = Path('/proc/mounts')
+
+    _libc: Optional[CDLL] = None
+
+    @staticmethod
+    def available() -> bool:
+        if system() != 'Linux':
+            return False
+
+        if InotifyMonitor._libc is None:
+            try:
+                libc: CDLL = CDLL(find_library('c') or 'libc.so.6', use_errno=True)
+                libc.inotify_init1
+                InotifyMonitor._libc = libc
+            except (OSError, AttributeError):
+                return False
+
+        return True
+
+    @staticmethod
+    def filesystem(path: Path) -> Optional[str]:
+        """
+            Returns the type of the filesystem `path` is on, from /proc/mounts.
+        """
+        try:
+            mounts: List[List[str]] = list(map(str.split, InotifyMonitor.MountsPath.read_text().splitlines()))
+        except OSError:
+            return None
+
+        best: Tuple[int, Optional[str]] = (-1, None)
+        for mount in mounts:
+            if len(mount) < 3:
+                continue
+            mountPoint: Path = Path(mount[1].replace('\\040', ' '))
+            if (path == mountPoint or mountPoint in path.parents) and len(mountPoint.parts) > best[0]:
+                best = (len(mountPoint.parts), mount[2])
+
+        return best[1]
+
+    def __init__(self: Self) -> None:
+        super().__init__()
+
+        InotifyMonitor.available()
+        self._fd: int = InotifyMonitor._libc.inotify_init1(InotifyMonitor.IN_NONBLOCK | InotifyMonitor.IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(get_errno(), 'inotify_init1 failed.')
+
+        # Watch descriptor -> watched directory.
+        self._directories: Dict[int, Path] = {}
+        # Watched directory -> watch descriptor, names of watched files (None: all files).
+        self._descriptors: Dict[Path, Tuple[int, Optional[Set[str]]]] = {}
+        # Polled paths whose watch failed or was dropped; watched again once their directory is back.
+        self._dropped: Set[Path] = set()
+
+    def _watch(self: Self, path: Path) -> None:
+        directory: Path = path if self._paths[path] else path.parent
+
+        if InotifyMonitor.filesystem(directory) in InotifyMonitor.NetworkFilesystems:
+            self._poll(path)
+            return
+
+        if not self._add(path):
+            # Directory missing or out of watches.
+            self._poll(path)
+            self._dropped.add(path)
+            return
+
+        # Report the current state once, like the polling backend does.
+        if not self._paths[path]:
+            self._reported[path] = signature(path)
+
+    def _add(self: Self, path: Path) -> bool:
+        """
+            Watches `path` through the watch of its directory, which is added
+            if needed. Returns False if inotify_add_watch failed.
+        """
+        directory: Path = path if self._paths[path] else path.parent
+        if directory not in self._descriptors:
+            descriptor: int = InotifyMonitor._libc.inotify_add_watch(self._fd, fsencode(str(directory)), InotifyMonitor.Mask)
+            if descriptor < 0:
+                return False
+            self._directories[descriptor] = directory
+            self._descriptors[directory] = (descriptor, set())
+
+        descriptor, names = self._descriptors[directory]
+        if self._paths[path]:
+            names = None
+        elif names is not None:
+            names.add(path.name)
+        self._descriptors[directory] = (descriptor, names)
+        return True
+
+    def _unwatch(self: Self, path: Path, isDirectory: bool) -> None:
+        if path in self._polled:
+            self._dropped.discard(path)
+            super()._unwatch(path, isDirectory)
+            return
+
+        directory: Path = path if isDirectory else path.parent
+        if directory not in self._descriptors or self._paths.get(directory, False):
+            # Still watched as a whole.
+            return
+
+        # The files that remain watched through this directory.
+        descriptor: int = self._descriptors[directory][0]
+        names: Set[str] = set(map(
+            lambda watched: watched.name,
+            filter(
+                lambda watched: not self._paths[watched] and watched.parent == directory and watched not in self._polled,
+                self._paths,
+            ),
+        ))
+        self._descriptors[directory] = (descriptor, names)
+
+        if len(names) == 0:
+            InotifyMonitor._libc.inotify_rm_watch(self._fd, descriptor)
+            del self._descriptors[directory]
+            del self._directories[descriptor]
+
+    def _read(self: Self) -> None:
+        try:
+            data: bytes = read(self._fd, InotifyMonitor.BufferSize)
+        except BlockingIOError:
+            return
+
+        size: int = calcsize(InotifyMonitor.EventFormat)
+        offset: int = 0
+        while offset + size <= len(data):
+            descriptor, mask, _, length = unpack_from(InotifyMonitor.EventFormat, data, offset)
+            name: str = data[offset + size:offset + size + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+            offset += size + length
+
+            if descriptor not in self._directories:
+                continue
+
+            directory: Path = self._directories[descriptor]
+            if mask & InotifyMonitor.IN_IGNORED:
+                # The directory is gone; poll until it reappears.
+                del self._directories[descriptor]
+                del self._descriptors[directory]
+                for path in list(self._paths):
+                    if path == directory or path.parent == directory:
+                        self._poll(path)
+                        self._dropped.add(path)
+                continue
+
+            names: Optional[Set[str]] = self._descriptors[directory][1]
+            if name != '' and (names is None or name in names):
+                self._touch(directory / name)
+
+    def _check(self: Self, now: float) -> None:
+        due: List[Path] = list(filter(lambda path: self._polled[path][0] <= now, self._dropped))
+        super()._check(now)
+
+        # Dropped paths whose directory reappeared go back to inotify.
+        for path in due:
+            directory: Path = path if self._paths[path] else path.parent
+            if not directory.is_dir() or not self._add(path):
+                continue
+            self._dropped.remove(path)
+            _, _, signatures = self._polled.pop(path)
+            # Changes since the last poll, before the watch was added.
+            for entry in PollingMonitor._changes(signatures, self._scan(path)):
+                self._touch(entry)
+
+    def _wait(self: Self, timeout: float) -> None:
+        readable, _, _ = select([self._fd], [], [], timeout)
+        if len(readable) != 0:
+            with self._lock:
+                self._read()
+
+    def _close(self: Self) -> None:
+        close(self._fd)
+
+
+def createMonitor() -> PollingMonitor:
+    """
+        Returns the best file monitor available on this platform.
+    """
+    if InotifyMonitor.available():
+        try:
+            return InotifyMonitor()
+        except OSError:
+            pass
+
+    return PollingMonitor()
@@ -0,0 +1,57 @@
+from typing import List
+from hashlib import sha256
+from re import (
+    compile,
+    Pattern,
+    DOTALL,
+)
+
+# Comments, except Shader Minifier's //[ and //] verbatim markers, which are significant.
+CommentPattern: Pattern = compile(r'//(?![\[\]])[^\n]*|/\*.*?\*/', DOTALL)
+VerbatimPattern: Pattern = compile(r'//[\[\]][^\n]*')
+# Backslash-newline joins lines before anything else.
+ContinuationPattern: Pattern = compile(r'\\\r?\n')
+WhitespacePattern: Pattern = compile(r'[ \t\f\v\r]+')
+# GLSL tokens; operators are matched greedily, so `+=` and `+ =` differ.
+TokenPattern: Pattern = compile(
+    r'[A-Za-z_]\w*'
+    r'|\.?\d(?:[eE][+-]|[\w.])*'
+    r'|<<=|>>=|\+\+|--|<<|>>|<=|>=|==|!=|&&|\|\||\^\^|[-+*/%&|^]='
+    r'|\S'
+)
+
+
+def normalize(source: str) -> str:
+    """
+        Returns the token stream of a GLSL source without comments and
+        insignificant whitespace. Sources with equal normalizations
+        compile and minify to the same result. Preprocessor directives
+        keep their line and their whitespace, since e.g. `#define F(x)`
+        and `#define F (x)` differ. Sources that use `__LINE__` are
+        returned as they are.
+    """
+    if '__LINE__' in source:
+        return source
+
+    lines: List[str] = []
+    tokens: List[str] = []
+    # Like in the preprocessor, a comment is a single space, even if it spans lines.
+    for line in CommentPattern.sub(' ', ContinuationPattern.sub('', source)).split('\n'):
+        stripped: str = line.strip()
+        if stripped.startswith('#') or VerbatimPattern.match(stripped) is not None:
+            if len(tokens) != 0:
+                lines.append(' '.join(tokens))
+                tokens = []
+            lines.append(WhitespacePattern.sub(' ', stripped))
+        else:
+            tokens += TokenPattern.findall(line)
+    if len(tokens) != 0:
+        lines.append(' '.join(tokens))
+    return '\n'.join(lines)
+
+
+def normalizedHash(source: str) -> str:
+    """
+        Returns the sha256 of the normalization of `source`.
+    """
+    return sha256(normalize(source).encode('utf-8')).digest().hex()
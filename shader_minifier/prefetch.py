@@ -0,0 +1,50 @@
+from typing import (
+    List,
+    Dict,
+)
+from pathlib import Path
+from os import environ
+from argparse import (
+    ArgumentParser,
+    Namespace,
+)
+from shader_minifier.minifier import (
+    MinifierVersion,
+    shader_minifier,
+)
+from shader_minifier.mirror import (
+    Artifact,
+    Mirror,
+)
+
+
+def main() -> int:
+    versions: List[str] = [version.name for version in MinifierVersion if version != MinifierVersion.unavailable]
+    parser: ArgumentParser = ArgumentParser(description="Fetch shader_minifier and glslangValidator executables into a local mirror.")
+    parser.add_argument('directory', type=Path, nargs='?', default=None, help="Mirror directory to populate; defaults to ${}.".format(Mirror.Variable))
+    parser.add_argument('-m', '--minifier', action='append', choices=versions, default=None, help="shader_minifier version to fetch; may be given multiple times. Defaults to all versions.")
+    parser.add_argument('--no-validator', action='store_true', help="Do not fetch glslangValidator.")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="Number of parallel downloads.")
+    arguments: Namespace = parser.parse_args()
+
+    if arguments.directory is not None:
+        mirror: Mirror = Mirror(arguments.directory)
+    elif environ.get(Mirror.Variable, '') != '':
+        mirror = Mirror.fromLocation(environ[Mirror.Variable])
+    else:
+        parser.error("Pass a mirror directory or set ${}.".format(Mirror.Variable))
+
+    artifacts: List[Artifact] = shader_minifier.artifacts(
+        list(map(lambda version: MinifierVersion[version], arguments.minifier or versions)),
+        not arguments.no_validator,
+    )
+    paths: Dict[Artifact, Path] = mirror.prefetch(artifacts, arguments.jobs)
+    for artifact in artifacts:
+        if artifact in paths:
+            print("Fetched {}.".format(paths[artifact]))
+
+    return 0 if len(paths) == len(artifacts) else 1
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,165 @@
+from typing import (
+    Self,
+    Optional,
+    List,
+    Tuple,
+    Any,
+)
+from pathlib import Path
+from cProfile import Profile
+from threading import (
+    Thread,
+    Lock,
+    Event,
+    current_thread,
+    setprofile,
+)
+from tracemalloc import (
+    Snapshot,
+    take_snapshot,
+    start as startTracing,
+    stop as stopTracing,
+)
+from re import sub
+
+
+class Profiler:
+    """
+        Profiles every thread of this process separately with cProfile, from
+        the thread that calls `start` and all threads started afterwards,
+        and optionally takes tracemalloc snapshots every `interval` seconds.
+        `stop` writes one .prof file per thread, which snakeviz opens, and
+        the memory snapshots to `directory`.
+
+        Python 3.12 only allows one active profile per process, which then
+        covers all threads; it is written for the thread that called `start`.
+    """
+    # Frames of tracebacks stored by tracemalloc.
+    Frames: int = 10
+    # Lines listed in the memory summary.
+    TopStatistics: int = 25
+
+    def __init__(self: Self) -> None:
+        self._lock: Lock = Lock()
+        self._profiles: List[Tuple[str, Profile]] = []
+        self._directory: Optional[Path] = None
+        self._prefix: str = ''
+        self._interval: Optional[float] = None
+        self._snapshots: List[Path] = []
+        self._stopped: Event = Event()
+        self._sampler: Optional[Thread] = None
+
+    @property
+    def running(self: Self) -> bool:
+        return self._directory is not None
+
+    def start(
+        self: Self,
+        directory: Path,
+        interval: Optional[float] = None,
+        prefix: str = '',
+    ) -> None:
+        """
+            Starts profiling; does nothing if already profiling. Files are
+            named `<prefix><thread>.prof`.
+        """
+        if self.running:
+            return
+
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._prefix = prefix
+        self._interval = interval
+        self._snapshots = []
+        self._stopped.clear()
+
+        if interval is not None:
+            startTracing(Profiler.Frames)
+            # Started before the profile hook, so that sampling is not profiled.
+            self._sampler = Thread(target=self._sample, name='Profiler', daemon=True)
+            self._sampler.start()
+
+        self._enable()
+        setprofile(self._hook)
+
+    def _enable(self: Self) -> None:
+        profile: Profile = Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profile is active and covers this thread as well.
+            return
+
+        with self._lock:
+            self._profiles.append((current_thread().name, profile))
+
+    def _hook(self: Self, frame: Any, event: str, arg: Any) -> None:
+        # Called on the first event of each new thread; the profile replaces the hook.
+        self._enable()
+
+    def _sample(self: Self) -> None:
+        while not self._stopped.wait(self._interval):
+            self._snapshot()
+
+    def _snapshot(self: Self) -> None:
+        path: Path = self._directory / '{}memory-{:04}.snapshot'.format(self._prefix, len(self._snapshots))
+        take_snapshot().dump(str(path))
+        self._snapshots.append(path)
+
+    def stop(self: Self) -> List[Path]:
+        """
+            Stops profiling and returns the files written. Threads that still
+            run are written with what they recorded so far.
+        """
+        if not self.running:
+            return []
+
+        setprofile(None)
+        written: List[Path] = []
+
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+            self._snapshot()
+            stopTracing()
+            written += self._snapshots
+            written.append(self._summarize())
+
+        with self._lock:
+            profiles: List[Tuple[str, Profile]] = self._profiles
+            self._profiles = []
+
+        names: List[str] = []
+        for name, profile in profiles:
+            # Thread names need not be unique nor valid file names.
+            name = sub(r'[^\w.-]+', '_', name)
+            names.append(name)
+            if names.count(name) > 1:
+                name = '{}-{}'.format(name, names.count(name))
+
+            profile.disable()
+            path: Path = self._directory / '{}{}.prof'.format(self._prefix, name)
+            profile.dump_stats(path)
+            written.append(path)
+
+        self._directory = None
+        return written
+
+    def _summarize(self: Self) -> Path:
+        """
+            Writes the allocations that grew the most between the first and
+            the last snapshot.
+        """
+        first: Snapshot = Snapshot.load(str(self._snapshots[0]))
+        last: Snapshot = Snapshot.load(str(self._snapshots[-1]))
+        path: Path = self._directory / '{}memory.txt'.format(self._prefix)
+        path.write_text('\n'.join(map(
+            str,
+            last.compare_to(first, 'lineno')[:Profiler.TopStatistics],
+        )) + '\n')
+        return path
+
+
+# Profiler shared by all components of this process.
+profiler: Profiler = Profiler()
@@ -0,0 +1,291 @@
+from typing import (
+    Self,
+    Optional,
+    List,
+    Dict,
+    Set,
+    NamedTuple,
+    Any,
+)
+from pathlib import Path
+from os.path import commonpath
+from hashlib import sha256
+from threading import (
+    Thread,
+    Lock,
+)
+from queue import Queue
+from time import sleep
+from argparse import (
+    ArgumentParser,
+    Namespace,
+)
+from shader_minifier.minifier import (
+    MinifierVersion,
+    shader_minifier,
+    ObtainmentStrategy,
+    ShaderMinifierError,
+    ValidationError,
+)
+from shader_minifier.monitor import (
+    PollingMonitor,
+    createMonitor,
+)
+from shader_minifier.include import (
+    IncludeResolver,
+    IncludeError,
+    Expansion,
+)
+from shader_minifier.signals import Signal
+from shader_minifier.metrics import metrics
+
+
+class ProjectResult(NamedTuple):
+    # Hash over the content hashes of all members.
+    state: str
+    # Member -> minified source, empty if the minification failed.
+    minified: Dict[str, str]
+    error: Optional[Exception]
+
+    @property
+    def sizes(self: Self) -> Dict[str, int]:
+        return {name: len(minified) for name, minified in self.minified.items()}
+
+    @property
+    def total(self: Self) -> int:
+        return sum(self.sizes.values())
+
+
+class Project:
+    """
+        A set of shaders that are minified jointly, so that renaming stays
+        consistent across them. The project is only minified again when the
+        content hash of a member changes, and results are cached per
+        project state. Members are hashed after expanding their includes;
+        a changed file only re-expands the members that include it.
+    """
+    FPS = 10
+
+    minified: Signal = Signal(object)
+    stopped: Signal = Signal()
+
+    def __init__(
+        self: Self,
+        paths: Optional[List[Path]] = None,
+        version: MinifierVersion = MinifierVersion.v1_4_0,
+        includeDirectories: Optional[List[Path]] = None,
+    ) -> None:
+        self._version: MinifierVersion = version
+        self._minifier: Optional[shader_minifier] = None
+        self._resolver: IncludeResolver = IncludeResolver(includeDirectories)
+
+        # Member -> hash of its expanded source, None until it was expanded.
+        # Guarded by `_lock`, since members are added and removed from other threads.
+        self._members: Dict[Path, Optional[str]] = {}
+        self._lock: Lock = Lock()
+        self._sources: Dict[str, str] = {}
+        self._results: Dict[str, ProjectResult] = {}
+        self._latestState: Optional[str] = None
+
+        # Files the members were assembled from, all of which are monitored.
+        self._dependencies: Set[Path] = set()
+        self._monitor: PollingMonitor = createMonitor()
+        self._monitor.changed.connect(lambda path: self.update(Path(path)))
+
+        self._queue: Queue = Queue()
+        self._thread: Thread = Thread(target=self._run, name='Project')
+        self._running: bool = True
+
+        for path in paths if paths is not None else []:
+            self.add(path)
+
+    @property
+    def members(self: Self) -> List[Path]:
+        with self._lock:
+            return list(self._members)
+
+    @property
+    def latestResult(self: Self) -> Optional[ProjectResult]:
+        return self._results.get(self._latestState)
+
+    def add(self: Self, path: Any) -> None:
+        path = Path(path).absolute()
+        with self._lock:
+            if path in self._members:
+                return
+            self._members[path] = None
+        self.update(path)
+
+    def remove(self: Self, path: Any) -> None:
+        path = Path(path).absolute()
+        with self._lock:
+            if path not in self._members:
+                return
+            del self._members[path]
+        self.update()
+
+    def start(self: Self) -> None:
+        self._monitor.start()
+        self._thread.start()
+
+    def stop(self: Self) -> None:
+        self._running = False
+
+    def update(self: Self, path: Optional[Path] = None) -> None:
+        """
+            Minify the project again if needed; `path` is a file that changed.
+        """
+        self._queue.put(path)
+
+    def _read(self: Self, path: Path) -> Optional[str]:
+        """
+            Returns the hash of the expanded source of a member, or None if
+            it or one of its includes is missing.
+        """
+        try:
+            expansion: Expansion = self._resolver.expand(path)
+        except IncludeError as error:
+            print("Error: {}".format(error))
+            return None
+
+        self._sources[expansion.hash] = expansion.source
+        return expansion.hash
+
+    def _watchDependencies(self: Self, members: List[Path]) -> None:
+        dependencies: Set[Path] = set()
+        for member in members:
+            dependencies.update(self._resolver.dependencies(member))
+
+        for dependency in self._dependencies - dependencies:
+            self._monitor.unwatch(dependency)
+        for dependency in dependencies - self._dependencies:
+            self._monitor.watch(dependency)
+        self._dependencies = dependencies
+
+    @staticmethod
+    def _names(members: List[Path]) -> Dict[Path, str]:
+        """
+            Returns the shortest unambiguous name of each of `members`.
+        """
+        members = sorted(members)
+        if len(members) == 0:
+            return {}
+
+        try:
+            root: Path = Path(commonpath(members))
+        except ValueError:
+            # On different drives; there is no common root.
+            return {member: member.as_posix() for member in members}
+        if root in members:
+            root = root.parent
+        return {member: member.relative_to(root).as_posix() for member in members}
+
+    def _minify(self: Self, changed: Set[Path]) -> None:
+        # Only members that include a changed file need to be expanded again.
+        affected: Set[Path] = set()
+        for path in changed:
+            affected.update(self._resolver.affected(path))
+
+        # Members added or removed meanwhile are minified on their own update.
+        with self._lock:
+            members: Dict[Path, Optional[str]] = dict(self._members)
+
+        hashes: Dict[str, str] = {}
+        missing: bool = False
+        for path, name in Project._names(list(members)).items():
+            hash: Optional[str] = members[path] if path not in affected else None
+            if hash is None:
+                # Expanded again on the next update if it failed.
+                hash = self._read(path)
+                members[path] = hash
+            if hash is None:
+                missing = True
+                continue
+            hashes[name] = hash
+
+        with self._lock:
+            for path in set(members) & set(self._members):
+                self._members[path] = members[path]
+
+        self._watchDependencies(list(members))
+        if missing:
+            # A member or include is missing; wait until it reappears.
+            return
+
+        state: str = sha256(''.join(map(
+            lambda name: '{}\0{}\0'.format(name, hashes[name]),
+            sorted(hashes),
+        )).encode('utf-8')).digest().hex()
+        if state == self._latestState:
+            return
+        self._latestState = state
+
+        metrics.increment('project_cache_total', result='hit' if state in self._results else 'miss')
+        if state not in self._results:
+            if self._minifier is None:
+                self._minifier = shader_minifier(self._version, ObtainmentStrategy.Download)
+
+            try:
+                self._results[state] = ProjectResult(
+                    state,
+                    self._minifier.minifyMany({name: self._sources[hash] for name, hash in hashes.items()}),
+                    None,
+                )
+            except (ShaderMinifierError, ValidationError) as error:
+                self._results[state] = ProjectResult(state, {}, error)
+
+        self.minified.emit(self._results[state])
+
+    def _run(self: Self) -> int:
+        while self._running:
+            if self._queue.qsize() != 0:
+                changed: Set[Path] = set()
+                while self._queue.qsize() != 0:
+                    path: Optional[Path] = self._queue.get()
+                    if path is not None:
+                        changed.add(path)
+                self._minify(changed)
+
+            sleep(1 / Project.FPS)
+
+        self._monitor.stop()
+        self._monitor._thread.join()
+
+        self.stopped.emit()
+        return 0
+
+
+def main() -> int:
+    parser: ArgumentParser = ArgumentParser(description="Jointly minify a set of shaders whenever one of them changes.")
+    parser.add_argument('shaders', type=Path, nargs='+', help="Shader sources of the project.")
+    parser.add_argument('-m', '--minifier', default=MinifierVersion.v1_4_0.name, choices=[version.name for version in MinifierVersion if version != MinifierVersion.unavailable], help="shader_minifier version to use.")
+    parser.add_argument('-I', '--include-directory', type=Path, action='append', default=[], help="Directory to search for #include files; may be given multiple times.")
+    arguments: Namespace = parser.parse_args()
+
+    def report(result: ProjectResult) -> None:
+        if result.error is not None:
+            print("Project state {:.8} errored:\n{}".format(result.state, result.error))
+            return
+
+        for name, size in result.sizes.items():
+            print("{:<48} {:>8}".format(name, size))
+        print("{:<48} {:>8}\n".format("Total (state {:.8})".format(result.state), result.total))
+
+    project: Project = Project(arguments.shaders, MinifierVersion[arguments.minifier], arguments.include_directory)
+    project.minified.connect(report)
+    project.start()
+
+    try:
+        while True:
+            sleep(1)
+    except KeyboardInterrupt:
+        pass
+
+    project.stop()
+    project._thread.join()
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,74 @@
+from PyQt6.QtCore import (
+    QObject,
+    pyqtSignal,
+)
+from typing import (
+    Self,
+    Optional,
+    Dict,
+    Tuple,
+    Callable,
+    Any,
+)
+from time import perf_counter
+from shader_minifier.signals import BoundSignal
+from shader_minifier.tracing import tracer
+
+
+class QtSignal(QObject):
+    """
+        Relays a Qt-free signal to the thread this object lives in, usually
+        the GUI thread, through a queued Qt connection. The time an emission
+        waits for the event loop and the slots it runs are traced as stages
+        of the save the emitting thread works on.
+    """
+    emitted: pyqtSignal = pyqtSignal(tuple)
+
+    def __init__(
+        self: Self,
+        signal: BoundSignal,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+
+        self._name: Optional[str] = signal.name
+        signal.connect(self._relay)
+        # Connected first, so it runs before the slots.
+        self.emitted.connect(self._delivered)
+
+    def _relay(self: Self, *args: Any) -> None:
+        self.emitted.emit((tracer.current(), perf_counter(), args))
+
+    def _delivered(self: Self, emission: Tuple[Optional[str], float, Tuple[Any, ...]]) -> None:
+        hash, emitted, _ = emission
+        tracer.record('qt.wait', emitted, perf_counter(), hash, signal=self._name)
+
+    def connect(self: Self, slot: Callable[..., Any]) -> None:
+        def call(emission: Tuple[Optional[str], float, Tuple[Any, ...]]) -> None:
+            hash, _, args = emission
+            with tracer.span('qt.slot', hash, signal=self._name):
+                slot(*args)
+
+        self.emitted.connect(call)
+
+
+class QtAdapter(QObject):
+    """
+        Thin Qt layer over the engine. Calling the adapter with a signal of
+        an engine component returns its relay into the GUI thread.
+    """
+
+    def __init__(
+        self: Self,
+        parent: Optional[QObject] = None,
+    ) -> None:
+        super().__init__(parent)
+
+        self._signals: Dict[int, Tuple[BoundSignal, QtSignal]] = {}
+
+    def __call__(self: Self, signal: BoundSignal) -> QtSignal:
+        if id(signal) not in self._signals:
+            # Keep the signal alive alongside its relay so its id stays unique.
+            self._signals[id(signal)] = (signal, QtSignal(signal, self))
+
+        return self._signals[id(signal)][1]
@@ -0,0 +1,417 @@
+from typing import (
+    Self,
+    Optional,
+    List,
+    Dict,
+    Set,
+    Any,
+)
+from pathlib import Path
+from datetime import datetime
+from multiprocessing import get_context
+from multiprocessing.context import SpawnContext
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from threading import (
+    Thread,
+    Lock,
+    Event,
+)
+from queue import (
+    Queue,
+    Empty,
+)
+from traceback import print_exc
+from shader_minifier.engine import Engine
+from shader_minifier.tracing import tracer
+from shader_minifier.accounting import resources
+from shader_minifier.minifier import (
+    MinifierVersion,
+    shader_minifier,
+)
+from shader_minifier.watcher import Watcher
+from shader_minifier.monitor import PollingMonitor
+from shader_minifier.scheduler import Scheduler
+from shader_minifier.entropy import Entropy
+from shader_minifier.vcs import (
+    VCS,
+    CommitRecord,
+)
+
+
+class Sender:
+    """
+        Thread-safe sending end of the pipe between engine and GUI process.
+    """
+
+    def __init__(self: Self, connection: Connection) -> None:
+        self._connection: Connection = connection
+        self._lock: Lock = Lock()
+
+    def send(self: Self, *message: Any) -> None:
+        with self._lock:
+            self._connection.send(message)
+
+
+def _delta(
+    current: Dict[str, Any],
+    sent: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+        Returns the items of `current` that differ from `sent` and records them as sent.
+    """
+    delta: Dict[str, Any] = {}
+    for key, value in list(current.items()):
+        if key not in sent or sent[key] != value:
+            delta[key] = value
+            sent[key] = value
+    return delta
+
+
+def _serve(
+    connection: Connection,
+    buildCommand: Optional[List[str]],
+    home: Optional[Path],
+    target: Optional[Path],
+    autoSnapshot: bool,
+    includeDirectories: Optional[List[Path]],
+    minifiers: Optional[Dict[MinifierVersion, shader_minifier]],
+) -> int:
+    """
+        Entry point of the engine process. Runs an Engine and forwards its
+        results to the GUI process as compact messages.
+    """
+    engine: Engine = Engine(buildCommand, home, target, autoSnapshot, includeDirectories, minifiers)
+    sender: Sender = Sender(connection)
+
+    # Sources are sent once per hash; entropy results only when they change.
+    sentSources: Set[str] = set()
+    sentOutputs: Dict[str, str] = {}
+    sentEntropies: Dict[str, Any] = {}
+    # Minified sources are sent once per output hash.
+    sentMinified: Set[str] = set()
+    # Entropy outputs dict the sent outputs were taken from; remaps replace it.
+    sentFrom: List[Dict[str, str]] = [engine.entropy._outputs]
+
+    def watcherReset() -> None:
+        sentSources.clear()
+        sentMinified.clear()
+        sentOutputs.clear()
+        sentEntropies.clear()
+        sender.send('reset')
+
+    def fileChanged(watcher: Watcher) -> None:
+        time, hash = list(watcher._history.items())[-1]
+        source: Optional[str] = None
+        if hash not in sentSources:
+            source = watcher._versions[hash]
+            sentSources.add(hash)
+        sender.send('fileChanged', time, hash, source)
+
+    def minified(hash: str, minified: str, command: str = 'minified') -> None:
+        outputHash: str = engine.scheduler.outputHash(hash)
+        if outputHash in sentMinified:
+            minified = None
+        sentMinified.add(outputHash)
+        sender.send(command, hash, outputHash, minified, engine.scheduler._durations.get(hash))
+
+    def backfilled(hash: str, result: Any) -> None:
+        if type(result) == str:
+            minified(hash, result, 'backfilled')
+        else:
+            sender.send('backfilled', hash, None, result, engine.scheduler._durations.get(hash))
+
+    def built(entropy: Entropy) -> None:
+        outputs: Dict[str, str] = entropy._outputs
+        replaced: bool = outputs is not sentFrom[0]
+        if replaced:
+            sentFrom[0] = outputs
+            sentOutputs.clear()
+        sender.send(
+            'built',
+            _delta(outputs, sentOutputs),
+            _delta(entropy._versions, sentEntropies),
+            replaced,
+        )
+
+    engine.watcher.resetted.connect(watcherReset)
+    engine.watcher.fileLoaded.connect(lambda path: sender.send('fileLoaded', path))
+    engine.watcher.fileChanged.connect(fileChanged)
+    engine.scheduler.minified.connect(minified)
+    engine.scheduler.errored.connect(lambda hash, error: sender.send('errored', hash, error, engine.scheduler._durations.get(hash)))
+    engine.scheduler.backfilled.connect(backfilled)
+    engine.scheduler.switched.connect(lambda version: sender.send('switched', version.name))
+    engine.entropy.built.connect(built)
+    engine.repository.hasRepoChanged.connect(lambda hasRepo: sender.send('hasRepoChanged', hasRepo))
+    engine.repository.historyLoaded.connect(lambda commits: sender.send('historyLoaded', commits))
+
+    engine.start()
+
+    while True:
+        command, *arguments = connection.recv()
+
+        if command == 'open':
+            engine.open(*arguments)
+        elif command == 'changeMinifier':
+            engine.changeMinifier(*arguments)
+        elif command == 'changeValidation':
+            engine.changeValidation(*arguments)
+        elif command == 'createCommit':
+            engine.createCommit(*arguments)
+        elif command == 'loadCommit':
+            try:
+                hash: str = engine.loadCommit(*arguments)
+            except:
+                # The GUI process waits for a reply.
+                print_exc()
+                sender.send('commitLoaded', None, None)
+                continue
+            sentSources.add(hash)
+            sender.send('commitLoaded', hash, engine.watcher._versions[hash])
+        elif command == 'metrics':
+            sender.send('metrics', engine.metrics())
+        elif command == 'trace':
+            sender.send('trace', engine.trace())
+        elif command == 'profile':
+            engine.profile(*arguments)
+        elif command == 'stop':
+            engine.stop()
+            sender.send('stopped')
+            return 0
+
+
+class RemoteEngine:
+    """
+        Engine running in a child process. Exposes the same interface as
+        Engine; its components are mirrors that are updated from the
+        messages of the child process and emit the same signals, from a
+        receiver thread.
+    """
+    # Seconds between checks whether the engine process is still alive while waiting for it.
+    PollInterval: float = .5
+
+    def __init__(
+        self: Self,
+        buildCommand: Optional[List[str]] = None,
+        home: Optional[Path] = None,
+        target: Optional[Path] = None,
+        autoSnapshot: bool = False,
+        includeDirectories: Optional[List[Path]] = None,
+        minifiers: Optional[Dict[MinifierVersion, shader_minifier]] = None,
+    ) -> None:
+        # Spawn instead of fork; forking a process that runs Qt is unsafe.
+        context: SpawnContext = get_context('spawn')
+        self._connection, self._childConnection = context.Pipe()
+        self._process: BaseProcess = context.Process(
+            target=_serve,
+            args=(self._childConnection, buildCommand, home, target, autoSnapshot, includeDirectories, minifiers),
+            daemon=True,
+        )
+        self._sender: Sender = Sender(self._connection)
+        self._thread: Thread = Thread(target=self._receive, name='RemoteEngine')
+        self._commitsLoaded: Queue = Queue()
+        self._metrics: Queue = Queue()
+        self._trace: Queue = Queue()
+        self._stopped: Event = Event()
+
+        self._repository: VCS = VCS()
+        self._entropy: Entropy = Entropy()
+        # The mirror is never started; a polling monitor holds no descriptors.
+        self._watcher: Watcher = Watcher(monitor=PollingMonitor())
+        self._scheduler: Scheduler = Scheduler()
+
+    @property
+    def repository(self: Self) -> VCS:
+        return self._repository
+
+    @property
+    def entropy(self: Self) -> Entropy:
+        return self._entropy
+
+    @property
+    def watcher(self: Self) -> Watcher:
+        return self._watcher
+
+    @property
+    def scheduler(self: Self) -> Scheduler:
+        return self._scheduler
+
+    def start(self: Self) -> None:
+        self._process.start()
+        # Only the engine process writes to it; receiving ends when that process dies.
+        self._childConnection.close()
+        self._thread.start()
+
+    def stop(self: Self) -> None:
+        try:
+            self._sender.send('stop')
+        except OSError:
+            # The engine process is gone and has closed the pipe.
+            pass
+        while not self._stopped.wait(RemoteEngine.PollInterval) and self._process.is_alive():
+            pass
+        self._process.join()
+        self._thread.join()
+
+    def _request(self: Self, queue: Queue, *message: Any) -> Optional[Any]:
+        """
+            Sends `message` and waits for the reply of the engine process in
+            `queue`. Returns None if the engine process died before it
+            replied.
+        """
+        try:
+            self._sender.send(*message)
+        except OSError:
+            return None
+
+        while True:
+            try:
+                return queue.get(timeout=RemoteEngine.PollInterval)
+            except Empty:
+                if self._stopped.is_set() or not self._process.is_alive():
+                    # Replies that arrived meanwhile are in the queue already.
+                    return queue.get_nowait() if queue.qsize() != 0 else None
+
+    def open(self: Self, path: Any) -> None:
+        self._sender.send('open', str(path))
+
+    def changeMinifier(self: Self, version: str) -> None:
+        # The mirrored scheduler switches when the engine process did.
+        self._sender.send('changeMinifier', version)
+
+    def changeValidation(self: Self, policy: str) -> None:
+        self._scheduler.selectValidation(policy)
+        self._sender.send('changeValidation', policy)
+
+    def createCommit(
+        self: Self,
+        hash: str,
+        size: int,
+        entropy: Optional[Any] = None,
+    ) -> None:
+        self._sender.send('createCommit', hash, size, entropy)
+
+    def saveHistory(self: Self, filename: Any) -> None:
+        # The mirrored watcher has the complete history.
+        self._watcher.saveHistory(filename)
+
+    def loadCommit(self: Self, commit: CommitRecord) -> Optional[str]:
+        """
+            Returns the hash of the loaded source, or None if the engine
+            process failed to load it or died.
+        """
+        return self._request(self._commitsLoaded, 'loadCommit', commit)
+
+    def metrics(self: Self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+            Returns a snapshot of the metrics of the engine process.
+        """
+        snapshot: Optional[Dict[str, List[Dict[str, Any]]]] = self._request(self._metrics, 'metrics')
+        return snapshot if snapshot is not None else {'counters': [], 'gauges': [], 'timings': []}
+
+    def resources(self: Self) -> List[Dict[str, Any]]:
+        """
+            Returns the subprocess resource usage of the engine process.
+        """
+        return resources(self.metrics())
+
+    def profile(
+        self: Self,
+        directory: Path,
+        interval: Optional[float] = None,
+    ) -> None:
+        """
+            Profiles the threads of the engine process, with file names
+            prefixed by `engine-`, until `stop`.
+        """
+        self._sender.send('profile', directory, interval, 'engine-')
+
+    def trace(self: Self) -> List[Dict[str, Any]]:
+        """
+            Returns the traced stages of the engine process merged with the
+            ones of this process, e.g. the GUI.
+        """
+        events: Optional[List[Dict[str, Any]]] = self._request(self._trace, 'trace')
+        return (events if events is not None else []) + tracer.events()
+
+    def _receive(self: Self) -> None:
+        while True:
+            try:
+                command, *arguments = self._connection.recv()
+            except EOFError:
+                # The engine process died.
+                self._stopped.set()
+                return
+
+            if command == 'reset':
+                self._watcher._versions = {}
+                self._watcher._history = {}
+                self._watcher._latestHash = None
+                self._scheduler._outputs = {}
+                self._scheduler._caches = {}
+                self._scheduler._switchTo(self._scheduler._selectedVersion)
+                self._entropy._outputs = {}
+                self._entropy._versions = {}
+                self._scheduler.versionsUpdated.emit(self._scheduler)
+            elif command == 'fileLoaded':
+                path: str = arguments[0]
+                self._watcher._path = Path(path)
+                self._watcher.fileLoaded.emit(path)
+            elif command == 'fileChanged':
+                time: datetime = arguments[0]
+                hash: str = arguments[1]
+                source: Optional[str] = arguments[2]
+                if source is not None:
+                    self._watcher._versions[hash] = source
+                self._watcher._history[time] = hash
+                self._watcher._latestHash = hash
+                with tracer.span('remote.receive', hash):
+                    self._watcher.fileChanged.emit(self._watcher)
+            elif command in ['minified', 'errored', 'backfilled']:
+                if command == 'errored':
+                    hash, result, duration = arguments
+                    outputHash: Optional[str] = None
+                else:
+                    hash, outputHash, result, duration = arguments
+                    if outputHash is not None and result is None:
+                        result = self._scheduler.output(outputHash)
+                if duration is not None:
+                    self._scheduler._durations[hash] = duration
+                self._scheduler.addResult(hash, result, outputHash)
+                with tracer.span('remote.receive', hash):
+                    if command == 'minified':
+                        self._scheduler.minified.emit(hash, result)
+                    elif command == 'errored':
+                        self._scheduler.errored.emit(hash, result)
+                    else:
+                        self._scheduler.backfilled.emit(hash, result)
+                    self._scheduler.versionsUpdated.emit(self._scheduler)
+            elif command == 'switched':
+                version: MinifierVersion = MinifierVersion[arguments[0]]
+                self._scheduler._switchTo(version)
+                self._scheduler.switched.emit(version)
+                self._scheduler.versionsUpdated.emit(self._scheduler)
+            elif command == 'built':
+                outputs, versions, replaced = arguments
+                if replaced:
+                    self._entropy._outputs = outputs
+                else:
+                    self._entropy._outputs.update(outputs)
+                self._entropy._versions.update(versions)
+                self._entropy.built.emit(self._entropy)
+            elif command == 'hasRepoChanged':
+                self._repository.hasRepoChanged.emit(*arguments)
+            elif command == 'historyLoaded':
+                self._repository.historyLoaded.emit(*arguments)
+            elif command == 'commitLoaded':
+                hash, source = arguments
+                if hash is not None:
+                    self._watcher._versions[hash] = source
+                self._commitsLoaded.put(hash)
+            elif command == 'metrics':
+                self._metrics.put(arguments[0])
+            elif command == 'trace':
+                self._trace.put(arguments[0])
+            elif command == 'stopped':
+                self._stopped.set()
+                return
@@ -1,77 +1,125 @@
-from PyQt6.QtCore import (
-    QObject,
-    pyqtSignal,
-    QVariant,
-)
+from shader_minifier.signals import Signal
 from typing import (
     Self,
     Dict,
+    List,
+    Tuple,
     Optional,
+    Any,
 )
 from threading import Thread
 from queue import Queue
-from time import sleep
+from hashlib import sha256
+from time import (
+    sleep,
+    perf_counter,
+)
 from shader_minifier.minifier import (
     MinifierVersion,
     shader_minifier,
     ObtainmentStrategy,
     ShaderMinifierError,
     ValidationError,
+    ValidationPolicy,
 )
+from shader_minifier.metrics import metrics
+from shader_minifier.tracing import tracer
 
 
-class Scheduler(QObject):
+class Scheduler:
     FPS = 10
 
     # Hash, minified source
-    minified: pyqtSignal = pyqtSignal(str, str)
-    versionsUpdated: pyqtSignal = pyqtSignal(QVariant)
+    minified: Signal = Signal(str, str)
+    versionsUpdated: Signal = Signal(object)
 
     # Hash, error text
-    errored: pyqtSignal = pyqtSignal(str, QVariant)
-    stopped: pyqtSignal = pyqtSignal()
-    minifiersObtained: pyqtSignal = pyqtSignal()
-    resetted: pyqtSignal = pyqtSignal()
+    errored: Signal = Signal(str, object)
+    stopped: Signal = Signal()
+    minifiersObtained: Signal = Signal()
+    resetted: Signal = Signal()
+    # Hash, minified source or error of a previous save; see `backfill`.
+    backfilled: Signal = Signal(str, object)
+    # Selected version, once its cached results are in place.
+    switched: Signal = Signal(object)
 
-    def __init__(self: Self) -> None:
-        super().__init__()
-
-        self._thread: Thread = Thread(target=self._run)
+    def __init__(
+        self: Self,
+        minifiers: Optional[Dict[MinifierVersion, shader_minifier]] = None,
+    ) -> None:
+        """
+            Explicit `minifiers` are used as they are; no other versions are
+            obtained then, e.g. for offline use.
+        """
+        self._thread: Thread = Thread(target=self._run, name='Scheduler')
         self._queue: Queue = Queue()
         self._running: bool = True
         self._reset: bool = False
-        self._minifiers: Dict[MinifierVersion, shader_minifier] = {}
+        self._switch: Optional[MinifierVersion] = None
+        self._minifiers: Dict[MinifierVersion, shader_minifier] = dict(minifiers) if minifiers is not None else {}
+        self._obtain: bool = minifiers is None
         self._selectedVersion: MinifierVersion = MinifierVersion.v1_4_0
+        self._validation: ValidationPolicy = ValidationPolicy.Both
+        # Version, hash, source, normalized hash and queue time of previous saves; minified when idle.
+        self._backfill: Queue = Queue()
 
-        self._versions: Dict[str, str] = {}
+        # Output hash -> minified source, stored once for all versions.
+        self._outputs: Dict[str, str] = {}
+        # Version -> results of that version; the dicts below are those of the selected one.
+        self._caches: Dict[MinifierVersion, Tuple[Dict[str, Any], Dict[str, str], Dict[str, float], Dict[str, str]]] = {}
+        # Hash -> minified source or error. Equal outputs are the same object.
+        self._versions: Dict[str, Any]
+        # Hash -> output hash of its minified source.
+        self._outputHashes: Dict[str, str]
+        # Hash -> seconds the minify job took.
+        self._durations: Dict[str, float]
+        # Normalized hash -> hash of a source with that normalization and a minified result.
+        self._equivalents: Dict[str, str]
+        self._switchTo(self._selectedVersion)
 
     def start(self: Self) -> None:
         self._thread.start()
 
-    def minifyShader(self: Self, hash: str, source: str) -> None:
-        self._queue.put((hash, source))
+    def minifyShader(
+        self: Self,
+        hash: str,
+        source: str,
+        normalizedHash: Optional[str] = None,
+    ) -> None:
+        """
+            Queue a save. Sources with the same `normalizedHash` as one
+            that minified reuse its result instead of being minified again.
+            Errors are not reused; their line numbers may differ.
+        """
+        self._queue.put((hash, source, normalizedHash, perf_counter()))
+        metrics.set('scheduler_queue_depth', self._queue.qsize())
 
     def selectMinifierVersion(self: Self, version: MinifierVersion) -> None:
-        self._selectedVersion = version
+        """
+            Switch to `version` before the next job. Results of each
+            version are kept, and those of `version` are restored.
+        """
+        self._switch = version
 
     def stop(self: Self) -> None:
         self._running = False
 
     def _load(self: Self, version: MinifierVersion) -> int:
-        self._minifiers[version] = shader_minifier(version, ObtainmentStrategy.Download)
+        with metrics.time('scheduler_obtain_seconds', version=version.name):
+            self._minifiers[version] = shader_minifier(version, ObtainmentStrategy.Download)
         return 0
 
     def _run(self: Self) -> int:
         threads: Dict[MinifierVersion, Thread] = {}
 
-        for version in MinifierVersion:
-            if version != MinifierVersion.unavailable:
-                threads[version] = Thread(target=self._load, args=[version])
-                threads[version].start()
+        if self._obtain:
+            for version in MinifierVersion:
+                if version != MinifierVersion.unavailable:
+                    threads[version] = Thread(target=self._load, args=[version], name='Obtain {}'.format(version.name))
+                    threads[version].start()
 
-        for version in MinifierVersion:
-            if version != MinifierVersion.unavailable:
-                threads[version].join()
+        for thread in threads.values():
+            thread.join()
 
         self.minifiersObtained.emit()
 
@@ -79,25 +127,34 @@ class Scheduler(QObject):
             if self._reset:
                 while self._queue.qsize() != 0:
                     self._queue.get()
-                self._versions = {}
+                while self._backfill.qsize() != 0:
+                    self._backfill.get()
+                self._outputs = {}
+                self._caches = {}
+                self._switchTo(self._selectedVersion)
                 self._reset = False
                 self.resetted.emit()
                 self.versionsUpdated.emit(self)
 
-            while self._queue.qsize() != 0:
-                hash, source = self._queue.get()
-                result: Optional[str] = None
-                try:
-                    result = self._minifiers[self._selectedVersion].minify(source)
-                    self.minified.emit(hash, result)
-                except ShaderMinifierError as error:
-                    result = error
-                    self.errored.emit(hash, error)
-                except ValidationError as error:
-                    result = error
-                    self.errored.emit(hash, error)
-                self._versions[hash] = result
+            if self._switch is not None:
+                version: MinifierVersion = self._switch
+                self._switch = None
+                self._switchTo(version)
+                self.switched.emit(version)
                 self.versionsUpdated.emit(self)
+
+            while self._queue.qsize() != 0:
+                hash, source, normalizedHash, queued = self._queue.get()
+                metrics.set('scheduler_queue_depth', self._queue.qsize())
+                self._minify(hash, source, normalizedHash, queued)
+
+            # Saves come first; previous saves are backfilled one at a time in between.
+            if self._backfill.qsize() != 0:
+                version, hash, source, normalizedHash, queued = self._backfill.get()
+                metrics.set('scheduler_backfill_depth', self._backfill.qsize())
+                if version == self._selectedVersion and hash not in self._versions:
+                    self._minify(hash, source, normalizedHash, queued, True)
+                continue
                 
             sleep(1. / Scheduler.FPS)
 
@@ -105,8 +162,126 @@ class Scheduler(QObject):
 
         return 0
 
+    def _minify(
+        self: Self,
+        hash: str,
+        source: str,
+        normalizedHash: Optional[str],
+        queued: float,
+        backfill: bool = False,
+    ) -> None:
+        started: float = perf_counter()
+        metrics.observe('scheduler_queue_wait_seconds', started - queued, queue='backfill' if backfill else 'saves')
+        tracer.record('scheduler.wait', queued, started, hash)
+
+        with tracer.span('scheduler.backfill' if backfill else 'scheduler.minify', hash, version=self._selectedVersion.name):
+            result: Optional[str] = None
+            equivalent: Optional[str] = self._equivalents.get(normalizedHash) if normalizedHash is not None else None
+            if equivalent is not None:
+                # Only comments or whitespace changed: same output.
+                result = self._versions[equivalent]
+                metrics.increment('scheduler_jobs_total', result='reused')
+            else:
+                try:
+                    with metrics.time('scheduler_job_seconds', version=self._selectedVersion.name):
+                        result = self._minifiers[self._selectedVersion].minify(
+                            source,
+                            validation=self._validation,
+                            pipelined=True,
+                        )
+                    metrics.increment('scheduler_jobs_total', result='minified')
+                except (ShaderMinifierError, ValidationError) as error:
+                    result = error
+                    metrics.increment('scheduler_jobs_total', result='errored')
+            self._durations[hash] = perf_counter() - started
+            self.addResult(hash, result)
+            if normalizedHash is not None and type(result) == str:
+                self._equivalents.setdefault(normalizedHash, hash)
+
+            # Results of previous saves are not new saves; they are neither built nor snapshot.
+            if backfill:
+                self.backfilled.emit(hash, result)
+            elif type(result) == str:
+                self.minified.emit(hash, result)
+            else:
+                self.errored.emit(hash, result)
+            self.versionsUpdated.emit(self)
+
+    def backfill(
+        self: Self,
+        version: MinifierVersion,
+        sources: List[Tuple[str, str, Optional[str]]],
+    ) -> None:
+        """
+            Minify the (hash, source, normalized hash) of previous saves
+            with `version` while no save is waiting. They are skipped if
+            they have a result by then, or if another version is selected.
+        """
+        queued: float = perf_counter()
+        for hash, source, normalizedHash in sources:
+            self._backfill.put((version, hash, source, normalizedHash, queued))
+        metrics.set('scheduler_backfill_depth', self._backfill.qsize())
+
+    def _switchTo(self: Self, version: MinifierVersion) -> None:
+        """
+            Select `version` and its cached results. Replaces the result
+            dicts, like a reset, so that readers notice the switch.
+        """
+        self._selectedVersion = version
+        # _versions last; readers look up the other dicts by its keys.
+        self._equivalents = self._caches.setdefault(version, ({}, {}, {}, {}))[3]
+        self._durations = self._caches[version][2]
+        self._outputHashes = self._caches[version][1]
+        self._versions = self._caches[version][0]
+
+    @staticmethod
+    def hashOutput(minified: str) -> str:
+        return sha256(minified.encode('utf-8')).digest().hex()
+
+    def addResult(
+        self: Self,
+        hash: str,
+        result: Any,
+        outputHash: Optional[str] = None,
+    ) -> None:
+        """
+            Store the minified source or error of the source with `hash`.
+            Minified sources are stored once per output hash.
+        """
+        if type(result) == str:
+            if outputHash is None:
+                outputHash = Scheduler.hashOutput(result)
+            result = self._outputs.setdefault(outputHash, result)
+            self._outputHashes[hash] = outputHash
+        # Last, so that readers of _versions find the output hash.
+        self._versions[hash] = result
+
+    def outputHash(self: Self, hash: str) -> Optional[str]:
+        """
+            Returns the hash of the minified source of the source with
+            `hash`, or None if it is pending or errored.
+        """
+        return self._outputHashes.get(hash)
+
+    def output(self: Self, outputHash: str) -> str:
+        return self._outputs[outputHash]
+
+    def sameOutput(self: Self, hash: str, other: str) -> bool:
+        """
+            Returns whether both sources minified to the same output.
+        """
+        outputHash: Optional[str] = self._outputHashes.get(hash)
+        return outputHash is not None and outputHash == self._outputHashes.get(other)
+
     def reset(self: Self) -> None:
         self._reset = True
 
     def selectMinifier(self: Self, version: str) -> None:
-        self._selectedVersion = MinifierVersion[version]
+        self.selectMinifierVersion(MinifierVersion[version])
+
+    def selectValidation(self: Self, policy: str) -> None:
+        """
+            Select which of input and output of the next jobs are
+            validated: none, input, output or both.
+        """
+        self._validation = ValidationPolicy(policy)
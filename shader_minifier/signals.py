@@ -0,0 +1,70 @@
+from typing import (
+    Self,
+    Optional,
+    List,
+    Callable,
+    Any,
+)
+from threading import Lock
+
+
+class BoundSignal:
+    """
+        Callbacks connected to the signal of one object. Slots are called
+        synchronously in the emitting thread.
+    """
+
+    def __init__(self: Self, name: Optional[str] = None) -> None:
+        self._slots: List[Callable[..., Any]] = []
+        self._lock: Lock = Lock()
+        self._name: Optional[str] = name
+
+    @property
+    def name(self: Self) -> Optional[str]:
+        return self._name
+
+    def connect(self: Self, slot: Callable[..., Any]) -> None:
+        with self._lock:
+            self._slots.append(slot)
+
+    def disconnect(self: Self, slot: Optional[Callable[..., Any]] = None) -> None:
+        """
+            Disconnect `slot`, or all slots if it is None.
+        """
+        with self._lock:
+            if slot is None:
+                self._slots = []
+            else:
+                self._slots.remove(slot)
+
+    def receivers(self: Self) -> int:
+        return len(self._slots)
+
+    def emit(self: Self, *args: Any) -> None:
+        with self._lock:
+            slots: List[Callable[..., Any]] = list(self._slots)
+
+        for slot in slots:
+            slot(*args)
+
+
+class Signal:
+    """
+        Qt-free replacement for pyqtSignal. Declared on the class, it
+        provides a BoundSignal per instance.
+    """
+
+    def __init__(self: Self, *types: Any) -> None:
+        self._types: List[Any] = list(types)
+        self._name: Optional[str] = None
+
+    def __set_name__(self: Self, owner: type, name: str) -> None:
+        self._name = name
+
+    def __get__(self: Self, instance: Any, owner: type) -> Any:
+        if instance is None:
+            return self
+
+        # Shadow the descriptor with the instance's bound signal. setdefault
+        # keeps concurrent first accesses from creating two of them.
+        return instance.__dict__.setdefault(self._name, BoundSignal('{}.{}'.format(type(instance).__name__, self._name)))
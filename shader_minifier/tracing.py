@@ -0,0 +1,194 @@
+from typing import (
+    Self,
+    Optional,
+    List,
+    Dict,
+    Iterator,
+    Any,
+)
+from pathlib import Path
+from collections import deque
+from contextlib import contextmanager
+from threading import (
+    local,
+    current_thread,
+    get_ident,
+)
+from time import perf_counter
+from os import getpid
+from json import dumps
+
+
+class Span:
+    """
+        A traced stage. `hash` is the content hash of the save the stage
+        works on; it can be set while the span is open, once it is known.
+    """
+    __slots__ = ('name', 'hash', 'args', 'start')
+
+    def __init__(
+        self: Self,
+        name: str,
+        hash: Optional[str],
+        args: Dict[str, Any],
+    ) -> None:
+        self.name: str = name
+        self.hash: Optional[str] = hash
+        self.args: Dict[str, Any] = args
+        self.start: float = perf_counter()
+
+
+class Tracer:
+    """
+        Records the stages a save passes through in every thread, keyed by
+        the content hash of the save, and exports them in the Chrome trace
+        event format that chrome://tracing and Perfetto open. Stages of one
+        save are connected by flow arrows and summarized in an async `save`
+        track from the first to the last stage.
+    """
+    # The oldest events are dropped beyond this, so that tracing can stay on.
+    MaximumEvents: int = 100000
+
+    def __init__(self: Self) -> None:
+        self.enabled: bool = True
+        self._events: deque = deque(maxlen=Tracer.MaximumEvents)
+        # Thread id -> thread name.
+        self._threads: Dict[int, str] = {}
+        # Per thread: stack of open spans.
+        self._local: local = local()
+
+    def _stack(self: Self) -> List[Span]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def current(self: Self) -> Optional[str]:
+        """
+            Returns the hash of the innermost open span of this thread that
+            has one.
+        """
+        for span in reversed(self._stack()):
+            if span.hash is not None:
+                return span.hash
+        return None
+
+    @contextmanager
+    def span(
+        self: Self,
+        name: str,
+        hash: Optional[str] = None,
+        **args: Any,
+    ) -> Iterator[Span]:
+        """
+            Records the `with` block as a stage of the save with `hash`, by
+            default the save of the enclosing span.
+        """
+        span: Span = Span(name, hash if hash is not None else self.current(), args)
+        stack: List[Span] = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            stack.pop()
+            self.record(span.name, span.start, perf_counter(), span.hash, **span.args)
+
+    def record(
+        self: Self,
+        name: str,
+        start: float,
+        end: float,
+        hash: Optional[str] = None,
+        **args: Any,
+    ) -> None:
+        """
+            Records a stage measured with `perf_counter`, e.g. the time an
+            item waited in a queue, on the calling thread.
+        """
+        if not self.enabled:
+            return
+
+        thread: int = get_ident()
+        if thread not in self._threads:
+            self._threads[thread] = current_thread().name
+        self._events.append((name, start, end, thread, hash, args))
+
+    def clear(self: Self) -> None:
+        self._events.clear()
+
+    def events(self: Self) -> List[Dict[str, Any]]:
+        """
+            Returns the recorded stages of this process as Chrome trace
+            events, which can be sent between processes and merged.
+        """
+        pid: int = getpid()
+        events: List[Dict[str, Any]] = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': thread, 'args': {'name': name}}
+            for thread, name in list(self._threads.items())
+        ]
+        for name, start, end, thread, hash, args in list(self._events):
+            event: Dict[str, Any] = {
+                'name': name,
+                'cat': name.split('.')[0],
+                'ph': 'X',
+                'ts': start * 1e6,
+                'dur': (end - start) * 1e6,
+                'pid': pid,
+                'tid': thread,
+                'args': dict(args, hash=hash) if hash is not None else dict(args),
+            }
+            events.append(event)
+        return events
+
+    @staticmethod
+    def chrome(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+            Links the stages of each save in `events` and returns the trace.
+        """
+        stages: Dict[str, List[Dict[str, Any]]] = {}
+        for event in events:
+            if event['ph'] == 'X' and 'hash' in event['args']:
+                stages.setdefault(event['args']['hash'], []).append(event)
+
+        linked: List[Dict[str, Any]] = list(events)
+        for hash, saveStages in stages.items():
+            saveStages.sort(key=lambda event: event['ts'])
+            # Flow ids are numbers; 52 bits stay exact in JSON.
+            flow: int = int(hash[:13], 16)
+            for index, event in enumerate(saveStages):
+                event['bind_id'] = flow
+                event['flow_in'] = index != 0
+                event['flow_out'] = index != len(saveStages) - 1
+
+            first: Dict[str, Any] = saveStages[0]
+            end: float = max(map(lambda event: event['ts'] + event['dur'], saveStages))
+            for phase, time in [('b', first['ts']), ('e', end)]:
+                linked.append({
+                    'name': 'save {:.8}'.format(hash),
+                    'cat': 'save',
+                    'ph': phase,
+                    'id': hash[:16],
+                    'ts': time,
+                    'pid': first['pid'],
+                    'tid': first['tid'],
+                    'args': {'hash': hash} if phase == 'b' else {},
+                })
+
+        return {
+            'traceEvents': linked,
+            'displayTimeUnit': 'ms',
+        }
+
+    def save(
+        self: Self,
+        path: Any,
+        events: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """
+            Writes the trace of `events`, by default the events of this
+            process, to `path`.
+        """
+        Path(path).write_text(dumps(Tracer.chrome(events if events is not None else self.events())))
+
+
+# Tracer shared by all components of this process.
+tracer: Tracer = Tracer()
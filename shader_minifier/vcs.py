@@ -1,42 +1,94 @@
 from typing import (
     Self,
     Optional,
+    List,
+    Tuple,
+    Any,
+    NamedTuple,
 )
 from pygit2 import (
     Repository,
     Oid,
+    Tree,
+    Commit,
+    Reference,
+    Walker,
+    GIT_FILEMODE_BLOB,
+    GIT_FILEMODE_TREE,
+    GIT_SORT_TIME,
+    GIT_SORT_REVERSE,
 )
+from parse import (
+    parse,
+    search,
+    Result,
+)
+from datetime import datetime
 from pathlib import Path
 from queue import Queue
 from threading import Thread
-from time import sleep
-from PyQt6.QtCore import (
-    pyqtSignal,
-    QVariant,
-    QObject,
+from time import (
+    sleep,
+    monotonic,
 )
+from shader_minifier.signals import Signal
+from shader_minifier.metrics import metrics
+from shader_minifier.tracing import tracer
 from traceback import print_exc
 
 
-class VCS(QObject):
+class CommitRecord(NamedTuple):
+    """
+        Size and entropy recorded in a crunch commit. The shader source is
+        only referenced by its blob id and loaded on demand.
+    """
+    commit: str
+    time: datetime
+    size: Optional[int]
+    entropy: Any
+    blob: str
+
+
+class VCS:
     GitRepositorySuffix: str = '.git'
     FPS: int = 10
+    SnapshotRefPrefix: str = 'refs/pyshader/'
+    # Seconds without new snapshots after which a burst of saves is committed.
+    SnapshotDelay: float = 1.
+    # Maximum number of snapshots to collect before committing regardless.
+    SnapshotBatchSize: int = 64
+    CommitMessage: str = """Crunched {shaderName} to {size} bytes using PyShaderMinifier.
+    Shader file: {shader}
+    New size: {size}
+    New entropy: {entropy}
+    """
+    # Snapshots are taken when a save is minified, before its entropy is known.
+    SnapshotMessage: str = """Crunched {shaderName} to {size} bytes using PyShaderMinifier.
+    Shader file: {shader}
+    New size: {size}
+    """
 
-    commited: pyqtSignal = pyqtSignal(QVariant)
-    stopped: pyqtSignal = pyqtSignal()
-    resetted: pyqtSignal = pyqtSignal()
-    hasRepoChanged: pyqtSignal = pyqtSignal(bool)
+    commited: Signal = Signal(object)
+    stopped: Signal = Signal()
+    resetted: Signal = Signal()
+    hasRepoChanged: Signal = Signal(bool)
+    historyLoaded: Signal = Signal(object)
 
     def __init__(
         self: Self,
         path: Optional[Path] = None,
+        autoSnapshot: bool = False,
     ) -> None:
-        super().__init__()
-
         self._path: Path = Path(path) if path is not None else path
+        self._autoSnapshot: bool = autoSnapshot
 
         self._queue: Queue = Queue()
-        self._thread: Thread = Thread(target=self._run)
+        self._snapshotQueue: Queue = Queue()
+        # Hash, source and size of snapshots not yet committed.
+        self._pendingSnapshots: List[Tuple[str, str, int]] = []
+        self._latestSnapshotTime: float = 0.
+        self._latestSnapshotHash: str = ""
+        self._thread: Thread = Thread(target=self._run, name='VCS')
         self._running: bool = True
 
         self._latestHash: str = ""
@@ -69,6 +121,82 @@ class VCS(QObject):
 
     def changeShader(self: Self, value: Path) -> None:
         self.shader = value
+        self.loadHistory()
+
+    def loadHistory(self: Self) -> None:
+        """
+            Walk the commits on HEAD and the snapshot ref and emit the crunch
+            commits of the current shader. Only commit messages and tree
+            entries are read; blob contents are loaded by `loadCommit`.
+        """
+        if self._path is None or not self._shader or self._repository.head_is_unborn:
+            self.historyLoaded.emit([])
+            return
+
+        shader: str = self._shader.relative_to(self._path).as_posix()
+        walker: Walker = self._repository.walk(self._repository.head.target, GIT_SORT_TIME | GIT_SORT_REVERSE)
+        reference: Optional[Reference] = self._repository.references.get(self.snapshotRef)
+        if reference is not None:
+            walker.push(reference.target)
+
+        records: List[CommitRecord] = []
+        with metrics.time('vcs_operation_seconds', operation='history'):
+            for commit in walker:
+                record: Optional[CommitRecord] = VCS._parseCommit(commit, shader)
+                if record is not None:
+                    records.append(record)
+
+        self.historyLoaded.emit(records)
+
+    @staticmethod
+    def _parseCommit(
+        commit: Commit,
+        shader: str,
+    ) -> Optional[CommitRecord]:
+        lines: List[str] = commit.message.splitlines()
+        if len(lines) == 0:
+            return None
+
+        header: Optional[Result] = parse('Crunched {} to {} bytes using PyShaderMinifier.', lines[0].strip())
+        if header is None:
+            return None
+
+        shaderFile: Optional[Result] = search('Shader file: {}\n', commit.message)
+        if shaderFile is None or Path(shaderFile[0].strip()).as_posix() != shader:
+            return None
+
+        if shader not in commit.tree:
+            return None
+
+        size: Optional[int] = None
+        try:
+            size = int(header[1])
+        except ValueError:
+            pass
+
+        entropy: Any = None
+        entropyLine: Optional[Result] = search('New entropy: {}\n', commit.message)
+        if entropyLine is not None:
+            value: str = entropyLine[0].strip()
+            try:
+                entropy = float(value)
+            except ValueError:
+                entropy = value if value != str(None) else None
+
+        return CommitRecord(
+            commit=str(commit.id),
+            time=datetime.fromtimestamp(commit.commit_time),
+            size=size,
+            entropy=entropy,
+            blob=str(commit.tree[shader].id),
+        )
+
+    def loadCommit(self: Self, record: CommitRecord) -> str:
+        """
+            Returns the shader source recorded in a crunch commit.
+        """
+        with metrics.time('vcs_operation_seconds', operation='load'):
+            return self._repository[record.blob].data.decode('utf-8')
 
     def start(self: Self) -> None:
         self._thread.start()
@@ -81,7 +209,11 @@ class VCS(QObject):
             if self._reset:
                 while self._queue.qsize() != 0:
                     self._queue.get()
+                while self._snapshotQueue.qsize() != 0:
+                    self._snapshotQueue.get()
+                self._pendingSnapshots = []
                 self._latestHash = ""
+                self._latestSnapshotHash = ""
                 self._shader = ""
                 self._reset = False
                 self.resetted.emit()
@@ -91,36 +223,140 @@ class VCS(QObject):
 
                 if not self._latestHash == hash:
                     try:
-                        self._repository.index.add(self._shader.relative_to(self._path))
-                        self._repository.index.write()
-
-                        commit: Oid = self._repository.create_commit(
-                            None,
-                            self._repository.default_signature,
-                            self._repository.default_signature,
-                            """Crunched {shaderName} to {size} bytes using PyShaderMinifier.
-    Shader file: {shader}
-    New size: {size}
-    New entropy: {entropy}
-    """.format(
-        shader=self._shader.relative_to(self._path),
-        shaderName=self._shader.name if self._shader is not None else 'Unavailable',
-        size=size,
-        entropy=entropy,
-    ),
-                            self._repository.index.write_tree(),
-                            [self._repository.head.target],
-                        )
-                        self._repository.head.set_target(commit)
+                        with metrics.time('vcs_operation_seconds', operation='commit'), tracer.span('vcs.commit', hash):
+                            self._repository.index.add(self._shader.relative_to(self._path))
+                            self._repository.index.write()
+
+                            commit: Oid = self._repository.create_commit(
+                                None,
+                                self._repository.default_signature,
+                                self._repository.default_signature,
+                                self._message(size, entropy),
+                                self._repository.index.write_tree(),
+                                [self._repository.head.target],
+                            )
+                            self._repository.head.set_target(commit)
                     except:
+                        metrics.increment('vcs_errors_total', operation='commit')
                         print("Error: Could not create commit.")
                         print_exc()
                 else:
                     # A commit only makes sense if something has actually changed.
                     print("Warning: Ignoring attempted empty commit with identical hash.")
 
+            while self._snapshotQueue.qsize() != 0:
+                self._pendingSnapshots.append(self._snapshotQueue.get())
+                self._latestSnapshotTime = monotonic()
+            metrics.set('vcs_pending_snapshots', len(self._pendingSnapshots))
+
+            # Wait for bursts of saves to settle before committing them in one go.
+            if len(self._pendingSnapshots) != 0 and (
+                monotonic() - self._latestSnapshotTime >= VCS.SnapshotDelay
+                or len(self._pendingSnapshots) >= VCS.SnapshotBatchSize
+            ):
+                try:
+                    with metrics.time('vcs_operation_seconds', operation='snapshot'):
+                        self._commitSnapshots(self._pendingSnapshots)
+                    metrics.increment('vcs_snapshots_total', len(self._pendingSnapshots))
+                except:
+                    metrics.increment('vcs_errors_total', operation='snapshot')
+                    print("Error: Could not create snapshot.")
+                    print_exc()
+                self._pendingSnapshots = []
+
             sleep(1 / VCS.FPS)
 
+    def _message(
+        self: Self,
+        size: int,
+        entropy: Any,
+        message: str = CommitMessage,
+    ) -> str:
+        return message.format(
+            shader=self._shader.relative_to(self._path).as_posix(),
+            shaderName=self._shader.name if self._shader is not None else 'Unavailable',
+            size=size,
+            entropy=entropy,
+        )
+
+    @property
+    def snapshotRef(self: Self) -> Optional[str]:
+        if self._path is None or not self._shader:
+            return None
+
+        return VCS.SnapshotRefPrefix + self._shader.relative_to(self._path).as_posix()
+
+    def _insertBlob(
+        self: Self,
+        tree: Optional[Tree],
+        parts: List[str],
+        blob: Oid,
+    ) -> Oid:
+        """
+            Write a tree equal to `tree` with `blob` inserted at the path given
+            by `parts`, without touching the index or the working tree.
+        """
+        builder = self._repository.TreeBuilder(tree) if tree is not None else self._repository.TreeBuilder()
+
+        if len(parts) == 1:
+            builder.insert(parts[0], blob, GIT_FILEMODE_BLOB)
+        else:
+            subtree: Optional[Tree] = None
+            if tree is not None and parts[0] in tree:
+                entry: Any = tree[parts[0]]
+                if isinstance(entry, Tree):
+                    subtree = entry
+            builder.insert(parts[0], self._insertBlob(subtree, parts[1:], blob), GIT_FILEMODE_TREE)
+
+        return builder.write()
+
+    def _commitSnapshots(
+        self: Self,
+        snapshots: List[Tuple[str, str, int]],
+    ) -> None:
+        """
+            Chain one commit per snapshot onto the snapshot ref and move the
+            ref once for the whole batch. The ref is left alone if every
+            snapshot repeats the previous one.
+        """
+        if self._path is None or not self._shader:
+            return
+
+        ref: str = self.snapshotRef
+        parts: List[str] = list(self._shader.relative_to(self._path).parts)
+
+        parent: Optional[Oid] = None
+        tree: Optional[Tree] = None
+        reference: Optional[Reference] = self._repository.references.get(ref)
+        if reference is not None:
+            parent = reference.target
+        elif not self._repository.head_is_unborn:
+            parent = self._repository.head.target
+        if parent is not None:
+            tree = self._repository[parent].tree
+
+        created: bool = False
+        for hash, source, size in snapshots:
+            if hash == self._latestSnapshotHash:
+                continue
+
+            with tracer.span('vcs.snapshot', hash):
+                blob: Oid = self._repository.create_blob(source.encode('utf-8'))
+                tree = self._repository[self._insertBlob(tree, parts, blob)]
+                parent = self._repository.create_commit(
+                    None,
+                    self._repository.default_signature,
+                    self._repository.default_signature,
+                    self._message(size, None, VCS.SnapshotMessage),
+                    tree.id,
+                    [parent] if parent is not None else [],
+                )
+            self._latestSnapshotHash = hash
+            created = True
+
+        if created:
+            self._repository.references.create(ref, parent, force=True)
+
     def createCommit(
         self: Self,
         hash: str,
@@ -129,5 +365,20 @@ class VCS(QObject):
     ) -> None:
         self._queue.put((hash, size, entropy))
 
+    def snapshot(
+        self: Self,
+        hash: str,
+        source: str,
+        size: int,
+    ) -> None:
+        """
+            Queue a snapshot of the shader source onto the snapshot ref. Does
+            nothing unless auto snapshots are enabled.
+        """
+        if not self._autoSnapshot:
+            return
+
+        self._snapshotQueue.put((hash, source, size))
+
     def reset(self: Self) -> None:
         self._reset = True
@@ -1,12 +1,9 @@
 from typing import (
     Self,
     Optional,
+    Dict,
 )
 from types import ModuleType
-from pygit2 import (
-    Repository,
-    GIT_DESCRIBE_TAGS,
-)
 from pathlib import Path
 from enum import Enum
 from importlib.util import (
@@ -31,13 +28,16 @@ class Version:
     DirtySuffix = "-dirty"
     VersionModuleName = 'generated_version'
 
+    # Repository path -> description. Describing a repository is expensive and
+    # does not change while the application runs.
+    _descriptions: Dict[Optional[Path], str] = {}
+
     def __init__(self: Self) -> None:
         self._repositoryPath: Optional[Path] = self._findRepositoryPath()
         self._versionType: VersionType = VersionType.Unavailable
 
         if self.hasRepository:
             self._versionType = VersionType.GitTag
-            self._repository: Repository = Repository(self.repositoryPath)
 
         self._versionModule: ModuleType = self._findVersionModule()
         if self.hasVersionModule:
@@ -92,9 +92,22 @@ class Version:
     def describe(self: Self) -> str:
         """
             Returns a str containing the most appropriate version description available.
+            The result is cached for the lifetime of the process.
         """
+        if self._repositoryPath not in Version._descriptions:
+            Version._descriptions[self._repositoryPath] = self._describe()
+
+        return Version._descriptions[self._repositoryPath]
+
+    def _describe(self: Self) -> str:
         if self.hasRepository:
-            return self._repository.describe(
+            from pygit2 import (
+                Repository,
+                GIT_DESCRIBE_TAGS,
+            )
+
+            repository: Repository = Repository(self.repositoryPath)
+            return repository.describe(
                 describe_strategy=GIT_DESCRIBE_TAGS,
                 show_commit_oid_as_fallback=True,
                 dirty_suffix=Version.DirtySuffix,
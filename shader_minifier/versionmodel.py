@@ -15,13 +15,26 @@ from typing import (
     Any,
     Self,
     Optional,
+    List,
+    Dict,
+    TYPE_CHECKING,
 )
 from shader_minifier.watcher import Watcher
 from shader_minifier.scheduler import Scheduler
 from shader_minifier.entropy import Entropy
+from shader_minifier.history import (
+    HistoryStore,
+    Status,
+)
+from numpy import ndarray
+if TYPE_CHECKING:
+    # Importing vcs loads pygit2, which the models only need for annotations.
+    from shader_minifier.vcs import CommitRecord
 
 class VersionModel(QAbstractTableModel):
     HorizontalHeaders = ['SHA256', 'size', 'ratio', 'entropy']
+    # Store column each column sorts by; the hash column sorts by time.
+    SortColumns = [None, 'minified', 'ratio', 'entropy']
 
     def __init__(
         self: Self,
@@ -33,26 +46,119 @@ class VersionModel(QAbstractTableModel):
         self._scheduler: Optional[Scheduler] = None
         self._entropy: Optional[Entropy] = None
 
+        # Crunch commits from the repository, shown before the session history.
+        self._commits: List['CommitRecord'] = []
+        # Commit id -> hash of the commit's source, once it has been loaded.
+        self._commitHashes: Dict[str, str] = {}
+
+        self._store: HistoryStore = HistoryStore()
+        # Shown history rows, if sorted or filtered.
+        self._rows: Optional[ndarray] = None
+        self._sortColumn: int = -1
+        self._sortOrder: Qt.SortOrder = Qt.SortOrder.AscendingOrder
+        # Only show the rows with the smallest minified sizes; 0 shows all.
+        self._best: int = 0
+
+    def _update(self: Self) -> None:
+        self._store.update(self._watcher, self._scheduler, self._entropy)
+
+        if self._best != 0:
+            self._rows = self._store.best(self._best)
+        elif self._sortColumn >= 0 and (self._sortColumn != 0 or self._sortOrder == Qt.SortOrder.DescendingOrder):
+            self._rows = self._store.order(
+                VersionModel.SortColumns[self._sortColumn],
+                self._sortOrder == Qt.SortOrder.DescendingOrder,
+            )
+        else:
+            self._rows = None
+
     def updateWatcher(self: Self, watcher: Watcher) -> None:
         self.beginResetModel()
         self._watcher = watcher
+        self._update()
         self.endResetModel()
 
     def updateScheduler(self: Self, scheduler: Scheduler) -> None:
         self.beginResetModel()
         self._scheduler = scheduler
+        self._update()
         self.endResetModel()
 
     def updateEntropy(self: Self, entropy: Entropy) -> None:
         self.beginResetModel()
         self._entropy = entropy
+        self._update()
         self.endResetModel()
 
+    def sort(
+        self: Self,
+        column: int,
+        order: Qt.SortOrder = Qt.SortOrder.AscendingOrder,
+    ) -> None:
+        """
+            Sorts the session history; crunch commits stay on top. Column -1
+            restores the history order.
+        """
+        self.beginResetModel()
+        self._sortColumn = column
+        self._sortOrder = order
+        self._update()
+        self.endResetModel()
+
+    def showBest(self: Self, count: int) -> None:
+        """
+            Only shows the `count` saves with the smallest minified sizes,
+            smallest first; 0 shows all saves.
+        """
+        self.beginResetModel()
+        self._best = count
+        self._update()
+        self.endResetModel()
+
+    def summary(self: Self) -> Dict[str, Any]:
+        return self._store.summary()
+
+    def _historyRow(self: Self, row: int) -> int:
+        row -= len(self._commits)
+        return int(self._rows[row]) if self._rows is not None else row
+
+    def updateCommits(self: Self, commits: List['CommitRecord']) -> None:
+        self.beginResetModel()
+        self._commits = commits
+        self._commitHashes = {}
+        self.endResetModel()
+
+    def updateCommitHash(self: Self, commit: str, hash: str) -> None:
+        self._commitHashes[commit] = hash
+        self.dataChanged.emit(
+            self.index(0, 0),
+            self.index(self.rowCount() - 1, self.columnCount() - 1),
+        )
+
+    def commit(self: Self, row: int) -> Optional['CommitRecord']:
+        """
+            Returns the crunch commit shown in the given row, or None if the
+            row belongs to the current session.
+        """
+        return self._commits[row] if row < len(self._commits) else None
+
+    def hash(self: Self, row: int) -> Optional[str]:
+        """
+            Returns the source hash of the given row, or None if it belongs to
+            a commit that has not been loaded yet.
+        """
+        if row < len(self._commits):
+            return self._commitHashes.get(self._commits[row].commit)
+
+        return self._store.hash(self._historyRow(row))
+
     def rowCount(
         self: Self,
         parent: QModelIndex = QModelIndex(),
     ) -> int:
-        return len(self._watcher._history.values()) if self._watcher is not None else 0
+        if self._rows is not None:
+            return len(self._commits) + len(self._rows)
+        return len(self._commits) + self._store.rowCount()
     
     def columnCount(
         self: Self,
@@ -74,91 +180,127 @@ class VersionModel(QAbstractTableModel):
         if self._scheduler is None:
             return
 
+        hash: Optional[str] = self.hash(index.row())
+        commit: Optional['CommitRecord'] = self.commit(index.row())
+        if hash is None:
+            return self._commitData(commit, index.column(), role)
+
+        status: Status = Status.Pending
+        if commit is None:
+            row: int = self._historyRow(index.row())
+            status = self._store.status(row)
+        elif hash in self._scheduler._versions:
+            # Loaded crunch commits are not part of the session history.
+            status = Status.Minified if type(self._scheduler._versions[hash]) == str else Status.Errored
+
         if role == Qt.ItemDataRole.DisplayRole:
-            hash: str = list(self._watcher._history.values())[index.row()]
             if index.column() == 0:
                 # Hash
                 return hash
-            if index.column() == 1:
-                # File size
-                if hash not in self._scheduler._versions.keys():
-                    return 'Pending'
-                
-                minified: Any = self._scheduler._versions[hash]
-                if type(minified) == str:
-                    return len(minified) 
-                
-                return 'Error'
-            if index.column() == 2:
-                # Compression ratio
-                if hash not in self._scheduler._versions.keys():
+            if index.column() in [1, 2]:
+                # File size, compression ratio
+                if status == Status.Pending:
                     return 'Pending'
-                
-                unminified: str = self._watcher._versions[hash]
-                minified: Any = self._scheduler._versions[hash]
-                if type(minified) == str:
-                    return len(minified) / len(unminified)
-                
-                return 'Error'
+                if status == Status.Errored:
+                    return 'Error'
+
+                if commit is not None:
+                    minified: str = self._scheduler._versions[hash]
+                    return len(minified) if index.column() == 1 else len(minified) / len(self._watcher._versions[hash])
+                if index.column() == 1:
+                    return int(self._store.value('minified', row))
+                return self._store.value('ratio', row)
             if index.column() == 3:
-                if self._entropy is None:
+                if self._entropy is None or not self._entropy.hasEntropy(hash):
+                    # Fall back to the entropy recorded in the crunch commit.
+                    if commit is not None and commit.entropy is not None:
+                        return commit.entropy
                     return 'Unavailable'
                 
-                if hash not in self._entropy._versions.keys():
-                    return 'Unavailable'
-                
-                return self._entropy._versions[hash]
+                return self._entropy.entropy(hash)
 
         if role == Qt.ItemDataRole.FontRole:
-            hash: str = list(self._watcher._history.values())[index.row()]
+            if commit is None:
+                latest: bool = hash == self._watcher.latestHash
+                # Saves that did not change the minified output.
+                unchanged: bool = self._store.unchanged(row)
+                if latest or unchanged:
+                    font: QFont = QFont()
+                    font.setBold(latest)
+                    font.setItalic(unchanged)
+                    return font
 
-            if hash == self._watcher.latestHash:
-                font: QFont = QFont()
-                font.setBold(True)
-                return font
+        if role == Qt.ItemDataRole.ToolTipRole:
+            if commit is None and self._store.unchanged(row):
+                return "Minified output unchanged."
 
         if role == Qt.ItemDataRole.ForegroundRole:
-            hash: str = list(self._watcher._history.values())[index.row()]
             if QApplication.styleHints().colorScheme() == Qt.ColorScheme.Dark:
                 # Pending
-                if hash not in self._scheduler._versions.keys():
+                if status == Status.Pending:
                     return QColor(119, 119, 119)
                 
                 # Error
-                minified: Any = self._scheduler._versions[hash]
-                if type(minified) != str:
+                if status == Status.Errored:
                     return QColor(255, 173, 51)
                 
                 # Ok
                 return QColor(76, 255, 76)
             
         if role == Qt.ItemDataRole.BackgroundRole:
-            hash: str = list(self._watcher._history.values())[index.row()]
             if QApplication.styleHints().colorScheme() == Qt.ColorScheme.Dark:
                 # Pending
-                if hash not in self._scheduler._versions.keys():
+                if status == Status.Pending:
                     return QColor(60, 60, 60)
 
                 # Error
-                minified: Any = self._scheduler._versions[hash]
-                if type(minified) != str:
+                if status == Status.Errored:
                     return QColor(74, 35, 36)
 
                 # Ok
                 return QColor(31, 54, 35)
             else:
                 # Pending
-                if hash not in self._scheduler._versions.keys():
+                if status == Status.Pending:
                     return QColor(255, 251, 231)
 
                 # Error
-                minified: Any = self._scheduler._versions[hash]
-                if type(minified) != str:
+                if status == Status.Errored:
                     return QColor(251, 233, 235)
 
                 # Ok
                 return QColor(236, 253, 240)
 
+    def _commitData(
+        self: Self,
+        commit: 'CommitRecord',
+        column: int,
+        role: Qt.ItemDataRole,
+    ) -> Any:
+        """
+            Data of a crunch commit whose source has not been loaded yet,
+            as recorded in its commit message.
+        """
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return commit.commit
+            if column == 1:
+                return commit.size if commit.size is not None else 'Unavailable'
+            if column == 2:
+                return 'Unavailable'
+            if column == 3:
+                return commit.entropy if commit.entropy is not None else 'Unavailable'
+
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if QApplication.styleHints().colorScheme() == Qt.ColorScheme.Dark:
+                return QColor(119, 119, 119)
+
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if QApplication.styleHints().colorScheme() == Qt.ColorScheme.Dark:
+                return QColor(60, 60, 60)
+            else:
+                return QColor(255, 251, 231)
+
     def headerData(
         self: Self,
         section: int,
@@ -168,4 +310,6 @@ class VersionModel(QAbstractTableModel):
         if role == Qt.ItemDataRole.DisplayRole:
             if orientation == Qt.Orientation.Horizontal:
                 return VersionModel.HorizontalHeaders[section]
-            return list(self._watcher._history.keys())[section].strftime("%H:%M:%S")
+            if section < len(self._commits):
+                return self._commits[section].time.strftime("%Y-%m-%d %H:%M:%S")
+            return self._store.time(self._historyRow(section)).strftime("%H:%M:%S")
@@ -1,50 +1,75 @@
 from typing import (
     Self,
     Dict,
+    List,
     Any,
     Optional,
 )
 from pathlib import Path
-from PyQt6.QtCore import (
-    QObject,
-    pyqtSignal,
-    QVariant,
-    QFileSystemWatcher,
+from shader_minifier.signals import Signal
+from shader_minifier.tracing import (
+    tracer,
+    Span,
 )
+from shader_minifier.monitor import (
+    PollingMonitor,
+    createMonitor,
+)
+from shader_minifier.include import (
+    IncludeResolver,
+    IncludeError,
+    Expansion,
+)
+from shader_minifier.normalizer import normalizedHash
+from shader_minifier.metrics import metrics
 from hashlib import sha256
 from datetime import datetime
 from json import dumps
 from threading import Thread
 from queue import Queue
-from time import sleep
+from time import (
+    sleep,
+    perf_counter,
+)
 
 
-class Watcher(QObject):
+class Watcher:
     FPS = 10
     
-    fileChanged: pyqtSignal = pyqtSignal(QVariant)
-    fileLoaded: pyqtSignal = pyqtSignal(str)
-    historyExported: pyqtSignal = pyqtSignal(str)
-    stopped: pyqtSignal = pyqtSignal()
-    resetted: pyqtSignal = pyqtSignal()
-
-    def __init__(self: Self) -> None:
-        super().__init__()
-
+    fileChanged: Signal = Signal(object)
+    fileLoaded: Signal = Signal(str)
+    historyExported: Signal = Signal(str)
+    stopped: Signal = Signal()
+    resetted: Signal = Signal()
+
+    def __init__(
+        self: Self,
+        includeDirectories: Optional[List[Path]] = None,
+        monitor: Optional[PollingMonitor] = None,
+    ) -> None:
         self._path: Optional[Path] = None
         self._versions: Dict[str, str] = {}
         self._history: Dict[datetime, str] = {}
         self._latestHash: Optional[str] = None
+        # Hash -> hash of the source without comments and insignificant whitespace.
+        self._normalized: Dict[str, str] = {}
+
+        # Versions are hashed after expanding includes, so editing an included file is a change too.
+        self._resolver: IncludeResolver = IncludeResolver(includeDirectories)
+        # Files the latest expansion was assembled from, all of which are monitored.
+        self._dependencies: List[Path] = []
 
-        self._watcher: QFileSystemWatcher = QFileSystemWatcher()
+        self._monitor: PollingMonitor = monitor if monitor is not None else createMonitor()
+        self._monitor.changed.connect(lambda path: self.updateFile())
         
         self._queue: Queue = Queue()
-        self._thread: Thread = Thread(target=self._run)
+        self._thread: Thread = Thread(target=self._run, name='Watcher')
         
         self._running: bool = True
         self._reset: bool = False
         
     def start(self: Self) -> None:
+        self._monitor.start()
         self._thread.start()
         
     def stop(self: Self) -> None:
@@ -52,61 +77,91 @@ class Watcher(QObject):
         
     def _run(self: Self) -> int:
         while self._running:
-            # Note: Qt loses the directory from time to time. If this happens, it will silently remove the file from its watch list.
-            # We can readd it tho.
-            if self._watcher is not None and self._path is not None and len(self._watcher.files()) == 0:
-                self._watcher.addPath(str(self._path))
-                self.updateFile()
-
             if self._reset:
                 while self._queue.qsize() != 0:
                     self._queue.get()
                 self._versions = {}
+                self._normalized = {}
                 self._latestHash = None
                 self._reset = False
                 self.resetted.emit()
 
             while self._queue.qsize() != 0:
-                self._queue.get()
+                queued: float = self._queue.get()
 
                 if self._path is None:
                     break
 
-                data: bytes = self._path.read_bytes()
-                hash: str = sha256(data).digest().hex()
-                source: str = data.decode('utf-8')
-
-                if not self._latestHash == hash:
-                    if hash not in self._versions.keys():
-                        self._versions[hash] = source
-
-                    self._history[datetime.now()] = hash
-                    self._latestHash = hash
-                    self.fileChanged.emit(self)
-                else:
-                    # If nothing changed, we do not need to update.
-                    pass
+                with tracer.span('watcher.read') as span:
+                    # The resolver only re-reads files whose size, mtime or inode changed.
+                    try:
+                        expansion: Expansion = self._resolver.expand(self._path)
+                    except IncludeError as error:
+                        print("Error: {}".format(error))
+                        # Watch for the missing files to appear.
+                        self._watchDependencies(self._resolver.dependencies(self._path))
+                        continue
+                    self._watchDependencies(self._resolver.dependencies(self._path))
+
+                    hash: str = expansion.hash
+                    source: str = expansion.source
+
+                    if not self._latestHash == hash:
+                        span.hash = hash
+                        tracer.record('watcher.wait', queued, span.start, hash)
+
+                        if hash not in self._versions.keys():
+                            with metrics.time('watcher_normalize_seconds'):
+                                self._normalized[hash] = normalizedHash(source)
+                            self._versions[hash] = source
+
+                        self._history[datetime.now()] = hash
+                        self._latestHash = hash
+                        self.fileChanged.emit(self)
+                    else:
+                        # If nothing changed, we do not need to update.
+                        pass
 
             sleep(1 / Watcher.FPS)
 
+        self._monitor.stop()
+        self._monitor._thread.join()
+
         self.stopped.emit()
         return 0
 
+    def _watchDependencies(self: Self, dependencies: List[Path]) -> None:
+        for dependency in set(self._dependencies) - set(dependencies):
+            self._monitor.unwatch(dependency)
+        for dependency in set(dependencies) - set(self._dependencies):
+            self._monitor.watch(dependency)
+        self._dependencies = dependencies
+
     def watchFile(self: Self, path: Any) -> None:
-        if self._path is not None:
-            self._watcher.removePath(str(self._path))
+        self._watchDependencies([])
 
         self._versions: Dict[str, str] = {}
         self._history: Dict[datetime, str] = {}
+        self._normalized: Dict[str, str] = {}
         self._latestHash: Optional[str] = None
         self._path = Path(path)
 
-        self._watcher.addPath(str(self._path))
-        self._watcher.fileChanged.connect(self.updateFile)
+        self._watchDependencies([self._path.absolute()])
+        self.updateFile()
         self.fileLoaded.emit(str(self._path))
 
     def updateFile(self: Self) -> None:
-        self._queue.put(None)
+        self._queue.put(perf_counter())
+
+    def addVersion(self: Self, source: str) -> str:
+        """
+            Register a source that was not read from disk, e.g. loaded from
+            the repository history, without adding it to the history.
+        """
+        hash: str = sha256(source.encode('utf-8')).digest().hex()
+        if hash not in self._versions:
+            self._versions[hash] = source
+        return hash
 
     def saveHistory(self: Self, filename: Any) -> None:
         Path(filename).write_text(dumps(
@@ -128,5 +183,12 @@ class Watcher(QObject):
     def latestHash(self: Self) -> Optional[str]:
         return self._latestHash
 
+    def normalizedHash(self: Self, hash: str) -> Optional[str]:
+        """
+            Returns the hash of the source with `hash` without comments and
+            insignificant whitespace, or None if it was not read from disk.
+        """
+        return self._normalized.get(hash)
+
     def reset(self: Self) -> None:
         self._reset = True
@@ -0,0 +1,63 @@
+from unittest import (
+    TestCase,
+    skipIf,
+    main,
+)
+from typing import (
+    Self,
+    Dict,
+    List,
+    Any,
+)
+from sys import executable
+from platform import system
+from subprocess import CompletedProcess
+from shader_minifier.metrics import metrics
+from shader_minifier.accounting import (
+    run,
+    resources,
+    report,
+)
+
+
+class TestAccounting(TestCase):
+    @skipIf(system() == 'Windows', "Resource usage is only available with wait4.")
+    def testRun(self: Self) -> None:
+        result: CompletedProcess = run(
+            [executable, '-c', 'import sys; data = bytearray(64 * 2 ** 20); sys.exit(sys.stdin.read() == "input")'],
+            'test',
+            'v1_4_0',
+            input=b'input',
+            capture_output=True,
+        )
+        self.assertEqual(result.returncode, 1)
+        self.assertEqual(result.stdout, b'')
+
+        rows: List[Dict[str, Any]] = list(filter(lambda row: row['job'] == 'test', resources(metrics.snapshot())))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['version'], 'v1_4_0')
+        self.assertEqual(rows[0]['count'], 1)
+        self.assertGreater(rows[0]['wall'], 0.)
+        self.assertGreater(rows[0]['user'] + rows[0]['system'], 0.)
+        self.assertGreater(rows[0]['peak_rss'], 64 * 2 ** 20)
+        self.assertIn('v1_4_0', report(rows))
+
+    @skipIf(system() == 'Windows', "Resource usage is only available with wait4.")
+    def testPipes(self: Self) -> None:
+        # More output than fits into a pipe buffer, on both pipes.
+        result: CompletedProcess = run(
+            [executable, '-c', 'import sys; sys.stdout.write("o" * 2 ** 20); sys.stderr.write("e" * 2 ** 20)'],
+            'pipes',
+            capture_output=True,
+        )
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout, b'o' * 2 ** 20)
+        self.assertEqual(result.stderr, b'e' * 2 ** 20)
+
+        # Like Popen, processes killed by a signal return its negative number.
+        result = run([executable, '-c', 'import os, signal; os.kill(os.getpid(), signal.SIGKILL)'], 'pipes')
+        self.assertEqual(result.returncode, -9)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+from unittest import main
+from typing import (
+    Self,
+    Dict,
+    List,
+    Any,
+)
+from pathlib import Path
+from json import loads
+from sys import executable
+from pygit2 import (
+    Repository,
+    Oid,
+    init_repository,
+)
+from shader_minifier.backfill import Backfill
+from shader_minifier.entropy import Entropy
+from shader_minifier.minifier import MinifierVersion
+from shader_minifier.metrics import metrics
+from shader_minifier.accounting import resources
+from benchmarks.fixtures import StandinTestCase
+from importlib.resources import files
+import tests
+
+# Reports the size of the injected shader as entropy, like Crinkler.
+BuildScript: str = '''from pathlib import Path
+print("Ideal compressed size of data: {}".format(len(Path("shader.min.frag").read_text())))
+'''
+
+
+class TestBackfill(StandinTestCase):
+    SimpleShaderSource: str = (files(tests) / 'simple_shader.frag').read_text()
+    SimpleErrorShaderSource: str = (files(tests) / 'simple_error_shader.frag').read_text()
+
+    @staticmethod
+    def commit(repository: Repository, path: str, source: str) -> Oid:
+        (Path(repository.workdir) / path).write_text(source)
+        repository.index.add(path)
+        repository.index.write()
+        return repository.create_commit(
+            'HEAD',
+            repository.default_signature,
+            repository.default_signature,
+            'Change {}.'.format(path),
+            repository.index.write_tree(),
+            [] if repository.head_is_unborn else [repository.head.target],
+        )
+
+    @staticmethod
+    def minifyRuns() -> float:
+        return sum(map(
+            lambda row: row['count'],
+            filter(lambda row: row['job'] == 'minify', resources(metrics.snapshot())),
+        ))
+
+    def testBackfill(self: Self) -> None:
+        build: Path = self.tempDir / 'build'
+        build.mkdir()
+        (build / 'build.py').write_text(BuildScript)
+
+        repository: Repository = init_repository(str(self.tempDir / 'repository'))
+        repository.config['user.name'] = 'Test'
+        repository.config['user.email'] = 'test@example.invalid'
+        TestBackfill.commit(repository, 'shader.frag', TestBackfill.SimpleShaderSource)
+        # Commits that do not touch the shader are left out.
+        TestBackfill.commit(repository, 'README.md', 'Readme.\n')
+        TestBackfill.commit(repository, 'shader.frag', TestBackfill.SimpleErrorShaderSource)
+        # Reverted; the blob is minified once.
+        TestBackfill.commit(repository, 'shader.frag', TestBackfill.SimpleShaderSource)
+
+        reportPath: Path = self.tempDir / 'report.json'
+        backfill: Backfill = Backfill(
+            Path(repository.workdir) / 'shader.frag',
+            reportPath,
+            MinifierVersion.v1_4_0,
+            Entropy([executable, 'build.py'], build, Path('shader.min.frag')),
+            2,
+            self.minifier,
+        )
+        backfill.run()
+
+        report: Dict[str, Any] = loads(reportPath.read_text())
+        self.assertEqual(report['shader'], 'shader.frag')
+        self.assertEqual(report['tips'], [str(repository.head.target)])
+        self.assertEqual(len(report['commits']), 3)
+        self.assertEqual(len(report['blobs']), 2)
+
+        valid: str = str(repository.head.peel().tree['shader.frag'].id)
+        results: Dict[str, Dict[str, Any]] = report['versions'][MinifierVersion.v1_4_0.name]
+        self.assertEqual(results[valid]['minified'], len(self.minifier.minify(TestBackfill.SimpleShaderSource)))
+        self.assertEqual(float(results[valid]['entropy']), results[valid]['minified'])
+        invalid: List[str] = list(filter(lambda blob: blob != valid, results))
+        self.assertEqual(len(invalid), 1)
+        self.assertIn('ERROR', results[invalid[0]]['error'])
+
+        timeline: List[Dict[str, Any]] = backfill.timeline()
+        self.assertEqual(list(map(lambda entry: entry['minified'], timeline)).count(None), 1)
+        self.assertEqual(
+            sorted(map(lambda entry: entry['size'], timeline)),
+            sorted([len(TestBackfill.SimpleShaderSource)] * 2 + [len(TestBackfill.SimpleErrorShaderSource)]),
+        )
+
+        # Resumed from the report: nothing new to minify or build.
+        runs: float = TestBackfill.minifyRuns()
+        resumed: Backfill = Backfill(
+            Path(repository.workdir) / 'shader.frag',
+            reportPath,
+            MinifierVersion.v1_4_0,
+            Entropy([executable, 'build.py'], build, Path('shader.min.frag')),
+            2,
+            self.minifier,
+        )
+        self.assertEqual(resumed.run(), report)
+        self.assertEqual(TestBackfill.minifyRuns(), runs)
+
+        # New commits extend the report.
+        TestBackfill.commit(repository, 'shader.frag', TestBackfill.SimpleShaderSource + '// Edited.\n')
+        self.assertEqual(len(resumed.run()['commits']), 4)
+
+    def testFailedBuildRetried(self: Self) -> None:
+        build: Path = self.tempDir / 'build'
+        build.mkdir()
+        # Fails until the build tree is fixed.
+        (build / 'build.py').write_text('from pathlib import Path\nif not Path("fixed").exists():\n    exit(1)\n' + BuildScript)
+
+        repository: Repository = init_repository(str(self.tempDir / 'repository'))
+        repository.config['user.name'] = 'Test'
+        repository.config['user.email'] = 'test@example.invalid'
+        TestBackfill.commit(repository, 'shader.frag', TestBackfill.SimpleShaderSource)
+
+        def backfill() -> Dict[str, Any]:
+            return Backfill(
+                Path(repository.workdir) / 'shader.frag',
+                self.tempDir / 'report.json',
+                MinifierVersion.v1_4_0,
+                Entropy([executable, 'build.py'], build, Path('shader.min.frag')),
+                1,
+                self.minifier,
+            ).run()
+
+        blob: str = str(repository.head.peel().tree['shader.frag'].id)
+        self.assertNotIn('entropy', backfill()['versions'][MinifierVersion.v1_4_0.name][blob])
+        (build / 'fixed').touch()
+        self.assertEqual(
+            float(backfill()['versions'][MinifierVersion.v1_4_0.name][blob]['entropy']),
+            len(self.minifier.minify(TestBackfill.SimpleShaderSource)),
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+from unittest import main
+from typing import (
+    Self,
+    List,
+    Tuple,
+    Any,
+)
+from pathlib import Path
+from threading import Event
+from datetime import datetime
+from time import perf_counter
+from shader_minifier.signals import Signal
+from shader_minifier.watcher import Watcher
+from shader_minifier.engine import Engine
+from shader_minifier.entropy import Entropy
+from shader_minifier.minifier import (
+    MinifierVersion,
+    shader_minifier,
+)
+from benchmarks.fixtures import StandinTestCase
+from sys import executable
+from importlib.resources import files
+import tests
+
+
+class Emitter:
+    changed: Signal = Signal(str)
+
+
+class TestEngine(StandinTestCase):
+    SimpleShaderSource: str = (files(tests) / 'simple_shader.frag').read_text()
+    Timeout: float = 5.
+
+    def testSignal(self: Self) -> None:
+        first: Emitter = Emitter()
+        second: Emitter = Emitter()
+        received: List[str] = []
+
+        first.changed.connect(received.append)
+        first.changed.emit('first')
+        second.changed.emit('second')
+        self.assertEqual(received, ['first'])
+        self.assertEqual(first.changed.receivers(), 1)
+        self.assertEqual(second.changed.receivers(), 0)
+
+        first.changed.disconnect()
+        first.changed.emit('first')
+        self.assertEqual(received, ['first'])
+
+    def testWatcher(self: Self) -> None:
+        path: Path = self.tempDir / 'shader.frag'
+        path.write_text(TestEngine.SimpleShaderSource)
+
+        changed: Event = Event()
+        watcher: Watcher = Watcher()
+        watcher.fileChanged.connect(lambda _watcher: changed.set())
+        watcher.start()
+        try:
+            watcher.watchFile(path)
+            self.assertTrue(changed.wait(TestEngine.Timeout))
+            firstHash: str = watcher.latestHash
+
+            changed.clear()
+            path.write_text(TestEngine.SimpleShaderSource + '\n// Edited.\n')
+            self.assertTrue(changed.wait(TestEngine.Timeout))
+            self.assertNotEqual(watcher.latestHash, firstHash)
+            self.assertEqual(len(watcher._history), 2)
+        finally:
+            watcher.stop()
+            watcher._thread.join()
+
+    def testMinifierSwitch(self: Self) -> None:
+        engine: Engine = Engine()
+        for version in [MinifierVersion.v1_4_0, MinifierVersion.v1_3_6]:
+            engine.scheduler._minifiers[version] = shader_minifier(version, path=self.standins['minifier'], validator=self.standins['validator'])
+
+        sources: List[str] = [TestEngine.SimpleShaderSource + '// {}\n'.format(index) for index in range(3)]
+        for index, source in enumerate(sources):
+            hash: str = engine.watcher.addVersion(source)
+            engine.watcher._history[datetime(2024, 1, 1, 0, 0, index)] = hash
+            engine.watcher._latestHash = hash
+            engine.scheduler.addResult(hash, 'minified {}'.format(index))
+        hashes: List[str] = list(engine.watcher._history.values())
+
+        live: List[str] = []
+        backfilled: List[Tuple[str, Any]] = []
+        engine.scheduler.minified.connect(lambda hash, minified: live.append(hash))
+        engine.scheduler.backfilled.connect(lambda hash, result: backfilled.append((hash, result)))
+
+        # Switching keeps the history; the latest save comes first, the others newest first.
+        engine.scheduler._switchTo(MinifierVersion.v1_3_6)
+        engine._minifierSwitched(MinifierVersion.v1_3_6)
+        self.assertEqual(engine.scheduler._versions, {})
+        self.assertEqual(engine.scheduler._queue.get()[0], hashes[2])
+        self.assertIsNone(engine.entropy._queue.get()[0])
+        while engine.scheduler._backfill.qsize() != 0:
+            version, hash, source, normalizedHash, queued = engine.scheduler._backfill.get()
+            self.assertEqual(version, MinifierVersion.v1_3_6)
+            engine.scheduler._minify(hash, source, normalizedHash, queued, True)
+        self.assertEqual(list(map(lambda item: item[0], backfilled)), [hashes[1], hashes[0]])
+        self.assertEqual(live, [])
+        self.assertEqual(engine.scheduler._versions[hashes[0]], backfilled[1][1])
+
+        # Results of the previous version are restored immediately.
+        engine.scheduler._switchTo(MinifierVersion.v1_4_0)
+        engine._minifierSwitched(MinifierVersion.v1_4_0)
+        self.assertEqual(engine.scheduler._versions[hashes[0]], 'minified 0')
+        self.assertEqual(engine.scheduler._queue.qsize(), 0)
+        self.assertEqual(engine.scheduler._backfill.qsize(), 0)
+
+    def testNormalizedReuse(self: Self) -> None:
+        engine: Engine = Engine()
+        engine.scheduler._minifiers[MinifierVersion.v1_4_0] = self.minifier
+        path: Path = self.tempDir / 'shader.frag'
+        path.write_text(TestEngine.SimpleShaderSource)
+
+        minified: List[str] = []
+        changed: Event = Event()
+        engine.scheduler.minified.connect(lambda hash, result: minified.append(hash))
+        engine.watcher.fileChanged.connect(lambda watcher: changed.set())
+        engine.watcher.start()
+        try:
+            engine.watcher.watchFile(path)
+            self.assertTrue(changed.wait(TestEngine.Timeout))
+            changed.clear()
+            path.write_text('// Comment.\n' + TestEngine.SimpleShaderSource.replace('\n', '\n\n'))
+            self.assertTrue(changed.wait(TestEngine.Timeout))
+        finally:
+            engine.watcher.stop()
+            engine.watcher._thread.join()
+
+        while engine.scheduler._queue.qsize() != 0:
+            hash, source, normalizedHash, queued = engine.scheduler._queue.get()
+            engine.scheduler._minify(hash, source, normalizedHash, queued)
+
+        # Both saves are in the raw history; the second reused the result of the first.
+        self.assertEqual(len(engine.watcher._history), 2)
+        self.assertNotEqual(minified[0], minified[1])
+        self.assertEqual(engine.watcher.normalizedHash(minified[0]), engine.watcher.normalizedHash(minified[1]))
+        self.assertTrue(engine.scheduler.sameOutput(minified[0], minified[1]))
+        self.assertLess(engine.scheduler._durations[minified[1]], engine.scheduler._durations[minified[0]])
+
+    def testNormalizedErrors(self: Self) -> None:
+        engine: Engine = Engine()
+        engine.scheduler._minifiers[MinifierVersion.v1_4_0] = self.minifier
+        errors: List[Any] = []
+        engine.scheduler.errored.connect(lambda hash, error: errors.append(error))
+
+        source: str = 'void main() { float a = 1. }\n'
+        engine.scheduler._minify('first', source, 'normalized', perf_counter())
+        engine.scheduler._minify('second', '\n' + source, 'normalized', perf_counter())
+
+        # Errors are minified again, since their line numbers may have moved.
+        self.assertEqual(len(errors), 2)
+        self.assertIsNot(errors[1], errors[0])
+        self.assertEqual(engine.scheduler._equivalents, {})
+
+    def testEntropyBuildFailure(self: Self) -> None:
+        entropy: Entropy = Entropy([executable, '-c', 'import sys; sys.exit(1)'], self.tempDir, Path('shader.min.frag'))
+        built: Event = Event()
+        entropy.built.connect(lambda _entropy: built.set())
+        entropy.start()
+        try:
+            entropy.determineEntropy('hash', 'minified')
+            self.assertTrue(built.wait(TestEngine.Timeout))
+            # A failed build is not cached and is retried by a later save.
+            self.assertFalse(entropy.hasEntropy('hash'))
+
+            built.clear()
+            entropy._buildCommand = [executable, '-c', 'print("Ideal compressed size of data: 123.5")']
+            entropy.determineEntropy('hash', 'minified')
+            self.assertTrue(built.wait(TestEngine.Timeout))
+            self.assertTrue(entropy.hasEntropy('hash'))
+            self.assertEqual(float(entropy.entropy('hash')), 123.5)
+        finally:
+            entropy.stop()
+            entropy._thread.join()
+
+
+if __name__ == '__main__':
+    main()
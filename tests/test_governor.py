@@ -0,0 +1,112 @@
+from unittest import (
+    TestCase,
+    main,
+)
+from typing import (
+    Self,
+    Optional,
+    List,
+    Tuple,
+)
+from threading import (
+    Thread,
+    Lock,
+    Event,
+)
+from time import sleep
+from os import environ
+from shader_minifier.governor import (
+    Governor,
+    Decision,
+)
+
+
+class TestGovernor(TestCase):
+    def testLimits(self: Self) -> None:
+        # 8 CPUs, 2 of them busy with other processes, 1.5 GB available.
+        machine: List[Tuple[int, Optional[float], Optional[int]]] = [(8, 2., 1536 * 2 ** 20)]
+        governor: Governor = Governor(lambda: machine[0])
+        decision: Decision = governor.decision()
+        self.assertEqual(decision.total, 6)
+        self.assertEqual(decision.limits['build'], 2)
+        self.assertEqual(decision.limits['minify'], 5)
+        self.assertEqual(decision.limits['validate'], 6)
+
+        # Measured footprints replace the defaults.
+        governor.record('minify', 100 * 2 ** 20)
+        machine[0] = (8, None, 1536 * 2 ** 20)
+        governor._decision = None
+        decision = governor.decision()
+        self.assertEqual(decision.total, 8)
+        self.assertEqual(decision.limits['minify'], 8)
+        self.assertEqual(decision.limits['build'], 2)
+
+        machine[0] = (8, None, None)
+        governor._decision = None
+        self.assertEqual(governor.decision().limits['build'], 4)
+
+        machine[0] = (8, None, 0)
+        governor._decision = None
+        self.assertEqual(set(governor.decision().limits.values()), {1})
+
+        environ[Governor.Variable] = '2'
+        try:
+            machine[0] = (8, None, None)
+            governor._decision = None
+            self.assertEqual(governor.decision().total, 2)
+        finally:
+            del environ[Governor.Variable]
+
+    def testSlot(self: Self) -> None:
+        governor: Governor = Governor(lambda: (2, None, None))
+
+        def peak(jobs: List[str]) -> int:
+            lock: Lock = Lock()
+            running: List[int] = [0]
+            peaks: List[int] = [0]
+
+            def work(job: str) -> None:
+                with governor.slot(job):
+                    with lock:
+                        running[0] += 1
+                        peaks[0] = max(peaks[0], running[0])
+                    sleep(.05)
+                    with lock:
+                        running[0] -= 1
+
+            threads: List[Thread] = [Thread(target=work, args=[job]) for job in jobs]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return peaks[0]
+
+        self.assertEqual(peak(['minify'] * 6), 2)
+        # Builds get half of the total.
+        self.assertEqual(peak(['build'] * 3), 1)
+        self.assertEqual(governor._running, {'build': 0, 'minify': 0})
+
+    def testMinimum(self: Self) -> None:
+        governor: Governor = Governor(lambda: (1, None, None))
+
+        def work(job: str, done: Event) -> None:
+            with governor.slot(job):
+                done.set()
+
+        validated: Event = Event()
+        built: Event = Event()
+        with governor.slot('build'):
+            # The only slot is held by a build, which does not block validation.
+            Thread(target=work, args=['validate', validated]).start()
+            self.assertTrue(validated.wait(5.))
+
+            # Another build has to wait.
+            thread: Thread = Thread(target=work, args=['build', built])
+            thread.start()
+            self.assertFalse(built.wait(2 * Governor.Interval))
+        thread.join()
+        self.assertTrue(built.is_set())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+from unittest import (
+    TestCase,
+    main,
+)
+from typing import (
+    Self,
+    Dict,
+    Any,
+)
+from datetime import (
+    datetime,
+    timedelta,
+)
+from math import isnan
+from shader_minifier.minifier import ShaderMinifierError
+from shader_minifier.watcher import Watcher
+from shader_minifier.scheduler import Scheduler
+from shader_minifier.entropy import Entropy
+from shader_minifier.history import (
+    HistoryStore,
+    Status,
+)
+
+
+class TestHistory(TestCase):
+    def setUp(self: Self) -> None:
+        self.watcher: Watcher = Watcher()
+        self.scheduler: Scheduler = Scheduler()
+        self.entropy: Entropy = Entropy()
+        self.store: HistoryStore = HistoryStore()
+
+    def save(self: Self, second: int, hash: str, source: str) -> None:
+        self.watcher._versions[hash] = source
+        self.watcher._history[datetime(2024, 1, 1) + timedelta(seconds=second)] = hash
+
+    def update(self: Self) -> None:
+        self.store.update(self.watcher, self.scheduler, self.entropy)
+
+    def testIncremental(self: Self) -> None:
+        self.save(0, 'a', 'a' * 100)
+        self.save(1, 'b', 'b' * 100)
+        self.scheduler._versions['a'] = 'a' * 40
+        self.update()
+        self.assertEqual(self.store.rowCount(), 2)
+        self.assertEqual(self.store.status(0), Status.Minified)
+        self.assertEqual(self.store.value('ratio', 0), .4)
+        self.assertEqual(self.store.status(1), Status.Pending)
+
+        # Results, builds and saves arrive in any order.
+        self.entropy._outputs['b'] = 'output'
+        self.scheduler._versions['b'] = 'b' * 30
+        self.save(2, 'c', 'c' * 100)
+        self.save(3, 'a', 'a' * 100)
+        self.scheduler._versions['c'] = ShaderMinifierError('Error.')
+        self.update()
+        self.assertTrue(isnan(self.store.value('entropy', 1)))
+        self.entropy._versions['output'] = 12.5
+        self.update()
+        self.assertEqual(self.store.value('entropy', 1), 12.5)
+        self.assertEqual(self.store.status(2), Status.Errored)
+        self.assertEqual(self.store.hash(3), 'a')
+
+        self.assertEqual(list(self.store.order('minified')), [1, 0, 3, 2])
+        self.assertEqual(list(self.store.order('minified', True)), [0, 3, 1, 2])
+        self.assertEqual(list(self.store.best(2)), [1, 0])
+        summary: Dict[str, Any] = self.store.summary()
+        self.assertEqual(summary['saves'], 4)
+        self.assertEqual(summary['hashes'], 3)
+        self.assertEqual(summary['errored'], 1)
+        self.assertEqual(summary['minified_min'], 30.)
+        self.assertEqual(summary['entropy_min'], 12.5)
+
+        # Components replace their dicts on reset.
+        self.watcher._history = {}
+        self.scheduler._versions = {}
+        self.update()
+        self.assertEqual(self.store.rowCount(), 0)
+        self.save(0, 'a', 'a' * 100)
+        self.update()
+        self.assertEqual(self.store.status(0), Status.Pending)
+        self.assertEqual(self.store.summary()['minified_min'], None)
+
+    def testGrowth(self: Self) -> None:
+        for save in range(3 * HistoryStore.InitialCapacity):
+            self.save(save, str(save), 'x' * (save + 1))
+            self.scheduler._versions[str(save)] = 'x' * (save % 100)
+            if save % 500 == 0:
+                self.update()
+        self.update()
+        self.assertEqual(self.store.rowCount(), 3 * HistoryStore.InitialCapacity)
+        self.assertEqual(list(self.store.values('minified')[self.store.best(3)]), [0., 0., 0.])
+
+    def testNew(self: Self) -> None:
+        dictionary: Dict[str, int] = {'a': 0, 'b': 1}
+        self.assertEqual(self.store._new('test', dictionary), (True, [('a', 0), ('b', 1)]))
+        self.assertEqual(self.store._new('test', dictionary), (False, []))
+        dictionary['c'] = 2
+        dictionary['d'] = 3
+        self.assertEqual(self.store._new('test', dictionary), (False, [('c', 2), ('d', 3)]))
+        self.assertEqual(self.store._new('test', {'e': 4}), (True, [('e', 4)]))
+
+
+if __name__ == '__main__':
+    main()
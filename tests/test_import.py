@@ -0,0 +1,85 @@
+from unittest import (
+    TestCase,
+    main,
+)
+from typing import (
+    Self,
+    List,
+    Dict,
+)
+from subprocess import (
+    run,
+    CompletedProcess,
+)
+from sys import executable
+from json import loads
+from parse import parse
+
+
+class TestImport(TestCase):
+    """
+        Import-time regression checks. Run this module directly to print a
+        benchmark of the cumulative import time of each entry point.
+    """
+    # Module -> modules it must not load.
+    ForbiddenModules: Dict[str, List[str]] = {
+        'shader_minifier': ['cached_path', 'PyQt6', 'pygit2'],
+        'shader_minifier.version': ['pygit2', 'PyQt6'],
+        'shader_minifier.engine': ['PyQt6'],
+        'shader_minifier.backfill': ['PyQt6'],
+        'shader_minifier.prefetch': ['cached_path', 'PyQt6'],
+    }
+    # Generous upper bound for the cumulative import time of the library in seconds.
+    LibraryImportBudget: float = 0.5
+
+    @staticmethod
+    def loadedModules(module: str) -> List[str]:
+        result: CompletedProcess = run(
+            [
+                executable, '-c',
+                'import json, sys, {}; print(json.dumps(list(sys.modules)))'.format(module),
+            ],
+            capture_output=True,
+        )
+        return loads(result.stdout.decode('utf-8'))
+
+    @staticmethod
+    def importTime(module: str) -> float:
+        """
+            Returns the cumulative import time of `module` in seconds as
+            reported by `python -X importtime`.
+        """
+        result: CompletedProcess = run(
+            [
+                executable, '-X', 'importtime', '-c', 'import {}'.format(module),
+            ],
+            capture_output=True,
+        )
+        for line in result.stderr.decode('utf-8').splitlines():
+            parsed = parse('import time:{:>d} |{:>d} | {}', line)
+            if parsed is not None and parsed[2] == module:
+                return parsed[1] / 1e6
+
+        raise ValueError('{} was not imported.'.format(module))
+
+    def testForbiddenModules(self: Self) -> None:
+        for module, forbidden in TestImport.ForbiddenModules.items():
+            loaded: List[str] = TestImport.loadedModules(module)
+            for forbiddenModule in forbidden:
+                self.assertNotIn(forbiddenModule, loaded, '{} imports {}.'.format(module, forbiddenModule))
+
+    def testLibraryImportTime(self: Self) -> None:
+        self.assertLess(TestImport.importTime('shader_minifier'), TestImport.LibraryImportBudget)
+
+
+if __name__ == '__main__':
+    for module in [
+        'shader_minifier',
+        'shader_minifier.version',
+        'shader_minifier.engine',
+        'shader_minifier.backfill',
+        'shader_minifier.mainwindow',
+    ]:
+        print('{:<32} {:8.1f} ms'.format(module, TestImport.importTime(module) * 1e3))
+
+    main()
@@ -0,0 +1,102 @@
+from unittest import (
+    TestCase,
+    main,
+)
+from typing import Self
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from shader_minifier.include import (
+    IncludeResolver,
+    IncludeError,
+    Expansion,
+)
+
+
+class TestInclude(TestCase):
+    def testExpand(self: Self) -> None:
+        with TemporaryDirectory() as tempDir:
+            root: Path = Path(tempDir)
+            (root / 'lib').mkdir()
+            (root / 'lib' / 'common.glsl').write_text('#pragma once\nfloat one() { return 1.; }')
+            (root / 'noise.glsl').write_text('#include "lib/common.glsl"\nfloat noise() { return one(); }\n')
+            shader: Path = root / 'shader.frag'
+            shader.write_text('#version 450\n#include "noise.glsl"\n#include <common.glsl>\nvoid main() {}\n')
+
+            resolver: IncludeResolver = IncludeResolver([root / 'lib'])
+            expansion: Expansion = resolver.expand(shader)
+            self.assertEqual(
+                expansion.source,
+                '#version 450\nfloat one() { return 1.; }\nfloat noise() { return one(); }\nvoid main() {}\n',
+            )
+            self.assertEqual(set(resolver.dependencies(shader)), {
+                shader.absolute(),
+                (root / 'noise.glsl').absolute(),
+                (root / 'lib' / 'common.glsl').absolute(),
+            })
+            self.assertEqual(resolver.affected(root / 'lib' / 'common.glsl'), {
+                (root / 'lib' / 'common.glsl').absolute(),
+                (root / 'noise.glsl').absolute(),
+                shader.absolute(),
+            })
+
+            # Unchanged files give the same expansion object.
+            self.assertIs(resolver.expand(shader), expansion)
+
+            (root / 'noise.glsl').write_text('float noise() { return 0.; }\n')
+            changed: Expansion = resolver.expand(shader)
+            self.assertNotEqual(changed.hash, expansion.hash)
+            self.assertEqual(resolver.affected(root / 'lib' / 'common.glsl'), {
+                (root / 'lib' / 'common.glsl').absolute(),
+                shader.absolute(),
+            })
+
+    def testErrors(self: Self) -> None:
+        with TemporaryDirectory() as tempDir:
+            root: Path = Path(tempDir)
+            (root / 'a.glsl').write_text('#include "b.glsl"\n')
+            (root / 'b.glsl').write_text('#include "a.glsl"\n')
+            (root / 'missing.frag').write_text('#include "missing.glsl"\n')
+
+            resolver: IncludeResolver = IncludeResolver()
+            self.assertRaises(IncludeError, resolver.expand, root / 'a.glsl')
+            self.assertRaises(IncludeError, resolver.expand, root / 'missing.frag')
+
+    def testRelativePaths(self: Self) -> None:
+        with TemporaryDirectory() as tempDir:
+            root: Path = Path(tempDir)
+            (root / 'scenes').mkdir()
+            (root / 'common.glsl').write_text('float one() { return 1.; }\n')
+            shader: Path = root / 'scenes' / 'shader.frag'
+            shader.write_text('#include "../common.glsl"\nvoid main() {}\n')
+
+            resolver: IncludeResolver = IncludeResolver()
+            resolver.expand(shader)
+            self.assertIn((root / 'common.glsl').absolute(), resolver.dependencies(shader))
+            self.assertIn(shader.absolute(), resolver.affected(root / 'common.glsl'))
+
+    def testMissing(self: Self) -> None:
+        with TemporaryDirectory() as tempDir:
+            root: Path = Path(tempDir)
+            (root / 'lib').mkdir()
+            shader: Path = root / 'shader.frag'
+            shader.write_text('#include "common.glsl"\nvoid main() {}\n')
+
+            # Missing includes are watched wherever they could be created.
+            resolver: IncludeResolver = IncludeResolver([root / 'lib'])
+            self.assertRaises(IncludeError, resolver.expand, shader)
+            self.assertEqual(set(resolver.dependencies(shader)), {
+                shader.absolute(),
+                (root / 'common.glsl').absolute(),
+                (root / 'lib' / 'common.glsl').absolute(),
+            })
+
+            (root / 'lib' / 'common.glsl').write_text('float one() { return 1.; }\n')
+            self.assertEqual(resolver.expand(shader).source, 'float one() { return 1.; }\nvoid main() {}\n')
+            self.assertEqual(set(resolver.dependencies(shader)), {
+                shader.absolute(),
+                (root / 'lib' / 'common.glsl').absolute(),
+            })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+from unittest import (
+    TestCase,
+    main,
+)
+from typing import (
+    Self,
+    Dict,
+    List,
+    Any,
+)
+from shader_minifier.metrics import Metrics
+
+
+class TestMetrics(TestCase):
+    def testMetrics(self: Self) -> None:
+        metrics: Metrics = Metrics()
+        metrics.increment('jobs_total', result='minified')
+        metrics.increment('jobs_total', 2, result='minified')
+        metrics.set('queue_depth', 4)
+        metrics.observe('phase_seconds', .02, phase='minify')
+        with self.assertRaises(ValueError):
+            with metrics.time('phase_seconds', phase='minify'):
+                raise ValueError()
+
+        snapshot: Dict[str, List[Dict[str, Any]]] = metrics.snapshot()
+        self.assertEqual(snapshot['counters'], [{'name': 'jobs_total', 'labels': {'result': 'minified'}, 'value': 3.}])
+        self.assertEqual(snapshot['gauges'][0]['value'], 4)
+        self.assertEqual(snapshot['timings'][0]['count'], 2)
+        self.assertEqual(snapshot['timings'][0]['max'], .02)
+
+        exported: List[str] = Metrics.prometheus(snapshot).splitlines()
+        self.assertIn('# TYPE pyshader_jobs_total counter', exported)
+        self.assertIn('pyshader_jobs_total{result="minified"} 3.0', exported)
+        self.assertIn('pyshader_queue_depth 4', exported)
+        self.assertIn('pyshader_phase_seconds_bucket{le="0.025",phase="minify"} 2', exported)
+        self.assertIn('pyshader_phase_seconds_bucket{le="+Inf",phase="minify"} 2', exported)
+        self.assertIn('pyshader_phase_seconds_count{phase="minify"} 2', exported)
+
+        metrics.reset()
+        self.assertEqual(metrics.snapshot()['counters'], [])
+
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,31 @@
-from unittest import (
-    TestCase,
-    main,
-)
+from unittest import main
 from typing import (
     Self,
+    Dict,
+    Optional,
 )
+from pathlib import Path
 from shader_minifier import (
     shader_minifier,
     MinifierVersion,
     ObtainmentStrategy,
     ValidationError,
     ShaderMinifierError,
+    ValidationPolicy,
+    MinifierOutputFormat,
+)
+from shader_minifier.formats import (
+    CVariables,
+    parseCVariables,
 )
+from shader_minifier.metrics import metrics
+from shader_minifier.accounting import resources
+from benchmarks.fixtures import StandinTestCase
 from importlib.resources import files
 import tests
 
 
-class TestMinifier(TestCase):
+class TestMinifier(StandinTestCase):
     SimpleShaderSource: str = (files(tests) / 'simple_shader.frag').read_text()
     SimpleErrorShaderSource: str = (files(tests) / 'simple_error_shader.frag').read_text()
 
@@ -40,6 +49,123 @@ class TestMinifier(TestCase):
         with self.assertRaises(ValidationError) as error:
             shader_minifier().minify(TestMinifier.SimpleErrorShaderSource)
 
+    def testExplicitExecutables(self: Self) -> None:
+        self.assertEqual(shader_minifier.determineVersion(self.minifier.path), MinifierVersion.v1_4_0)
+
+        result: str = self.minifier.minify(TestMinifier.SimpleShaderSource)
+        self.assertLess(len(result), len(TestMinifier.SimpleShaderSource))
+        with self.assertRaises(ValidationError):
+            self.minifier.minify(TestMinifier.SimpleErrorShaderSource)
+
+    def testValidationPolicy(self: Self) -> None:
+        result: str = self.minifier.minify(TestMinifier.SimpleShaderSource)
+        self.assertEqual(self.minifier.minify(TestMinifier.SimpleShaderSource, pipelined=True), result)
+        with self.assertRaises(ValidationError):
+            self.minifier.minify(TestMinifier.SimpleErrorShaderSource, pipelined=True)
+        self.assertIsNotNone(self.minifier.minify(TestMinifier.SimpleErrorShaderSource, validation=ValidationPolicy.Nothing))
+        with self.assertRaisesRegex(ValidationError, 'Invalid minified shader'):
+            self.minifier.minify(TestMinifier.SimpleErrorShaderSource, validation=ValidationPolicy.Output)
+
+    def testValidateMany(self: Self) -> None:
+        sources: Dict[str, str] = {
+            'valid{}'.format(index): TestMinifier.SimpleShaderSource
+            for index in range(5)
+        }
+        sources['invalid'] = TestMinifier.SimpleErrorShaderSource
+        sources['unbalanced'] = 'void main() {'
+        runs: float = TestMinifier.validatorRuns()
+        errors: Dict[str, Optional[ValidationError]] = self.minifier.validateMany(sources)
+        self.assertEqual(TestMinifier.validatorRuns() - runs, 1)
+        self.assertEqual(list(errors.keys()), list(sources.keys()))
+        self.assertTrue(all(map(lambda index: errors['valid{}'.format(index)] is None, range(5))))
+        self.assertIn('ERROR', str(errors['invalid']))
+        self.assertIn('Unbalanced', str(errors['unbalanced']))
+        self.assertNotIn('Unbalanced', str(errors['invalid']))
+
+        # Output without paths is not attributed to any file; such batches are bisected.
+        self.assertEqual(shader_minifier._diagnostics('ERROR: 1 compilation errors.\n', [Path('a.frag')]), {})
+        self.assertEqual(self.minifier.minifyMany({
+            'a.frag': TestMinifier.SimpleShaderSource,
+            'b.frag': TestMinifier.SimpleShaderSource,
+        }).keys(), {'a.frag', 'b.frag'})
+
+    def testMinifyFormats(self: Self) -> None:
+        runs: float = TestMinifier.validatorRuns()
+        minifies: float = TestMinifier.runs('minify')
+        outputs: Dict[MinifierOutputFormat, str] = self.minifier.minifyFormats(
+            TestMinifier.SimpleShaderSource,
+            list(MinifierOutputFormat),
+            name='simple.frag',
+        )
+        # One run per format; input and output are validated once.
+        self.assertEqual(TestMinifier.validatorRuns() - runs, 2)
+        self.assertEqual(TestMinifier.runs('minify') - minifies, len(MinifierOutputFormat))
+        self.assertEqual(list(outputs.keys()), list(MinifierOutputFormat))
+
+        # Each output is shader_minifier's own.
+        for format in MinifierOutputFormat:
+            self.assertEqual(outputs[format], self.minifier.minify(
+                TestMinifier.SimpleShaderSource,
+                format=format,
+                validation=ValidationPolicy.Nothing,
+                name='simple.frag',
+            ))
+        variables: CVariables = parseCVariables(outputs[MinifierOutputFormat.CVariables])
+        self.assertEqual(list(variables.shaders.keys()), ['simple_frag'])
+
+        # Without code in a validatable format, the output is validated on a text run.
+        minifies = TestMinifier.runs('minify')
+        self.minifier.minifyFormats(TestMinifier.SimpleShaderSource, [MinifierOutputFormat.JavaScript])
+        self.assertEqual(TestMinifier.runs('minify') - minifies, 2)
+
+        with self.assertRaises(ValidationError):
+            self.minifier.minifyFormats(TestMinifier.SimpleErrorShaderSource, [MinifierOutputFormat.Text])
+
+    def testParseCVariables(self: Self) -> None:
+        variables: CVariables = parseCVariables(
+            '#ifndef SHADER_MINIFIER_IMPL\n'
+            '# define VAR_TIME "f"\n'
+            '#endif\n'
+            '// shader.frag\n'
+            'const char *shader_frag =\n'
+            ' "#version 450\\n"\n'
+            ' "uniform float f;"\n'
+            ' "void main(){}"\n'
+            ' "// \\"Quoted\\" \\\\\\n"\n'
+        )
+        self.assertEqual(variables.names, {'VAR_TIME': 'f'})
+        self.assertEqual(variables.shaders, {
+            'shader_frag': '#version 450\nuniform float f;void main(){}// "Quoted" \\\n',
+        })
+
+    @staticmethod
+    def runs(job: str) -> float:
+        return sum(map(
+            lambda row: row['count'],
+            filter(lambda row: row['job'] == job, resources(metrics.snapshot())),
+        ))
+
+    @staticmethod
+    def validatorRuns() -> float:
+        return sum(map(
+            lambda row: row['count'],
+            filter(lambda row: row['job'] == 'validate', resources(metrics.snapshot())),
+        ))
+
+    def testSplitIndented(self: Self) -> None:
+        fileNames = {
+            'scene/shader.frag': '0_shader.frag',
+            'post/shader.frag': '1_shader.frag',
+        }
+        output: str = '// 0_shader.frag\nvoid main(){}\n\n// 1_shader.frag\nuniform float A;\nvoid main(){}\n'
+        self.assertEqual(shader_minifier.splitIndented(output, fileNames), {
+            'scene/shader.frag': 'void main(){}\n',
+            'post/shader.frag': 'uniform float A;\nvoid main(){}\n',
+        })
+
+        with self.assertRaises(ShaderMinifierError):
+            shader_minifier.splitIndented('void main(){}\n', fileNames)
+
 
 if __name__ == '__main__':
     main()
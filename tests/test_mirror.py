@@ -0,0 +1,70 @@
+from unittest import (
+    TestCase,
+    main,
+)
+from typing import (
+    Self,
+    Dict,
+)
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from hashlib import sha256
+from os import (
+    environ,
+    access,
+    X_OK,
+)
+from shader_minifier.mirror import (
+    Artifact,
+    Mirror,
+    obtain,
+)
+from shader_minifier.minifier import (
+    MinifierVersion,
+    shader_minifier,
+)
+
+
+class TestMirror(TestCase):
+    def testFromLocation(self: Self) -> None:
+        with TemporaryDirectory() as tempDir:
+            self.assertEqual(Mirror.fromLocation(tempDir).directory, Path(tempDir))
+            self.assertEqual(Mirror.fromLocation(Path(tempDir).as_uri()).directory, Path(tempDir))
+
+    def testArtifacts(self: Self) -> None:
+        artifact: Artifact = shader_minifier.artifact(MinifierVersion.v1_4_0)
+        self.assertEqual(artifact.name, 'shader_minifier-1.4.0.exe')
+        self.assertEqual(artifact.hash, shader_minifier.hashes[MinifierVersion.v1_4_0])
+        self.assertEqual(len(shader_minifier.artifacts([MinifierVersion.v1_4_0, MinifierVersion.v1_3_6])), 3)
+        self.assertTrue(shader_minifier.validatorArtifact().archive)
+
+    def testPrefetch(self: Self) -> None:
+        with TemporaryDirectory() as source, TemporaryDirectory() as target:
+            content: bytes = b'executable'
+            artifact: Artifact = Artifact('tool', 'https://example.invalid/tool', sha256(content).hexdigest())
+            # Neither in a mirror nor at its URL.
+            missing: Artifact = Artifact('missing', str(Path(source) / 'nowhere'), sha256(b'').hexdigest())
+            (Path(source) / 'tool').write_bytes(content)
+
+            self.assertIsNone(Mirror(target).find(artifact))
+
+            # Obtained from the configured mirror without network access.
+            environ[Mirror.Variable] = Path(source).as_uri()
+            try:
+                self.assertEqual(obtain(artifact), Path(source) / 'tool')
+                paths: Dict[Artifact, Path] = Mirror(target).prefetch([artifact, missing], 2)
+            finally:
+                del environ[Mirror.Variable]
+
+            self.assertEqual(list(paths.keys()), [artifact])
+            self.assertEqual(paths[artifact].read_bytes(), content)
+            self.assertTrue(access(paths[artifact], X_OK))
+            self.assertEqual(Mirror(target).find(artifact), paths[artifact])
+
+            # Corrupted files are ignored.
+            paths[artifact].write_bytes(b'corrupted')
+            self.assertIsNone(Mirror(target).find(artifact))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+from unittest import (
+    TestCase,
+    main,
+)
+from typing import Self
+from os import environ
+from datetime import datetime
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication
+from shader_minifier.minifier import ShaderMinifierError
+from shader_minifier.watcher import Watcher
+from shader_minifier.scheduler import Scheduler
+from shader_minifier.entropy import Entropy
+from shader_minifier.versionmodel import VersionModel
+from shader_minifier.diffmodel import DiffModel
+
+
+class TestModels(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        cls.application: QApplication = QApplication.instance() or QApplication([])
+
+    def setUp(self: Self) -> None:
+        self.watcher: Watcher = Watcher()
+        self.scheduler: Scheduler = Scheduler()
+        self.entropy: Entropy = Entropy()
+
+        for second, (hash, source) in enumerate([
+            ('a', 'void main() {\n    return;\n}\n'),
+            ('b', 'void main() {\n}\n'),
+            ('c', 'void main() {\n    discard;\n}\n'),
+        ]):
+            self.watcher._versions[hash] = source
+            self.watcher._history[datetime(2024, 1, 1, 0, 0, second)] = hash
+        self.watcher._latestHash = 'c'
+
+        self.scheduler._versions['a'] = 'void main(){return;}'
+        self.scheduler._versions['b'] = ShaderMinifierError('Error.')
+        self.scheduler._versions['c'] = 'void main(){discard;}'
+        self.entropy._outputs['a'] = 'output'
+        self.entropy._versions['output'] = 12.5
+
+    def testVersionModel(self: Self) -> None:
+        model: VersionModel = VersionModel()
+        model.updateScheduler(self.scheduler)
+        model.updateEntropy(self.entropy)
+        model.updateWatcher(self.watcher)
+
+        self.assertEqual(model.rowCount(), 3)
+        self.assertEqual(model.hash(1), 'b')
+        self.assertEqual(model.data(model.index(0, 1)), len('void main(){return;}'))
+        self.assertEqual(model.data(model.index(1, 1)), 'Error')
+        self.assertEqual(model.data(model.index(0, 3)), 12.5)
+        self.assertEqual(model.data(model.index(2, 3)), 'Unavailable')
+        self.assertTrue(model.data(model.index(2, 0), Qt.ItemDataRole.FontRole).bold())
+        self.assertEqual(model.headerData(2, Qt.Orientation.Vertical), '00:00:02')
+
+    def testDiffModel(self: Self) -> None:
+        model: DiffModel = DiffModel()
+        model.updateWatcher(self.watcher)
+        model.updateScheduler(self.scheduler)
+        model.updateMinified(False)
+        model.updateReferenceSHA('a')
+
+        self.assertEqual(model.rowCount(), 2)
+        self.assertEqual(model.data(model.index(0, 0)), '-     return;')
+        self.assertEqual(model.data(model.index(1, 0)), '+     discard;')
+        self.assertEqual(model.headerData(0, Qt.Orientation.Vertical), 'R:1')
+        self.assertEqual(model.headerData(1, Qt.Orientation.Vertical), 'L:1')
+
+    def testSameOutput(self: Self) -> None:
+        # Whitespace changes of the source minify to the same output.
+        self.watcher._versions['d'] = 'void main() {\n    discard;\n}\n\n'
+        self.watcher._history[datetime(2024, 1, 1, 0, 0, 3)] = 'd'
+        self.watcher._latestHash = 'd'
+        self.scheduler.addResult('c', 'void main(){discard;}')
+        self.scheduler.addResult('d', ''.join(['void main(){', 'discard;}']))
+        self.assertIs(self.scheduler._versions['c'], self.scheduler._versions['d'])
+        self.assertTrue(self.scheduler.sameOutput('c', 'd'))
+        self.assertFalse(self.scheduler.sameOutput('a', 'd'))
+        self.assertEqual(self.scheduler.output(self.scheduler.outputHash('d')), 'void main(){discard;}')
+
+        versions: VersionModel = VersionModel()
+        versions.updateScheduler(self.scheduler)
+        versions.updateWatcher(self.watcher)
+        self.assertTrue(versions.data(versions.index(3, 0), Qt.ItemDataRole.FontRole).italic())
+        self.assertIsNone(versions.data(versions.index(1, 0), Qt.ItemDataRole.FontRole))
+
+        model: DiffModel = DiffModel()
+        model.updateWatcher(self.watcher)
+        model.updateScheduler(self.scheduler)
+        model.updateReferenceSHA('c')
+        self.assertEqual(model.rowCount(), 0)
+        model.updateMinified(False)
+        self.assertEqual(model.rowCount(), 1)
+        self.assertEqual(model.data(model.index(0, 0)), '+ ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+from unittest import (
+    TestCase,
+    main,
+    skipUnless,
+)
+from typing import (
+    Self,
+    List,
+)
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Event
+from time import sleep
+from shader_minifier.monitor import (
+    PollingMonitor,
+    InotifyMonitor,
+)
+
+
+class TestMonitor(TestCase):
+    Timeout: float = 5.
+
+    def _testMonitor(self: Self, monitor: PollingMonitor) -> None:
+        with TemporaryDirectory() as tempDir:
+            path: Path = Path(tempDir) / 'shader.frag'
+            path.write_text('void main() {}\n')
+
+            changed: List[str] = []
+            event: Event = Event()
+            def record(changedPath: str) -> None:
+                changed.append(changedPath)
+                event.set()
+            monitor.changed.connect(record)
+
+            monitor.watch(path)
+            monitor.start()
+            try:
+                # Truncate and write in several chunks; reported once after settling.
+                with path.open('w') as file:
+                    file.write('void main() {')
+                    file.flush()
+                    sleep(PollingMonitor.SettleTime / 5)
+                    file.write(' return; }\n')
+                self.assertTrue(event.wait(TestMonitor.Timeout))
+                sleep(4 * PollingMonitor.SettleTime)
+                self.assertEqual(changed, [str(path.absolute())])
+
+                # Write to a temporary file and rename it over the shader.
+                event.clear()
+                temporary: Path = Path(tempDir) / 'shader.frag.tmp'
+                temporary.write_text('void main() { discard; }\n')
+                temporary.replace(path)
+                self.assertTrue(event.wait(TestMonitor.Timeout))
+                self.assertEqual(changed[-1], str(path.absolute()))
+
+                # Directories report files created in them.
+                event.clear()
+                monitor.watch(tempDir)
+                include: Path = Path(tempDir) / 'common.glsl'
+                include.write_text('float f() { return 1.; }\n')
+                self.assertTrue(event.wait(TestMonitor.Timeout))
+                self.assertEqual(changed[-1], str(include.absolute()))
+            finally:
+                monitor.stop()
+                monitor._thread.join()
+
+    def testPolling(self: Self) -> None:
+        self._testMonitor(PollingMonitor())
+
+    @skipUnless(InotifyMonitor.available(), 'inotify is not available.')
+    def testInotify(self: Self) -> None:
+        self._testMonitor(InotifyMonitor())
+
+    @skipUnless(InotifyMonitor.available(), 'inotify is not available.')
+    def testInotifyUnwatch(self: Self) -> None:
+        with TemporaryDirectory() as tempDir:
+            path: Path = Path(tempDir) / 'shader.frag'
+            path.write_text('void main() {}\n')
+
+            monitor: InotifyMonitor = InotifyMonitor()
+            try:
+                monitor.watch(tempDir)
+                monitor.unwatch(tempDir)
+                self.assertEqual(monitor._descriptors, {})
+                self.assertEqual(monitor._directories, {})
+
+                # The directory stays watched for the files in it.
+                monitor.watch(tempDir)
+                monitor.watch(path)
+                monitor.unwatch(tempDir)
+                self.assertEqual(monitor._descriptors[Path(tempDir).absolute()][1], {'shader.frag'})
+                monitor.unwatch(path)
+                self.assertEqual(monitor._descriptors, {})
+                self.assertEqual(monitor._directories, {})
+            finally:
+                monitor._close()
+
+    @skipUnless(InotifyMonitor.available(), 'inotify is not available.')
+    def testInotifyRewatch(self: Self) -> None:
+        with TemporaryDirectory() as tempDir:
+            directory: Path = Path(tempDir) / 'shaders'
+            directory.mkdir()
+            path: Path = directory / 'shader.frag'
+            path.write_text('void main() {}\n')
+
+            changed: List[str] = []
+            event: Event = Event()
+            def record(changedPath: str) -> None:
+                changed.append(changedPath)
+                event.set()
+
+            monitor: InotifyMonitor = InotifyMonitor()
+            monitor.changed.connect(record)
+            monitor.watch(path)
+            monitor.start()
+            try:
+                # The watch is dropped with the directory; its file is polled meanwhile.
+                path.unlink()
+                directory.rmdir()
+                for _ in range(100):
+                    if path.absolute() in monitor._dropped:
+                        break
+                    sleep(PollingMonitor.SettleTime)
+                self.assertIn(path.absolute(), monitor._dropped)
+
+                directory.mkdir()
+                path.write_text('void main() { discard; }\n')
+                self.assertTrue(event.wait(TestMonitor.Timeout))
+                self.assertEqual(changed, [str(path.absolute())])
+
+                # Once the directory is back, inotify watches it again.
+                for _ in range(100):
+                    if directory.absolute() in monitor._descriptors:
+                        break
+                    sleep(PollingMonitor.SettleTime)
+                self.assertIn(directory.absolute(), monitor._descriptors)
+                self.assertEqual(monitor._dropped, set())
+                self.assertEqual(monitor._polled, {})
+
+                event.clear()
+                path.write_text('void main() { return; }\n')
+                self.assertTrue(event.wait(TestMonitor.Timeout))
+                self.assertEqual(len(changed), 2)
+            finally:
+                monitor.stop()
+                monitor._thread.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+from unittest import (
+    TestCase,
+    main,
+)
+from typing import Self
+from shader_minifier.normalizer import (
+    normalize,
+    normalizedHash,
+)
+
+
+class TestNormalizer(TestCase):
+    def testInsignificantChanges(self: Self) -> None:
+        source: str = '#version 450\nuniform float t;\nvoid main() {\n    float a = 1.0e-5 + .5;\n    a += t;\n}\n'
+        self.assertEqual(normalizedHash(source), normalizedHash(source.replace('    ', '\t') + '\n\n'))
+        self.assertEqual(normalizedHash(source), normalizedHash('// Header.\n' + source.replace(';\n', '; /* Note. */\n')))
+        self.assertEqual(normalize(source), '#version 450\nuniform float t ; void main ( ) { float a = 1.0e-5 + .5 ; a += t ; }')
+
+    def testSignificantChanges(self: Self) -> None:
+        self.assertNotEqual(normalize('a += b;'), normalize('a + = b;'))
+        self.assertNotEqual(normalize('a - -b;'), normalize('a--b;'))
+        self.assertNotEqual(normalize('float ab;'), normalize('float a b;'))
+        # Function-like and object-like macros differ.
+        self.assertNotEqual(normalize('#define F(x) x\n'), normalize('#define F (x) x\n'))
+        # Directives end at line breaks, unless a comment spans them.
+        self.assertNotEqual(normalize('#define A\nB\n'), normalize('#define A B\n'))
+        self.assertEqual(normalize('#define A /*\n*/ B\n'), normalize('#define A B\n'))
+        # Shader Minifier's verbatim markers are comments that matter.
+        self.assertNotEqual(normalize('//[\nfloat a;\n//]\n'), normalize('float a;\n'))
+        self.assertEqual(normalize('float a = __LINE__;\n'), 'float a = __LINE__;\n')
+
+
+if __name__ == '__main__':
+    main()
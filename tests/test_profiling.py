@@ -0,0 +1,45 @@
+from unittest import (
+    TestCase,
+    main,
+)
+from typing import (
+    Self,
+    List,
+)
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import sleep
+from pstats import Stats
+from shader_minifier.profiling import Profiler
+
+
+def work() -> int:
+    return sum(map(lambda value: value * value, range(100000)))
+
+
+class TestProfiling(TestCase):
+    def testProfiler(self: Self) -> None:
+        with TemporaryDirectory() as tempDir:
+            profiler: Profiler = Profiler()
+            profiler.start(Path(tempDir), .05, 'test-')
+            threads: List[Thread] = [Thread(target=work, name='Worker') for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            sleep(.1)
+            written: List[Path] = profiler.stop()
+
+            self.assertFalse(profiler.running)
+            self.assertEqual(profiler.stop(), [])
+            names: List[str] = list(map(lambda path: path.name, written))
+            self.assertIn('test-memory.txt', names)
+            self.assertIn('test-memory-0000.snapshot', names)
+            self.assertIn('test-Worker.prof', names)
+            self.assertIn('test-Worker-2.prof', names)
+            self.assertIn('work', str(Stats(str(Path(tempDir) / 'test-Worker.prof')).stats.keys()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+from unittest import main
+from typing import (
+    Self,
+    List,
+)
+from pathlib import Path
+from shader_minifier.project import (
+    Project,
+    ProjectResult,
+)
+from benchmarks.fixtures import StandinTestCase
+
+
+class TestProject(StandinTestCase):
+    def testProject(self: Self) -> None:
+        root: Path = self.tempDir
+        (root / 'scenes').mkdir()
+        (root / 'common.glsl').write_text('float one() { return 1.; }\n')
+        first: Path = root / 'scenes' / 'first.frag'
+        first.write_text('#include "../common.glsl"\nvoid main() { one(); }\n')
+        second: Path = root / 'second.frag'
+        second.write_text('void main() {}\n')
+
+        project: Project = Project([first, second, first])
+        project._minifier = self.minifier
+        results: List[ProjectResult] = []
+        project.minified.connect(results.append)
+        try:
+            self.assertEqual(project.members, [first.absolute(), second.absolute()])
+            self.assertEqual(Project._names(project.members), {first.absolute(): 'scenes/first.frag', second.absolute(): 'second.frag'})
+            self.assertEqual(Project._names([first.absolute()]), {first.absolute(): 'first.frag'})
+            self.assertEqual(Project._names([Path('/a/first.frag'), Path('/b/second.frag')]), {
+                Path('/a/first.frag'): 'a/first.frag',
+                Path('/b/second.frag'): 'b/second.frag',
+            })
+
+            project._minify(set())
+            self.assertEqual(len(results), 1)
+            self.assertIsNone(results[0].error)
+            self.assertEqual(set(results[0].minified), {'scenes/first.frag', 'second.frag'})
+            self.assertIs(project.latestResult, results[0])
+
+            # Every member and include is watched.
+            self.assertEqual(set(project._monitor.paths), {
+                first.absolute(),
+                second.absolute(),
+                (root / 'common.glsl').absolute(),
+            })
+
+            # Nothing changed, nothing is emitted.
+            project._minify(set())
+            self.assertEqual(len(results), 1)
+
+            # A changed include re-expands the members that include it.
+            (root / 'common.glsl').write_text('float one() { return 2.; }\n')
+            project._minify({root / 'common.glsl'})
+            self.assertEqual(len(results), 2)
+            self.assertNotEqual(results[1].state, results[0].state)
+            self.assertEqual(results[1].minified['second.frag'], results[0].minified['second.frag'])
+
+            # Removed members are no longer watched.
+            project.remove(first)
+            project._minify(set())
+            self.assertEqual(set(project._monitor.paths), {second.absolute()})
+            self.assertEqual(set(results[-1].minified), {'second.frag'})
+        finally:
+            project._monitor._close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+from unittest import main
+from typing import (
+    Self,
+    List,
+    Any,
+)
+from pathlib import Path
+from threading import Event
+from datetime import datetime
+from shader_minifier.remote import RemoteEngine
+from shader_minifier.minifier import MinifierVersion
+from shader_minifier.vcs import CommitRecord
+from shader_minifier.monitor import PollingMonitor
+from benchmarks.fixtures import StandinTestCase
+from importlib.resources import files
+import tests
+
+
+class TestRemote(StandinTestCase):
+    SimpleShaderSource: str = (files(tests) / 'simple_shader.frag').read_text()
+    # Spawning imports the engine in a fresh interpreter.
+    Timeout: float = 30.
+
+    def testRoundTrip(self: Self) -> None:
+        path: Path = self.tempDir / 'shader.frag'
+        path.write_text(TestRemote.SimpleShaderSource)
+
+        engine: RemoteEngine = RemoteEngine(minifiers={MinifierVersion.v1_4_0: self.minifier})
+        # The mirrored watcher does not monitor files.
+        self.assertIs(type(engine.watcher._monitor), PollingMonitor)
+        results: List[Any] = []
+        minified: Event = Event()
+
+        def received(hash: str, result: Any) -> None:
+            results.append((hash, result))
+            minified.set()
+
+        engine.scheduler.minified.connect(received)
+        engine.start()
+        try:
+            engine.open(path)
+            self.assertTrue(minified.wait(TestRemote.Timeout))
+        finally:
+            engine.stop()
+
+        self.assertEqual(engine._process.exitcode, 0)
+        hash, result = results[0]
+        self.assertEqual(engine.watcher._versions[hash], TestRemote.SimpleShaderSource)
+        self.assertEqual(result, self.minifier.minify(TestRemote.SimpleShaderSource))
+        self.assertEqual(engine.scheduler._versions[hash], result)
+
+    def testDeadEngine(self: Self) -> None:
+        engine: RemoteEngine = RemoteEngine(minifiers={})
+        engine.start()
+        engine._process.kill()
+        engine._process.join()
+
+        # Requests return instead of waiting for a reply forever.
+        record: CommitRecord = CommitRecord('0' * 40, datetime.now(), 0, None, '0' * 40)
+        self.assertIsNone(engine.loadCommit(record))
+        self.assertEqual(engine.metrics()['counters'], [])
+        engine.stop()
+        self.assertTrue(engine._stopped.is_set())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+from unittest import (
+    TestCase,
+    main,
+)
+from typing import (
+    Self,
+    Dict,
+    List,
+    Any,
+)
+from time import perf_counter
+from shader_minifier.tracing import Tracer
+
+Hash: str = 'ab' * 32
+
+
+class TestTracing(TestCase):
+    def testSpans(self: Self) -> None:
+        tracer: Tracer = Tracer()
+        queued: float = perf_counter()
+        with tracer.span('watcher.read') as span:
+            self.assertIsNone(tracer.current())
+            span.hash = Hash
+            tracer.record('watcher.wait', queued, span.start, Hash)
+            with tracer.span('scheduler.minify', version='v1_4_0'):
+                self.assertEqual(tracer.current(), Hash)
+        with tracer.span('entropy.build'):
+            pass
+
+        events: List[Dict[str, Any]] = tracer.events()
+        self.assertEqual(events[0]['ph'], 'M')
+        stages: Dict[str, Dict[str, Any]] = {event['name']: event for event in events if event['ph'] == 'X'}
+        self.assertEqual(list(stages.keys()), ['watcher.wait', 'scheduler.minify', 'watcher.read', 'entropy.build'])
+        self.assertEqual(stages['scheduler.minify']['args'], {'version': 'v1_4_0', 'hash': Hash})
+        self.assertEqual(stages['scheduler.minify']['cat'], 'scheduler')
+        self.assertEqual(stages['entropy.build']['args'], {})
+
+        tracer.enabled = False
+        with tracer.span('vcs.commit', Hash):
+            pass
+        self.assertEqual(len(tracer.events()), len(events))
+
+    def testChrome(self: Self) -> None:
+        tracer: Tracer = Tracer()
+        tracer.record('watcher.wait', 1., 2., Hash)
+        tracer.record('scheduler.minify', 2., 3., Hash)
+        tracer.record('qt.slot', 3.5, 4., Hash)
+
+        trace: Dict[str, Any] = Tracer.chrome(tracer.events())
+        stages: List[Dict[str, Any]] = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+        self.assertEqual(list(map(lambda event: (event['flow_in'], event['flow_out']), stages)), [(False, True), (True, True), (True, False)])
+        self.assertEqual(len(set(map(lambda event: event['bind_id'], stages))), 1)
+
+        save: List[Dict[str, Any]] = [event for event in trace['traceEvents'] if event.get('cat') == 'save']
+        self.assertEqual(list(map(lambda event: (event['ph'], event['ts']), save)), [('b', 1e6), ('e', 4e6)])
+
+
+if __name__ == '__main__':
+    main()
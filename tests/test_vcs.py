@@ -0,0 +1,171 @@
+from unittest import (
+    TestCase,
+    main,
+)
+from typing import (
+    Self,
+    List,
+)
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import (
+    sleep,
+    monotonic,
+)
+from pygit2 import (
+    Repository,
+    Commit,
+    Oid,
+    init_repository,
+)
+from shader_minifier.vcs import (
+    VCS,
+    CommitRecord,
+)
+from importlib.resources import files
+import tests
+
+
+class TestVCS(TestCase):
+    SimpleShaderSource: str = (files(tests) / 'simple_shader.frag').read_text()
+    Timeout: float = 5.
+
+    @staticmethod
+    def repository(directory: Path) -> Repository:
+        """
+            Creates a repository with one commit of shaders/shader.frag.
+        """
+        repository: Repository = init_repository(str(directory))
+        repository.config['user.name'] = 'Test'
+        repository.config['user.email'] = 'test@example.invalid'
+        (directory / 'shaders').mkdir()
+        (directory / 'shaders' / 'shader.frag').write_text(TestVCS.SimpleShaderSource)
+        repository.index.add('shaders/shader.frag')
+        repository.index.write()
+        repository.create_commit(
+            'HEAD',
+            repository.default_signature,
+            repository.default_signature,
+            'Initial commit.',
+            repository.index.write_tree(),
+            [],
+        )
+        return repository
+
+    @staticmethod
+    def commit(repository: Repository, path: str, source: str, message: str) -> Oid:
+        (Path(repository.workdir) / path).write_text(source)
+        repository.index.add(path)
+        repository.index.write()
+        return repository.create_commit(
+            'HEAD',
+            repository.default_signature,
+            repository.default_signature,
+            message,
+            repository.index.write_tree(),
+            [repository.head.target],
+        )
+
+    @staticmethod
+    def chain(repository: Repository, target: Oid, stop: Oid) -> List[Commit]:
+        """
+            Returns the first-parent chain from `target` down to `stop`,
+            excluding it, newest first.
+        """
+        commits: List[Commit] = []
+        commit: Commit = repository[target]
+        while commit.id != stop:
+            commits.append(commit)
+            commit = commit.parents[0]
+        return commits
+
+    def testLoadHistory(self: Self) -> None:
+        with TemporaryDirectory() as tempDir:
+            repository: Repository = TestVCS.repository(Path(tempDir))
+            vcs: VCS = VCS()
+            vcs.shader = Path(tempDir) / 'shaders' / 'shader.frag'
+
+            crunched: Oid = TestVCS.commit(repository, 'shaders/shader.frag', 'void main() {}\n', vcs._message(14, 1234.5))
+            # Foreign commits, crunch commits of other shaders and empty messages are skipped.
+            TestVCS.commit(repository, 'README.md', 'Readme.\n', 'Add a readme.')
+            TestVCS.commit(repository, 'shaders/other.frag', 'void main() {}\n', vcs._message(14, None).replace('shaders/shader.frag', 'shaders/other.frag'))
+            TestVCS.commit(repository, 'shaders/shader.frag', 'void main() { }\n', '')
+            TestVCS.commit(repository, 'shaders/shader.frag', 'void main() {  }\n', vcs._message(17, None))
+
+            histories: List[List[CommitRecord]] = []
+            vcs.historyLoaded.connect(histories.append)
+            vcs.loadHistory()
+            self.assertEqual(len(histories), 1)
+            # Sorted by size; commits of the same second have no defined order.
+            records: List[CommitRecord] = sorted(histories[0], key=lambda record: record.size)
+            self.assertEqual(list(map(lambda record: record.size, records)), [14, 17])
+            self.assertEqual(records[0].commit, str(crunched))
+            self.assertEqual(records[0].entropy, 1234.5)
+            self.assertIsNone(records[1].entropy)
+            self.assertEqual(vcs.loadCommit(records[0]), 'void main() {}\n')
+
+    def testSnapshots(self: Self) -> None:
+        with TemporaryDirectory() as tempDir:
+            repository: Repository = TestVCS.repository(Path(tempDir))
+            head: Oid = repository.head.target
+            vcs: VCS = VCS(autoSnapshot=True)
+            vcs.shader = Path(tempDir) / 'shaders' / 'shader.frag'
+            self.assertEqual(vcs.snapshotRef, 'refs/pyshader/shaders/shader.frag')
+
+            # The ref is created on top of HEAD; repeated hashes are skipped.
+            vcs._commitSnapshots([
+                ('a', 'void main() {}\n', 10),
+                ('a', 'void main() {}\n', 10),
+                ('b', 'void main() { }\n', 11),
+            ])
+            commits: List[Commit] = TestVCS.chain(repository, repository.references[vcs.snapshotRef].target, head)
+            self.assertEqual(len(commits), 2)
+            self.assertEqual(repository[commits[0].tree['shaders/shader.frag'].id].data, b'void main() { }\n')
+            self.assertIn('New size: 11', commits[0].message)
+            self.assertNotIn('New entropy', commits[0].message)
+            self.assertEqual(repository.head.target, head)
+            self.assertEqual(repository.status(), {})
+
+            # Only repeats; the ref stays where it is.
+            target: Oid = repository.references[vcs.snapshotRef].target
+            vcs._commitSnapshots([('b', 'void main() { }\n', 11)])
+            self.assertEqual(repository.references[vcs.snapshotRef].target, target)
+
+    def testSkippedSnapshotsCreateNoRef(self: Self) -> None:
+        with TemporaryDirectory() as tempDir:
+            repository: Repository = TestVCS.repository(Path(tempDir))
+            vcs: VCS = VCS(autoSnapshot=True)
+            vcs.shader = Path(tempDir) / 'shaders' / 'shader.frag'
+            vcs._latestSnapshotHash = 'a'
+            vcs._commitSnapshots([('a', 'void main() {}\n', 10)])
+            self.assertIsNone(repository.references.get(vcs.snapshotRef))
+
+    def testSnapshotBatching(self: Self) -> None:
+        with TemporaryDirectory() as tempDir:
+            repository: Repository = TestVCS.repository(Path(tempDir))
+            head: Oid = repository.head.target
+            vcs: VCS = VCS(autoSnapshot=True)
+            vcs.shader = Path(tempDir) / 'shaders' / 'shader.frag'
+            for index in range(3):
+                vcs.snapshot(str(index), 'void main() {{}} // {}\n'.format(index), 20)
+
+            vcs.start()
+            try:
+                # A burst of saves is committed at once after it settled.
+                start: float = monotonic()
+                while repository.references.get(vcs.snapshotRef) is None and monotonic() - start < TestVCS.Timeout:
+                    sleep(.05)
+            finally:
+                vcs.stop()
+                vcs._thread.join()
+
+            self.assertEqual(len(TestVCS.chain(repository, repository.references[vcs.snapshotRef].target, head)), 3)
+
+    def testDisabledSnapshots(self: Self) -> None:
+        vcs: VCS = VCS()
+        vcs.snapshot('a', 'void main() {}\n', 10)
+        self.assertEqual(vcs._snapshotQueue.qsize(), 0)
+
+
+if __name__ == '__main__':
+    main()